@@ -0,0 +1 @@
+"""Benchmarks for the mem-watch hot paths."""
@@ -0,0 +1,60 @@
+"""Compare two benchmark result files.
+
+Usage::
+
+    python -m benchmarks.compare baseline.json current.json --threshold 1.25
+
+Exits with status 1 if any stage's p50 latency grew by more than the
+threshold ratio.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional, Tuple
+
+Key = Tuple[str, int, int]
+
+
+def load(path: str) -> Dict[Key, dict]:
+    with open(path) as f:
+        data = json.load(f)
+    return {
+        (result["stage"], result["processes"], result["depth"]): result
+        for result in data["results"]
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare", description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", help="Results from the reference commit")
+    parser.add_argument("current", help="Results to check")
+    parser.add_argument(
+        "--threshold", type=float, default=1.25,
+        help="p50 ratio above which a stage counts as a regression (default: 1.25)"
+    )
+    args = parser.parse_args(argv)
+    
+    baseline = load(args.baseline)
+    current = load(args.current)
+    regressions = 0
+    
+    print(f"{'stage':<16}{'procs':>8}{'depth':>7}{'base p50':>11}{'p50':>10}{'ratio':>8}")
+    for key in sorted(baseline.keys() & current.keys()):
+        before = baseline[key]["p50_ms"]
+        after = current[key]["p50_ms"]
+        ratio = after / before if before else float("inf")
+        flag = ""
+        if ratio > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        stage, count, depth = key
+        print(f"{stage:<16}{count:>8}{depth:>7}{before:>11.2f}{after:>10.2f}{ratio:>8.2f}{flag}")
+    
+    if regressions:
+        print(f"{regressions} regression(s) above {args.threshold:.2f}x")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Synthetic process tables for benchmarks.
+
+``FakeProcfs`` writes a /proc-like tree that the procfs backend can read,
+and ``FakePsutil`` patches psutil with an in-memory process table. Both
+are seeded, so runs are reproducible, and neither touches real processes.
+"""
+
+import os
+import random
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+from unittest import mock
+
+import psutil
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+TOTAL_MEMORY = 64 * 1024 ** 3
+NAMES = ["python3", "postgres", "nginx", "java", "node", "bash", "sshd", "redis-server", "gcc", "make"]
+
+MemInfo = namedtuple("MemInfo", "rss vms")
+VirtualMemory = namedtuple("VirtualMemory", "total available")
+
+
+class FakeProcess:
+    """Process table entry with the subset of psutil.Process used by mem-watch."""
+    
+    def __init__(self, pid: int, ppid: int, name: str, rss: int, vms: int, create_time: float):
+        self.pid = pid
+        self._name = name
+        self._create_time = create_time
+        self._mem = MemInfo(rss, vms)
+        self.info = {
+            'pid': pid,
+            'ppid': ppid,
+            'name': name,
+            'create_time': create_time,
+            'memory_info': self._mem,
+            'username': "bench"
+        }
+    
+    def set_rss(self, rss: int):
+        self._mem = MemInfo(rss, self._mem.vms)
+        self.info['memory_info'] = self._mem
+    
+    def name(self) -> str:
+        return self._name
+    
+    def create_time(self) -> float:
+        return self._create_time
+    
+    def memory_info(self) -> MemInfo:
+        return self._mem
+    
+    def memory_percent(self) -> float:
+        return self._mem.rss / TOTAL_MEMORY * 100
+    
+    def username(self) -> str:
+        return "bench"
+    
+    def children(self, recursive: bool = False) -> List["FakeProcess"]:
+        return []
+
+
+def mutate(rng: random.Random, processes: List[FakeProcess], fraction: float) -> List[FakeProcess]:
+    """Change the RSS of a random ``fraction`` of processes and return them."""
+    changed = rng.sample(processes, max(int(len(processes) * fraction), 1))
+    for proc in changed:
+        proc.set_rss(max(proc.memory_info().rss + rng.randint(-1, 4) * PAGE_SIZE * 16, PAGE_SIZE))
+    return changed
+
+
+def make_table(count: int, seed: int = 0) -> List[FakeProcess]:
+    """Build ``count`` processes in a shallow tree with a skewed RSS distribution."""
+    rng = random.Random(seed)
+    processes = []
+    for i in range(count):
+        pid = 100 + i
+        ppid = 1 if i < 10 else 100 + rng.randrange(min(i, 1000))
+        rss = int(rng.paretovariate(1.2) * 4 * 1024 ** 2)
+        processes.append(FakeProcess(
+            pid=pid,
+            ppid=ppid,
+            name=rng.choice(NAMES),
+            rss=min(rss, TOTAL_MEMORY // 4),
+            vms=rss * 3,
+            create_time=1700000000.0 + i
+        ))
+    return processes
+
+
+class FakePsutil:
+    """Patch psutil so mem-watch sees a synthetic process table."""
+    
+    def __init__(self, count: int, seed: int = 0):
+        self.processes = make_table(count, seed)
+        self.by_pid: Dict[int, FakeProcess] = {proc.pid: proc for proc in self.processes}
+        self._rng = random.Random(seed + 1)
+    
+    def process_iter(self, attrs=None) -> Iterator[FakeProcess]:
+        return iter(self.processes)
+    
+    def process(self, pid: int) -> FakeProcess:
+        try:
+            return self.by_pid[pid]
+        except KeyError:
+            raise psutil.NoSuchProcess(pid)
+    
+    def mutate(self, fraction: float = 0.01):
+        """Change the RSS of a random ``fraction`` of processes."""
+        mutate(self._rng, self.processes, fraction)
+    
+    @contextmanager
+    def patched(self):
+        with mock.patch.object(psutil, "process_iter", self.process_iter), \
+                mock.patch.object(psutil, "Process", self.process), \
+                mock.patch.object(psutil, "virtual_memory", lambda: VirtualMemory(TOTAL_MEMORY, TOTAL_MEMORY // 2)):
+            yield self
+
+
+class FakeProcfs:
+    """Write a synthetic /proc tree under ``root``."""
+    
+    def __init__(self, root: str, count: int, seed: int = 0):
+        self.root = root
+        self.processes = make_table(count, seed)
+        self._rng = random.Random(seed + 1)
+        
+        with open(os.path.join(root, "meminfo"), "w") as f:
+            f.write(f"MemTotal:       {TOTAL_MEMORY // 1024} kB\nMemFree:        0 kB\n")
+        with open(os.path.join(root, "stat"), "w") as f:
+            f.write("cpu 0 0 0 0\nbtime 1700000000\n")
+        for proc in self.processes:
+            directory = os.path.join(root, str(proc.pid))
+            os.mkdir(directory)
+            fields = ["S", str(proc.info['ppid'])] + ["0"] * 17 + [str(proc.pid)] + ["0"] * 10
+            with open(os.path.join(directory, "stat"), "w") as f:
+                f.write(f"{proc.pid} ({proc.name()}) {' '.join(fields)}\n")
+            self._write_statm(proc)
+            rss_kb = proc.memory_info().rss // 1024
+            with open(os.path.join(directory, "smaps_rollup"), "w") as f:
+                f.write(
+                    "00400000-7fffffffffff ---p 00000000 00:00 0 [rollup]\n"
+                    f"Rss: {rss_kb} kB\nPss: {rss_kb // 2} kB\n"
+                    f"Private_Clean: 0 kB\nPrivate_Dirty: {rss_kb // 3} kB\nSwap: 0 kB\n"
+                )
+    
+    def _write_statm(self, proc: FakeProcess):
+        mem = proc.memory_info()
+        with open(os.path.join(self.root, str(proc.pid), "statm"), "w") as f:
+            f.write(f"{mem.vms // PAGE_SIZE} {mem.rss // PAGE_SIZE} 0 0 0 0 0\n")
+    
+    def mutate(self, fraction: float = 0.01):
+        """Change the RSS of a random ``fraction`` of processes."""
+        for proc in mutate(self._rng, self.processes, fraction):
+            self._write_statm(proc)
@@ -0,0 +1,299 @@
+"""Benchmark collection, alerting, rendering and export against synthetic process tables.
+
+Usage::
+
+    python -m benchmarks.run --processes 10,1000,50000 --output results.json
+
+Every stage is timed per tick with ``time.perf_counter``; a second pass
+under ``tracemalloc`` records the peak and retained allocations per tick.
+Results are printed as a table and written as JSON for ``benchmarks.compare``.
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from rich.console import Console  # noqa: E402
+
+from mem_watch.alerts import AlertManager, AlertRule  # noqa: E402
+from mem_watch.display import Display  # noqa: E402
+from mem_watch.export import create_exporter  # noqa: E402
+from mem_watch.history import History  # noqa: E402
+from mem_watch.monitor import MemoryMonitor, ProcessStats  # noqa: E402
+
+from .fixtures import NAMES, TOTAL_MEMORY, FakeProcfs, FakePsutil  # noqa: E402
+
+
+class Stage:
+    """A benchmarked operation: ``prepare`` runs untimed before every ``run``."""
+    
+    def __init__(
+        self,
+        run: Callable[[], Any],
+        prepare: Optional[Callable[[], None]] = None,
+        close: Optional[Callable[[], None]] = None
+    ):
+        self.run = run
+        self.prepare = prepare or (lambda: None)
+        self.close = close or (lambda: None)
+
+
+class Environment:
+    """Fixtures shared by the stages of one (processes, depth) combination."""
+    
+    def __init__(self, count: int, depth: int, seed: int, workdir: str):
+        self.count = count
+        self.depth = depth
+        self.workdir = workdir
+        self.psutil = FakePsutil(count, seed)
+        self.stack = ExitStack()
+        self.stack.enter_context(self.psutil.patched())
+        self._procfs: Optional[FakeProcfs] = None
+        self._seed = seed
+    
+    @property
+    def procfs(self) -> FakeProcfs:
+        if self._procfs is None:
+            root = tempfile.mkdtemp(prefix="proc-", dir=self.workdir)
+            self._procfs = FakeProcfs(root, self.count, self._seed)
+        return self._procfs
+    
+    def stats(self) -> List[ProcessStats]:
+        """Mutate the table and return one tick of samples."""
+        self.psutil.mutate()
+        return [
+            ProcessStats(
+                pid=proc.pid,
+                name=proc.name(),
+                rss=proc.memory_info().rss,
+                vms=proc.memory_info().vms,
+                percent=proc.memory_info().rss / TOTAL_MEMORY * 100,
+                create_time=proc.create_time()
+            )
+            for proc in self.psutil.processes
+        ]
+    
+    def close(self):
+        self.stack.close()
+
+
+def _with_stats(env: Environment, run: Callable[[List[ProcessStats]], Any], close=None) -> Stage:
+    """Stage whose input is a fresh tick of samples."""
+    current: List[List[ProcessStats]] = [[]]
+    
+    def prepare():
+        current[0] = env.stats()
+    
+    return Stage(lambda: run(current[0]), prepare, close)
+
+
+def collect_psutil(env: Environment) -> Stage:
+    monitor = MemoryMonitor(name_pattern=".", history_size=env.depth)
+    return Stage(monitor.collect, env.psutil.mutate, monitor.close)
+
+
+def collect_procfs(env: Environment) -> Stage:
+    procfs = env.procfs
+    monitor = MemoryMonitor(
+        name_pattern=".", backend="procfs", proc_root=procfs.root, history_size=env.depth
+    )
+    return Stage(monitor.collect, procfs.mutate, monitor.close)
+
+
+def collect_all(env: Environment) -> Stage:
+    monitor = MemoryMonitor(all_processes=True, history_size=env.depth)
+    return Stage(monitor.collect, env.psutil.mutate, monitor.close)
+
+
+def get_processes(env: Environment) -> Stage:
+    monitor = MemoryMonitor(name_pattern=".", history_size=env.depth)
+    return Stage(monitor._get_processes, env.psutil.mutate, monitor.close)
+
+
+def history(env: Environment) -> Stage:
+    store = History(env.depth)
+    
+    def run(stats):
+        store.record(stats)
+        return store.summary()
+    
+    return _with_stats(env, run)
+
+
+def alerts(env: Environment) -> Stage:
+    return _with_stats(env, AlertManager("0.01%").check)
+
+
+def alert_rules(env: Environment) -> Stage:
+    rules = [AlertRule(f"{i + 1}M", name=f"^{name}-{i}$") for i, name in enumerate(NAMES * 20)]
+    rules.append(AlertRule("0.01%"))
+    return _with_stats(env, AlertManager(rules=rules).check)
+
+
+def display(env: Environment) -> Stage:
+    view = Display(show_graph=True)
+    
+    def run(stats):
+        view.console = Console(file=io.StringIO(), width=160, force_terminal=True)
+        view.show(stats)
+    
+    return _with_stats(env, run)
+
+
+def _export(suffix: str) -> Callable[[Environment], Stage]:
+    def stage(env: Environment) -> Stage:
+        exporter = create_exporter(os.path.join(env.workdir, f"export-{env.count}-{env.depth}{suffix}"))
+        return _with_stats(env, exporter.write, exporter.close)
+    return stage
+
+
+STAGES: Dict[str, Callable[[Environment], Stage]] = {
+    "collect-psutil": collect_psutil,
+    "collect-procfs": collect_procfs,
+    "collect-all": collect_all,
+    "get-processes": get_processes,
+    "history": history,
+    "alerts": alerts,
+    "alert-rules": alert_rules,
+    "display": display,
+    "export-csv": _export(".csv"),
+    "export-mwt": _export(".mwt"),
+    "export-sqlite": _export(".db"),
+}
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)), 1) - 1]
+
+
+def measure(stage: Stage, ticks: int, warmup: int, allocations: bool) -> Dict[str, float]:
+    for _ in range(warmup):
+        stage.prepare()
+        stage.run()
+    
+    times = []
+    for _ in range(ticks):
+        stage.prepare()
+        start = time.perf_counter()
+        stage.run()
+        times.append(time.perf_counter() - start)
+    
+    result = {
+        "mean_ms": sum(times) / len(times) * 1000,
+        "p50_ms": percentile(times, 50) * 1000,
+        "p95_ms": percentile(times, 95) * 1000,
+        "p99_ms": percentile(times, 99) * 1000,
+        "max_ms": max(times) * 1000,
+    }
+    
+    if allocations:
+        peaks = []
+        retained = 0
+        tracemalloc.start()
+        try:
+            for _ in range(ticks):
+                stage.prepare()
+                if hasattr(tracemalloc, "reset_peak"):
+                    tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                stage.run()
+                current, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - before)
+                retained += current - before
+        finally:
+            tracemalloc.stop()
+        result["peak_alloc_kib"] = percentile(peaks, 50) / 1024
+        result["retained_kib_per_tick"] = retained / ticks / 1024
+    return result
+
+
+def _metadata() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "created": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--processes", type=_int_list, default=[10, 100, 1000],
+        help="Comma-separated process counts, up to 50000 (default: 10,100,1000)"
+    )
+    parser.add_argument(
+        "--depth", type=_int_list, default=[100], help="Comma-separated history depths (default: 100)"
+    )
+    parser.add_argument("--ticks", type=int, default=20, help="Timed ticks per stage (default: 20)")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed ticks per stage (default: 2)")
+    parser.add_argument(
+        "--stage", action="append", choices=sorted(STAGES),
+        help="Only run this stage (repeatable; default: all)"
+    )
+    parser.add_argument("--no-alloc", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic process table")
+    parser.add_argument("-o", "--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+    
+    stages = args.stage or list(STAGES)
+    results = []
+    print(f"{'stage':<16}{'procs':>8}{'depth':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KiB':>11}")
+    
+    with tempfile.TemporaryDirectory(prefix="mem-watch-bench-") as workdir:
+        for count in args.processes:
+            for depth in args.depth:
+                env = Environment(count, depth, args.seed, workdir)
+                try:
+                    for name in stages:
+                        stage = STAGES[name](env)
+                        try:
+                            result = measure(stage, args.ticks, args.warmup, not args.no_alloc)
+                        finally:
+                            stage.close()
+                        result.update(stage=name, processes=count, depth=depth, ticks=args.ticks)
+                        results.append(result)
+                        peak = result.get("peak_alloc_kib")
+                        print(
+                            f"{name:<16}{count:>8}{depth:>7}{result['p50_ms']:>10.2f}"
+                            f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                            f"{'-' if peak is None else format(peak, '.1f'):>11}"
+                        )
+                finally:
+                    env.close()
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": _metadata(), "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
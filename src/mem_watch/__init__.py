@@ -3,7 +3,25 @@
 __version__ = "0.1.0"
 __author__ = "mem-watch"
 
-from .monitor import MemoryMonitor
-from .alerts import AlertManager
+# Imported on first access, so importing the package (and with it the
+# CLI) does not load psutil or any sampling code it does not use
+_LAZY = {
+    "MemoryMonitor": "monitor",
+    "AlertManager": "alerts",
+}
 
 __all__ = ["MemoryMonitor", "AlertManager", "__version__"]
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
@@ -1,79 +1,304 @@
 """Alert management for memory thresholds."""
 
-from typing import List, Optional
-import psutil
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional, Pattern, Tuple
 
 
 class Alert:
-    """Represents a memory threshold alert."""
+    """Represents a memory alert.
+
+    ``kind`` is ``"threshold"`` for threshold alerts or ``"leak"`` for
+    growth-rate alerts, where ``current`` is the growth in bytes per
+    second and ``eta`` the projected seconds until the limit is reached.
+    """
     
-    def __init__(self, pid: int, name: str, current: float, threshold: float, level: str):
+    def __init__(
+        self,
+        pid: int,
+        name: str,
+        current: float,
+        threshold: float,
+        level: str,
+        kind: str = "threshold",
+        eta: Optional[float] = None
+    ):
         self.pid = pid
         self.name = name
         self.current = current
         self.threshold = threshold
         self.level = level
+        self.kind = kind
+        self.eta = eta
+
+
+def parse_threshold(threshold: str) -> Tuple[str, float]:
+    """Parse a threshold string (e.g., '500M', '2G', '80%') into (metric, value).
+
+    The metric is ``"percent"`` for percentages and ``"rss"`` otherwise.
+    """
+    threshold = str(threshold).strip()
+    
+    if threshold.endswith('%'):
+        return "percent", float(threshold[:-1])
+    
+    multipliers = {'K': 1024, 'M': 1024**2, 'G': 1024**3}
+    value = threshold.upper()
+    for suffix, multiplier in multipliers.items():
+        if value.endswith(suffix):
+            return "rss", int(float(value[:-1]) * multiplier)
+    return "rss", int(threshold)
+
+
+class AlertRule:
+    """Warning and critical thresholds for a set of processes.
+
+    A rule applies to one ``pid``, to processes whose name matches the
+    ``name`` regex (searched anywhere in the name, and compiled up front so
+    a bad pattern fails here), or to every process when neither is given. Once a
+    level is active it only clears when the value drops ``hysteresis``
+    (a fraction) below its threshold, and a level is only raised after
+    its condition has held for ``sustain`` seconds.
+
+    Byte thresholds compare ``field``: ``"rss"`` or one of the detail
+    fields ``"pss"``, ``"uss"`` or ``"swap"``. A detail value is only used
+    while it is at most ``max_age`` seconds old; otherwise the rule falls
+    back to RSS.
+    """
+    
+    FIELDS = ("rss", "pss", "uss", "swap")
+    
+    def __init__(
+        self,
+        warning: str,
+        critical: Optional[str] = None,
+        name: Optional[str] = None,
+        pid: Optional[int] = None,
+        hysteresis: float = 0.0,
+        sustain: float = 0.0,
+        field: str = "rss",
+        max_age: Optional[float] = None
+    ):
+        self.metric, self.warning = parse_threshold(warning)
+        if critical is None:
+            self.critical = self.warning * 1.2
+        else:
+            metric, self.critical = parse_threshold(critical)
+            if metric != self.metric:
+                raise ValueError("Warning and critical thresholds must use the same unit")
+        if self.critical < self.warning:
+            raise ValueError("Critical threshold is below the warning threshold")
+        self.name = name
+        self.pattern: Optional[Pattern] = None
+        if name is not None:
+            try:
+                self.pattern = re.compile(name)
+            except re.error as e:
+                raise ValueError(f"Invalid alert name pattern {name!r}: {e}") from e
+        self.pid = pid
+        self.hysteresis = hysteresis
+        self.sustain = sustain
+        if field not in self.FIELDS:
+            raise ValueError(f"Unknown alert field: {field}")
+        if field != "rss" and self.metric == "percent":
+            raise ValueError("Detail fields need a byte threshold")
+        self.field = field
+        self.max_age = max_age
+    
+    def value(self, stat) -> float:
+        """Return the value this rule compares for a sample."""
+        if self.metric == "percent":
+            return stat.percent
+        if self.field != "rss":
+            value = getattr(stat, self.field, None)
+            detail_time = getattr(stat, "detail_time", None)
+            if value is not None and (
+                self.max_age is None or stat.timestamp - detail_time <= self.max_age
+            ):
+                return value
+        return stat.rss
+    
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "AlertRule":
+        unknown = set(config) - {
+            "warning", "critical", "name", "pid", "hysteresis", "sustain", "field", "max_age"
+        }
+        if unknown:
+            raise ValueError(f"Unknown alert rule keys: {', '.join(sorted(unknown))}")
+        if "warning" not in config:
+            raise ValueError("Alert rule needs a 'warning' threshold")
+        return cls(
+            warning=config["warning"],
+            critical=config.get("critical"),
+            name=config.get("name"),
+            pid=config.get("pid"),
+            hysteresis=float(config.get("hysteresis", 0.0)),
+            sustain=float(config.get("sustain", 0.0)),
+            field=config.get("field", "rss"),
+            max_age=config.get("max_age")
+        )
+
+
+class _RuleState:
+    """Alert level of one process under its rule."""
+    
+    __slots__ = ("rule", "level", "warning_since", "critical_since")
+    
+    def __init__(self, rule: AlertRule):
+        self.rule = rule
+        self.level: Optional[str] = None
+        self.warning_since: Optional[float] = None
+        self.critical_since: Optional[float] = None
 
 
 class AlertManager:
-    """Manage memory threshold alerts."""
+    """Manage memory threshold alerts.
+
+    Either a single global ``threshold`` (warning, with critical at 1.2x)
+    or a list of rules. PID rules take precedence over name rules, which
+    are tried in order; the global threshold is the fallback. The chosen
+    rule is cached per (pid, name), so the name regexes only run for new
+    processes and steady-state evaluation is a dict lookup per process.
+    Hysteresis and sustain state is kept per (pid, create_time), so a
+    reused PID starts from a clean state.
+    """
     
-    def __init__(self, threshold: str):
+    def __init__(self, threshold: Optional[str] = None, rules: Optional[List[AlertRule]] = None):
         self.threshold_bytes: Optional[int] = None
         self.threshold_percent: Optional[float] = None
-        self._parse_threshold(threshold)
+        self.default: Optional[AlertRule] = None
+        if threshold is not None:
+            self._parse_threshold(threshold)
+            self.default = AlertRule(threshold)
         
+        self.pid_rules: Dict[int, AlertRule] = {}
+        self.name_rules: List[AlertRule] = []
+        for rule in rules or []:
+            if rule.pid is not None:
+                self.pid_rules[rule.pid] = rule
+            elif rule.name is not None:
+                self.name_rules.append(rule)
+            else:
+                self.default = rule
+        self._rules: Dict[Tuple[int, str], Optional[AlertRule]] = {}
+        self._states: Dict[Tuple[int, Optional[float]], _RuleState] = {}
+    
+    @classmethod
+    def from_config(cls, filepath: str, threshold: Optional[str] = None) -> "AlertManager":
+        """Load rules from a JSON file.
+
+        The file holds ``{"default": {...}, "rules": [{...}, ...]}``; each
+        rule takes ``warning``, ``critical``, ``name`` or ``pid``,
+        ``hysteresis``, ``sustain``, ``field`` and ``max_age``. ``threshold`` is used when the
+        file has no default.
+        """
+        with open(filepath) as f:
+            config = json.load(f)
+        
+        rules = [AlertRule.from_dict(rule) for rule in config.get("rules", [])]
+        if "default" in config:
+            rules.append(AlertRule.from_dict(config["default"]))
+        return cls(threshold, rules)
+    
     def _parse_threshold(self, threshold: str):
         """Parse threshold string (e.g., '500M', '2G', '80%')."""
-        threshold = threshold.strip()
+        metric, value = parse_threshold(threshold)
+        if metric == "percent":
+            self.threshold_percent = value
+        else:
+            self.threshold_bytes = value
+    
+    def _cached_rule(self, stat) -> Optional[AlertRule]:
+        key = (stat.pid, stat.name)
+        if key in self._rules:
+            return self._rules[key]
+        rule = self._rules[key] = self._rule_for(stat.pid, stat.name)
+        return rule
+    
+    def proximity(self, stat) -> float:
+        """Return a sample's value as a fraction of its warning threshold (0 without a rule)."""
+        rule = self._cached_rule(stat)
+        if rule is None or not rule.warning:
+            return 0.0
+        return rule.value(stat) / rule.warning
+    
+    def _rule_for(self, pid: int, name: str) -> Optional[AlertRule]:
+        rule = self.pid_rules.get(pid)
+        if rule is not None:
+            return rule
+        for rule in self.name_rules:
+            if rule.pattern.search(name):
+                return rule
+        return self.default
+    
+    def _evaluate(self, state: _RuleState, value: float, now: float) -> Optional[str]:
+        rule = state.rule
+        keep = 1.0 - rule.hysteresis
+        
+        critical_on = value >= rule.critical or (
+            state.level == "critical" and value >= rule.critical * keep
+        )
+        warning_on = critical_on or value >= rule.warning or (
+            state.level is not None and value >= rule.warning * keep
+        )
+        
+        if not critical_on:
+            state.critical_since = None
+        elif state.critical_since is None:
+            state.critical_since = now
+        if not warning_on:
+            state.warning_since = None
+        elif state.warning_since is None:
+            state.warning_since = now
         
-        if threshold.endswith('%'):
-            self.threshold_percent = float(threshold[:-1])
+        if critical_on and now - state.critical_since >= rule.sustain:
+            state.level = "critical"
+        elif warning_on and now - state.warning_since >= rule.sustain:
+            state.level = "warning"
         else:
-            multipliers = {'K': 1024, 'M': 1024**2, 'G': 1024**3}
-            value = threshold.upper()
-            
-            for suffix, multiplier in multipliers.items():
-                if value.endswith(suffix):
-                    self.threshold_bytes = int(float(value[:-1]) * multiplier)
-                    return
-            
-            self.threshold_bytes = int(threshold)
+            state.level = None
+        return state.level
     
-    def check(self, stats: List) -> List[Alert]:
-        """Check if any processes exceed thresholds."""
+    def check(self, stats: List, now: Optional[float] = None) -> List[Alert]:
+        """Check if any processes exceed thresholds.
+
+        ``now`` defaults to each sample's timestamp and drives ``sustain``.
+        State for processes missing from ``stats`` is dropped.
+        """
         alerts = []
+        states: Dict[Tuple[int, Optional[float]], _RuleState] = {}
+        rules = self._rules
         
         for stat in stats:
-            alert_level = None
-            current_value = 0
-            threshold_value = 0
-            
-            if self.threshold_percent is not None:
-                current_value = stat.percent
-                threshold_value = self.threshold_percent
-                
-                if stat.percent >= self.threshold_percent * 1.2:
-                    alert_level = "critical"
-                elif stat.percent >= self.threshold_percent:
-                    alert_level = "warning"
+            key = (stat.pid, stat.name)
+            if key in rules:
+                rule = rules[key]
+            else:
+                rule = rules[key] = self._rule_for(stat.pid, stat.name)
+            if rule is None:
+                continue
             
-            elif self.threshold_bytes is not None:
-                current_value = stat.rss
-                threshold_value = self.threshold_bytes
-                
-                if stat.rss >= self.threshold_bytes * 1.2:
-                    alert_level = "critical"
-                elif stat.rss >= self.threshold_bytes:
-                    alert_level = "warning"
+            identity = (stat.pid, getattr(stat, "create_time", None))
+            state = self._states.get(identity)
+            if state is None or state.rule is not rule:
+                state = _RuleState(rule)
+            states[identity] = state
             
-            if alert_level:
+            value = rule.value(stat)
+            timestamp = now if now is not None else getattr(stat, "timestamp", time.time())
+            level = self._evaluate(state, value, timestamp)
+            if level:
                 alerts.append(Alert(
                     pid=stat.pid,
                     name=stat.name,
-                    current=current_value,
-                    threshold=threshold_value,
-                    level=alert_level
+                    current=value,
+                    threshold=rule.warning,
+                    level=level
                 ))
         
+        self._states = states
+        if len(rules) > 2 * len(stats) + 1024:
+            live = {(stat.pid, stat.name) for stat in stats}
+            self._rules = {key: rule for key, rule in rules.items() if key in live}
         return alerts
@@ -0,0 +1,189 @@
+"""Streaming offline analysis of exported samples."""
+
+import csv
+import gzip
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .export import SQLITE_SUFFIXES, parse_time
+from .history import LinearTrend, RunningStats
+from .monitor import ProcessStats
+
+# (timestamp, pid, name, rss, vms, percent)
+Sample = Tuple[float, int, str, int, int, float]
+
+
+def _iter_csv(path: Path) -> Iterator[Sample]:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, 'rt', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        # Exports write one timestamp string per tick, so parse each once
+        last_text = None
+        last_time = 0.0
+        for row in reader:
+            if row[0] != last_text:
+                last_text = row[0]
+                last_time = parse_time(row[0])
+            yield last_time, int(row[1]), row[2], int(row[3]), int(row[4]), float(row[5])
+
+
+def _iter_sqlite(path: Path) -> Iterator[Sample]:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        yield from conn.execute(
+            "SELECT timestamp, pid, name, rss, vms, percent FROM samples ORDER BY timestamp"
+        )
+    finally:
+        conn.close()
+
+
+def _iter_trace(path: Path) -> Iterator[Sample]:
+    from .trace import TraceReader
+    
+    with TraceReader(str(path)) as reader:
+        yield from reader.records()
+
+
+def iter_samples(filepath: str) -> Iterator[Sample]:
+    """Stream samples from any supported export format, oldest first."""
+    path = Path(filepath)
+    if path.suffix == ".mwt":
+        return _iter_trace(path)
+    if path.suffix in SQLITE_SUFFIXES:
+        return _iter_sqlite(path)
+    return _iter_csv(path)
+
+
+def iter_ticks(samples: Iterable[Sample]) -> Iterator[Tuple[float, List[ProcessStats]]]:
+    """Group a sample stream into (timestamp, stats) ticks."""
+    current: List[ProcessStats] = []
+    current_time: Optional[float] = None
+    
+    for timestamp, pid, name, rss, vms, percent in samples:
+        if current and timestamp != current_time:
+            yield current_time, current
+            current = []
+        current_time = timestamp
+        current.append(ProcessStats(pid=pid, name=name, rss=rss, vms=vms, percent=percent, timestamp=timestamp))
+    
+    if current:
+        yield current_time, current
+
+
+class ProcessAnalysis:
+    """Running statistics for one process identity in a trace."""
+    
+    def __init__(self, pid: int, name: str):
+        self.pid = pid
+        self.name = name
+        self.rss = RunningStats()
+        self.percent = RunningStats()
+        self.trend = LinearTrend()
+        self.peak_time = 0.0
+        self.first = 0.0
+        self.last = 0.0
+    
+    def add(self, timestamp: float, rss: int, percent: float):
+        if not self.rss.count:
+            self.first = timestamp
+        if self.rss.max is None or rss > self.rss.max:
+            self.peak_time = timestamp
+        self.last = timestamp
+        self.rss.add(rss)
+        self.percent.add(percent)
+        self.trend.add(timestamp, rss)
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "pid": self.pid,
+            "name": self.name,
+            "samples": self.rss.count,
+            "min_rss": self.rss.min,
+            "max_rss": self.rss.max,
+            "avg_rss": self.rss.mean,
+            "std_rss": self.rss.stddev,
+            "avg_percent": self.percent.mean,
+            "peak_time": self.peak_time,
+            "first": self.first,
+            "last": self.last,
+            "growth_per_hour": self.trend.slope * 3600
+        }
+
+
+class StreamingAnalyzer:
+    """Single-pass, constant-memory summary of a sample stream.
+
+    Memory grows with the number of distinct processes, not with the
+    length of the trace.
+    """
+    
+    def __init__(self, pid: Optional[int] = None):
+        self.pid = pid
+        self.rss = RunningStats()
+        self.percent = RunningStats()
+        self.ticks = 0
+        self.processes: Dict[Tuple[int, str], ProcessAnalysis] = {}
+        self._last_time: Optional[float] = None
+    
+    def add(self, sample: Sample):
+        timestamp, pid, name, rss, _, percent = sample
+        if self.pid is not None and pid != self.pid:
+            return
+        
+        if timestamp != self._last_time:
+            self.ticks += 1
+            self._last_time = timestamp
+        self.rss.add(rss)
+        self.percent.add(percent)
+        
+        key = (pid, name)
+        process = self.processes.get(key)
+        if process is None:
+            process = self.processes[key] = ProcessAnalysis(pid, name)
+        process.add(timestamp, rss, percent)
+    
+    def consume(self, samples: Iterable[Sample]) -> "StreamingAnalyzer":
+        for sample in samples:
+            self.add(sample)
+        return self
+    
+    def summary(self) -> Dict[str, Any]:
+        """Global statistics with the same keys as MemoryMonitor.get_summary."""
+        if not self.rss.count:
+            return {}
+        return {
+            "min_rss": self.rss.min,
+            "max_rss": self.rss.max,
+            "avg_rss": self.rss.mean,
+            "std_rss": self.rss.stddev,
+            "min_percent": self.percent.min,
+            "max_percent": self.percent.max,
+            "avg_percent": self.percent.mean,
+            "std_percent": self.percent.stddev,
+            "samples": self.ticks,
+            "process_samples": self.rss.count
+        }
+    
+    def per_process(self) -> List[Dict[str, Any]]:
+        """Per-process breakdown, largest peak first."""
+        rows = [process.summary() for process in self.processes.values()]
+        rows.sort(key=lambda row: row["max_rss"], reverse=True)
+        return rows
+
+
+def replay(
+    samples: Iterable[Sample],
+    display,
+    speed: float = 1.0,
+    sleep=time.sleep
+):
+    """Drive a Display with recorded ticks at ``speed`` times real time."""
+    previous: Optional[float] = None
+    for timestamp, stats in iter_ticks(samples):
+        if previous is not None and speed > 0:
+            sleep(max(timestamp - previous, 0) / speed)
+        previous = timestamp
+        display.show(stats)
@@ -1,14 +1,18 @@
 """CLI interface for mem-watch."""
 
 import argparse
+import os
+import signal
 import sys
 import time
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
-from .monitor import MemoryMonitor
+from .monitor import MemoryMonitor, Target
 from .alerts import AlertManager
-from .display import Display
-from .export import CSVExporter
+from .leak import LeakDetector
+from .profiling import NULL_PROFILER, Profiler
+from .scheduler import AdaptiveSchedule, FixedRateSampler
+from .top import GROUP_KEYS, SORT_KEYS, TopK
 
 
 def parse_memory_value(value: str) -> int:
@@ -22,82 +26,798 @@ def parse_memory_value(value: str) -> int:
     return int(value)
 
 
-def main():
+TARGET_OPTIONS = ("children", "threshold=", "export=")
+
+
+def parse_target(spec: str) -> Tuple[Target, Optional[str], Optional[str]]:
+    """Parse 'LABEL=pid:N|name:REGEX[,children][,threshold=T][,export=FILE]'.
+
+    Returns (target, threshold, export). Comma-separated pieces that are
+    not options stay part of the selector, so regexes may contain commas.
+    """
+    label, sep, rest = spec.partition("=")
+    if not sep or not label:
+        raise ValueError(f"Target must look like LABEL=pid:N or LABEL=name:REGEX: {spec}")
+    
+    selector = []
+    options: Dict[str, str] = {}
+    for piece in rest.split(","):
+        if selector and piece.startswith(TARGET_OPTIONS):
+            key, _, value = piece.partition("=")
+            options[key] = value
+        else:
+            selector.append(piece)
+    kind, _, value = ",".join(selector).partition(":")
+    
+    children = "children" in options
+    if kind == "pid":
+        target = Target(pid=int(value), include_children=children, label=label)
+    elif kind == "name" and value:
+        target = Target(name_pattern=value, include_children=children, label=label)
+    else:
+        raise ValueError(f"Target selector must be pid:N or name:REGEX: {spec}")
+    return target, options.get("threshold") or None, options.get("export") or None
+
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(value: str) -> float:
+    """Parse a duration like '90s', '15m', '12h' or '7d' (plain numbers are seconds)."""
+    value = value.strip()
+    unit = value[-1:].lower()
+    if unit in DURATION_UNITS:
+        return float(value[:-1]) * DURATION_UNITS[unit]
+    return float(value)
+
+
+def parse_time_value(value: str, now: Optional[float] = None) -> float:
+    """Parse a time as epoch seconds, a date/time, or an age like '90m', '12h', '2d'."""
+    value = value.strip()
+    
+    if value[-1:].lower() in DURATION_UNITS:
+        if now is None:
+            now = time.time()
+        return now - parse_duration(value)
+    
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(value, fmt))
+        except ValueError:
+            continue
+    return float(value)
+
+
+def _grouped(monitor: MemoryMonitor, collect):
+    """Wrap collect to return (stats, stats per target).
+
+    The split runs on the sampler thread, before the next scan can
+    re-resolve the targets.
+    """
+    def collect_grouped():
+        stats = collect()
+        return stats, monitor.by_target(stats)
+    return collect_grouped
+
+
+def _raise_interrupt(signum, frame):
+    """Turn SIGTERM into KeyboardInterrupt so shutdown paths run."""
+    raise KeyboardInterrupt
+
+
+def convert_main(argv: List[str]):
+    """Convert exported data between CSV and binary trace formats."""
+    from .trace import csv_to_trace, trace_to_csv
+    
+    parser = argparse.ArgumentParser(
+        prog="mem-watch convert",
+        description="Convert exported data between CSV and binary trace (.mwt) formats"
+    )
+    parser.add_argument("source", help="Input file")
+    parser.add_argument("destination", help="Output file")
+    args = parser.parse_args(argv)
+    
+    source_is_trace = args.source.endswith(".mwt")
+    destination_is_trace = args.destination.endswith(".mwt")
+    if source_is_trace == destination_is_trace:
+        parser.error("Exactly one of source and destination must be a .mwt trace")
+    
+    try:
+        if source_is_trace:
+            trace_to_csv(args.source, args.destination)
+        else:
+            csv_to_trace(args.source, args.destination)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def query_main(argv: List[str]):
+    """Report per-process RSS statistics from a SQLite export."""
+    import sqlite3
+    from rich.table import Table
+    from .display import Display
+    from .store import query
+    
+    parser = argparse.ArgumentParser(
+        prog="mem-watch query",
+        description="Per-process memory statistics from a SQLite export"
+    )
+    parser.add_argument("database", help="SQLite file written with --export")
+    parser.add_argument("-p", "--pid", type=int, help="Only this process ID")
+    parser.add_argument("-n", "--name", help="Only processes with this exact name")
+    parser.add_argument(
+        "--since", help="Start of window (epoch, 'YYYY-MM-DD HH:MM:SS' or age like '12h')"
+    )
+    parser.add_argument("--until", help="End of window (same formats as --since)")
+    args = parser.parse_args(argv)
+    
+    try:
+        since = parse_time_value(args.since) if args.since else None
+        until = parse_time_value(args.until) if args.until else None
+        rows = query(args.database, since=since, until=until, pid=args.pid, name=args.name)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    if not rows:
+        print("No samples found")
+        return
+    
+    display = Display(show_graph=False)
+    table = Table(title="Memory Usage History", show_header=True)
+    for column in ("PID", "Process", "Samples", "Min", "Avg", "Max", "p50", "p95", "p99"):
+        table.add_column(column, justify="left" if column == "Process" else "right")
+    for row in rows:
+        table.add_row(
+            str(row["pid"]),
+            row["name"],
+            str(row["samples"]),
+            display._format_bytes(row["min_rss"]),
+            display._format_bytes(row["avg_rss"]),
+            display._format_bytes(row["max_rss"]),
+            display._format_bytes(row["p50_rss"]),
+            display._format_bytes(row["p95_rss"]),
+            display._format_bytes(row["p99_rss"])
+        )
+    display.console.print(table)
+
+
+def analyze_main(argv: List[str]):
+    """Summarize an exported trace in a single streaming pass."""
+    import json
+    import sqlite3
+    from rich.table import Table
+    from .analyze import StreamingAnalyzer, iter_samples, replay
+    from .display import Display
+    
+    parser = argparse.ArgumentParser(
+        prog="mem-watch analyze",
+        description="Summarize or replay an exported CSV, SQLite or .mwt file"
+    )
+    parser.add_argument("file", help="File written with --export")
+    parser.add_argument("-p", "--pid", type=int, help="Only this process ID")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    parser.add_argument(
+        "--replay", action="store_true", help="Replay the recording through the live display"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0,
+        help="Replay speed multiplier, 0 for as fast as possible (default: 1.0)"
+    )
+    args = parser.parse_args(argv)
+    
+    try:
+        samples = iter_samples(args.file)
+        if args.pid is not None:
+            samples = (s for s in samples if s[1] == args.pid)
+        
+        if args.replay:
+            display = Display(live=True)
+            display.start()
+            try:
+                replay(samples, display, speed=args.speed)
+            except KeyboardInterrupt:
+                pass
+            finally:
+                display.stop()
+            return
+        
+        analyzer = StreamingAnalyzer().consume(samples)
+    except (OSError, ValueError, IndexError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    summary = analyzer.summary()
+    if not summary:
+        print("No samples found")
+        return
+    processes = analyzer.per_process()
+    
+    if args.json:
+        print(json.dumps({"summary": summary, "processes": processes}, indent=2))
+        return
+    
+    display = Display(show_graph=False)
+    display.console.print(
+        f"{summary['samples']} ticks, RSS min {display._format_bytes(summary['min_rss'])}, "
+        f"avg {display._format_bytes(summary['avg_rss'])}, "
+        f"max {display._format_bytes(summary['max_rss'])}"
+    )
+    table = Table(title="Per-Process Breakdown", show_header=True)
+    for column in ("PID", "Process", "Samples", "Min", "Avg", "Max", "Peak At", "Growth/h"):
+        table.add_column(column, justify="left" if column in ("Process", "Peak At") else "right")
+    for row in processes:
+        growth = row["growth_per_hour"]
+        sign = "-" if growth < 0 else "+"
+        table.add_row(
+            str(row["pid"]),
+            row["name"],
+            str(row["samples"]),
+            display._format_bytes(row["min_rss"]),
+            display._format_bytes(row["avg_rss"]),
+            display._format_bytes(row["max_rss"]),
+            time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(row["peak_time"])),
+            sign + display._format_bytes(abs(growth))
+        )
+    display.console.print(table)
+
+
+def daemon_main(argv: List[str]):
+    """Run the shared sampler daemon."""
+    from .daemon import SamplerDaemon, default_socket_path
+    
+    parser = argparse.ArgumentParser(
+        prog="mem-watch daemon",
+        description="Sample once per tick for every connected mem-watch --connect client"
+    )
+    parser.add_argument(
+        "--socket", default=default_socket_path(),
+        help="Unix socket to listen on (default: $XDG_RUNTIME_DIR/mem-watch.sock)"
+    )
+    parser.add_argument(
+        "-i", "--interval", type=float, default=1.0, help="Sampling interval in seconds (default: 1.0)"
+    )
+    parser.add_argument(
+        "-p", "--pid", type=int, action="append", default=[],
+        help="Process ID to watch before any client asks for it (repeatable)"
+    )
+    parser.add_argument(
+        "-n", "--name", action="append", default=[],
+        help="Process name pattern to watch before any client asks for it (repeatable)"
+    )
+    parser.add_argument("-c", "--children", action="store_true", help="Include child processes")
+    parser.add_argument(
+        "--history-size", type=int, default=100,
+        help="Ticks of history sent to new clients (default 100)"
+    )
+    parser.add_argument(
+        "--backend", choices=["psutil", "procfs"], default="psutil",
+        help="Sampling backend (procfs reads /proc directly, Linux only)"
+    )
+    args = parser.parse_args(argv)
+    
+    targets = [Target(pid=pid, include_children=args.children) for pid in args.pid]
+    targets += [Target(name_pattern=name, include_children=args.children) for name in args.name]
+    
+    daemon = None
+    sampler = None
+    try:
+        daemon = SamplerDaemon(
+            args.socket,
+            backend=args.backend,
+            history_size=args.history_size,
+            targets=targets
+        )
+        daemon.start()
+        signal.signal(signal.SIGTERM, _raise_interrupt)
+        print(f"Listening on {args.socket}")
+        
+        sampler = FixedRateSampler(daemon.tick, args.interval)
+        sampler.start()
+        for _ in sampler.ticks():
+            pass
+    except KeyboardInterrupt:
+        pass
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if sampler:
+            sampler.stop()
+        if daemon:
+            daemon.close()
+
+
+COMMANDS = {
+    "analyze": analyze_main,
+    "convert": convert_main,
+    "daemon": daemon_main,
+    "query": query_main,
+}
+
+
+def main(argv: Optional[List[str]] = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+    
     parser = argparse.ArgumentParser(
         description="Monitor process memory usage with alerts and history tracking"
     )
     parser.add_argument("-p", "--pid", type=int, help="Process ID to monitor")
     parser.add_argument("-n", "--name", help="Process name pattern (regex)")
+    parser.add_argument(
+        "-T", "--target", action="append", default=[],
+        help="Named target 'LABEL=pid:N|name:REGEX[,children][,threshold=1G][,export=FILE]' "
+             "(repeatable; all targets share one process scan)"
+    )
+    parser.add_argument(
+        "-a", "--all", action="store_true", help="Monitor every process on the system"
+    )
+    parser.add_argument(
+        "-g", "--cgroup", action="append",
+        help="cgroup v2 path or glob to monitor, e.g. 'system.slice/*.service' "
+             "(repeatable; with --children, also show member processes)"
+    )
+    parser.add_argument(
+        "--cgroup-root", default="/sys/fs/cgroup", help="cgroup v2 mount point"
+    )
+    parser.add_argument(
+        "--top", type=int,
+        help="Only display the K largest processes (default 20 with --all)"
+    )
+    parser.add_argument(
+        "--sort", choices=SORT_KEYS, default="rss",
+        help="Rank --top rows by RSS, PSS (needs --detail-interval) or growth rate"
+    )
+    parser.add_argument(
+        "--detail-interval", type=float,
+        help="Read PSS/USS/swap from smaps_rollup every N seconds per process (Linux)"
+    )
+    parser.add_argument(
+        "--detail-budget", type=float, default=20.0,
+        help="Milliseconds per tick spent on detail reads (default 20)"
+    )
+    parser.add_argument(
+        "--group-by", choices=GROUP_KEYS, help="Aggregate --top rows by process name or user"
+    )
     parser.add_argument(
         "-i", "--interval", type=float, default=1.0, help="Sampling interval in seconds"
     )
+    parser.add_argument(
+        "--max-interval", type=float,
+        help="Back off stable processes up to this interval; --interval becomes the "
+             "fastest rate, used while RSS changes quickly or nears the threshold"
+    )
     parser.add_argument(
         "-t", "--threshold", help="Memory threshold (e.g., '500M', '2G', '80%%')"
     )
+    parser.add_argument(
+        "--alert-config",
+        help="JSON file with per-process alert rules (warning/critical, hysteresis, sustain)"
+    )
+    parser.add_argument(
+        "--leak", action="store_true",
+        help="Alert on sustained RSS growth with the projected time to the limit"
+    )
+    parser.add_argument(
+        "--leak-rate", default="1M",
+        help="Minimum growth per hour reported as a leak (default: 1M)"
+    )
     parser.add_argument(
         "-c", "--children", action="store_true", help="Include child processes"
     )
     parser.add_argument(
-        "-e", "--export", help="Export data to CSV file"
+        "-e", "--export", help="Export data to CSV file (or binary trace with .mwt extension)"
+    )
+    parser.add_argument(
+        "--rotate-size", help="Rotate the export file at this size (e.g., '100M')"
+    )
+    parser.add_argument(
+        "--rotate-age", type=float, help="Rotate the export file after this many seconds"
+    )
+    parser.add_argument(
+        "--compress", action="store_true", help="Gzip rotated export files"
+    )
+    parser.add_argument(
+        "--flush-interval", type=float,
+        help="Seconds between CSV export flushes (default 5)"
+    )
+    parser.add_argument(
+        "--fsync", action="store_true", help="fsync the export file on every flush"
     )
     parser.add_argument(
         "-d", "--duration", type=int, help="Monitoring duration in seconds"
     )
+    parser.add_argument(
+        "--once", action="store_true", help="Take a single sample, output it and exit"
+    )
+    parser.add_argument(
+        "--format", choices=["auto", "table", "json"], default="auto",
+        help="Output a table or one JSON line per sample; auto picks JSON "
+             "when stdout is not a terminal (default auto)"
+    )
     parser.add_argument(
         "--no-graph", action="store_true", help="Disable ASCII graph display"
     )
-
-    args = parser.parse_args()
-
-    if not args.pid and not args.name:
-        parser.error("Either --pid or --name must be specified")
-
+    parser.add_argument(
+        "--trend-by", choices=["pid", "name"], default="pid",
+        help="Draw per-row trend lines per PID or per process name"
+    )
+    parser.add_argument(
+        "--trend-window", type=parse_duration, metavar="DURATION",
+        help="Draw trend lines over this much history, e.g. '1h' or '7d', "
+             "from the rollup matching the window (default: the last samples)"
+    )
+    parser.add_argument(
+        "--live", action="store_true",
+        help="Update the display in place instead of redrawing every sample"
+    )
+    parser.add_argument(
+        "--fps", type=float, default=10.0,
+        help="Maximum frames per second in live mode (default 10)"
+    )
+    parser.add_argument(
+        "--history-size", type=int, default=300,
+        help="Raw samples kept per process before 10s/1m/1h rollups take over (default 300)"
+    )
+    parser.add_argument(
+        "--history-budget", type=float, default=16.0,
+        help="Memory budget for history in MB; least recently seen processes "
+             "are dropped beyond it (default 16)"
+    )
+    parser.add_argument(
+        "--backend", choices=["psutil", "procfs"], default="psutil",
+        help="Sampling backend (procfs reads /proc directly, Linux only)"
+    )
+    parser.add_argument(
+        "--watch-exits", action="store_true",
+        help="Report process exits as they happen using pidfds (polling on older kernels)"
+    )
+    parser.add_argument(
+        "--connect", nargs="?", const="", metavar="SOCKET",
+        help="Display samples from a running 'mem-watch daemon' instead of scanning "
+             "(default socket: $XDG_RUNTIME_DIR/mem-watch.sock)"
+    )
+    parser.add_argument(
+        "--metrics-port", type=int,
+        help="Serve the latest sample and alerts as OpenMetrics on this port at /metrics"
+    )
+    parser.add_argument(
+        "--metrics-host", default="127.0.0.1",
+        help="Address for --metrics-port to listen on (default 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--profile", nargs="?", const="-", metavar="FILE",
+        help="Time mem-watch's own phases and write a JSON report on exit "
+             "(to stderr, or FILE)"
+    )
+    parser.add_argument(
+        "--profile-panel", action="store_true",
+        help="Show per-phase timings and own RSS/CPU below the table"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    if not args.pid and not args.name and not args.all and not args.cgroup and not args.target:
+        parser.error("Either --pid, --name, --target, --cgroup or --all must be specified")
+    if args.target and (args.pid or args.name or args.all or args.cgroup):
+        parser.error("--target cannot be combined with --pid, --name, --cgroup or --all")
+    if args.connect is not None and (
+        args.all or args.cgroup or args.target
+        or args.max_interval is not None or args.detail_interval is not None
+    ):
+        parser.error("--connect only supports --pid and --name targets")
+    if args.max_interval is not None and args.all and args.backend != "procfs":
+        parser.error("--max-interval with --all needs --backend procfs")
+    if args.watch_exits and (args.all or args.cgroup or args.connect is not None):
+        parser.error("--watch-exits needs --pid, --name or --target")
+    try:
+        targets = [parse_target(spec) for spec in args.target]
+    except ValueError as e:
+        parser.error(str(e))
+    csv_only = [
+        flag for flag, value in (
+            ("--rotate-size", args.rotate_size), ("--rotate-age", args.rotate_age),
+            ("--compress", args.compress), ("--flush-interval", args.flush_interval),
+            ("--fsync", args.fsync)
+        )
+        if value is not None and value is not False
+    ]
+    if csv_only:
+        from .export import SQLITE_SUFFIXES
+        for path in [args.export] + [path for _, _, path in targets]:
+            if path and (path.endswith(".mwt") or path.endswith(SQLITE_SUFFIXES)):
+                parser.error(f"{', '.join(csv_only)} only supported for CSV exports, not {path}")
+    if args.all and args.top is None:
+        args.top = 20
+    duration = 0 if args.once else args.duration
+    # Headless output never imports rich; messages move to stderr to keep stdout parseable
+    headless = args.format == "json" or (args.format == "auto" and not sys.stdout.isatty())
+    info = sys.stderr if headless else sys.stdout
+    if args.detail_interval is not None:
+        for path in [args.export] + [path for _, _, path in targets]:
+            if path and path.endswith(".mwt"):
+                print(f"Warning: {path} stores no PSS/USS/swap; export to CSV or SQLite to keep them", file=info)
+    
+    monitor = None
+    sampler = None
+    exporter = None
+    target_exporters: Dict[Target, object] = {}
+    display = None
+    writer = None
+    metrics = None
+    profiler = Profiler() if args.profile or args.profile_panel else NULL_PROFILER
     try:
+        alert_manager = None
+        if args.alert_config:
+            alert_manager = AlertManager.from_config(args.alert_config, args.threshold)
+        elif args.threshold:
+            alert_manager = AlertManager(args.threshold)
+        
+        schedule = None
+        if args.max_interval is not None:
+            schedule = AdaptiveSchedule(
+                args.interval,
+                args.max_interval,
+                proximity=alert_manager.proximity if alert_manager else None
+            )
+        
         monitor = MemoryMonitor(
             pid=args.pid,
             name_pattern=args.name,
             include_children=args.children,
-            interval=args.interval
+            interval=args.interval,
+            backend=args.backend,
+            history_size=args.history_size,
+            history_budget=int(args.history_budget * 1024 * 1024),
+            all_processes=args.all,
+            cgroups=args.cgroup,
+            cgroup_root=args.cgroup_root,
+            detail_interval=args.detail_interval,
+            detail_budget=args.detail_budget / 1000,
+            schedule=schedule,
+            profiler=profiler,
+            targets=[target for target, _, _ in targets],
+            watch_exits=args.watch_exits
         )
+        target_alerts = {
+            target: AlertManager(threshold) for target, threshold, _ in targets if threshold
+        }
         
-        alert_manager = None
-        if args.threshold:
-            alert_manager = AlertManager(args.threshold)
+        top = None
+        if args.top is not None or args.group_by:
+            top = TopK(
+                k=args.top or 20,
+                sort=args.sort,
+                group_by=args.group_by,
+                user_of=monitor.username
+            )
+        
+        leak_detector = None
+        if args.leak:
+            leak_detector = LeakDetector(
+                min_rate=parse_memory_value(args.leak_rate) / 3600,
+                limit=alert_manager.threshold_bytes if alert_manager else None
+            )
+        
+        if headless:
+            from .jsonl import JSONLinesWriter
+            writer = JSONLinesWriter()
+        else:
+            from .display import Display
+            display = Display(
+                show_graph=not args.no_graph,
+                live=args.live,
+                max_fps=args.fps,
+                trend_by=args.trend_by,
+                history=monitor.history,
+                trend_window=args.trend_window,
+                profiler=profiler if args.profile_panel else None
+            )
+            display.start()
+        export_options = dict(
+            fsync=args.fsync,
+            max_bytes=parse_memory_value(args.rotate_size) if args.rotate_size else None,
+            max_age=args.rotate_age,
+            compress=args.compress,
+            detail=args.detail_interval is not None,
+            subsecond=schedule is not None,
+            profiler=profiler
+        )
+        if args.flush_interval is not None:
+            export_options["flush_interval"] = args.flush_interval
+        if args.export or any(path for _, _, path in targets):
+            from .export import create_exporter
+            if args.export:
+                exporter = create_exporter(args.export, **export_options)
+            for target, _, path in targets:
+                if path:
+                    target_exporters[target] = create_exporter(path, **export_options)
+        
+        if args.metrics_port is not None:
+            from .metrics import MetricsServer
+            metrics = MetricsServer(args.metrics_host, args.metrics_port)
+            metrics.start()
         
-        display = Display(show_graph=not args.no_graph)
-        exporter = CSVExporter(args.export) if args.export else None
+        signal.signal(signal.SIGTERM, _raise_interrupt)
         
-        start_time = time.time()
+        if args.connect is not None:
+            from .daemon import DaemonClient, default_socket_path
+            # The daemon does the sampling; this process only renders
+            sampler = DaemonClient(
+                args.connect or default_socket_path(),
+                pid=args.pid,
+                name=args.name,
+                children=args.children,
+                duration=duration
+            )
+            sampler.start()
+            for _, past in sampler.history:
+                monitor.history.record(past)
+                if display:
+                    display.seed(past)
+        else:
+            # In top-K mode only the displayed rows are kept in the history
+            collect = monitor.collect if top is None else lambda: monitor.collect(record=False)
+            if targets:
+                collect = _grouped(monitor, collect)
+            sampler = FixedRateSampler(collect, args.interval, duration=duration)
+            sampler.start()
         
-        while True:
-            stats = monitor.collect()
+        last_exit = None
+        exited = False
+        for tick in sampler.ticks():
+            stats = tick.stats
+            groups = None
+            if targets:
+                stats, groups = stats
             
-            if not stats:
-                print("No matching processes found")
+            # Exits are popped first so the tick that finds the last process
+            # gone still reports it
+            exits = monitor.pop_exits()
+            exited = exited or bool(exits)
+            if not stats and not exited:
+                print("No matching processes found", file=info)
                 sys.exit(1)
+            if args.connect is not None and top is None:
+                monitor.history.record(stats)
+            
+            status = None
+            problems = []
+            if tick.missed:
+                problems.append(f"Missed {tick.missed} sampling deadline(s)")
+            if sampler.dropped:
+                problems.append(f"dropped {sampler.dropped} tick(s) while behind")
+            deferred = monitor.details.deferred if monitor.details is not None else 0
+            if deferred:
+                problems.append(f"{deferred} detail read(s) deferred")
+            if problems:
+                status = ", ".join(problems)
+            for event in exits if display else ():
+                last_exit = (
+                    f"{event.stat.name} (PID {event.stat.pid}) exited at "
+                    f"{time.strftime('%H:%M:%S', time.localtime(event.timestamp))}, "
+                    f"last RSS {display._format_bytes(event.stat.rss)}"
+                )
+            if last_exit:
+                status = f"{last_exit} | {status}" if status else last_exit
+            
+            profiler.tick()
             
+            alerts = []
             if alert_manager:
-                alerts = alert_manager.check(stats)
-                display.show(stats, alerts)
-            else:
-                display.show(stats)
+                with profiler.phase("alerts"):
+                    alerts = alert_manager.check(stats)
+            if target_alerts:
+                with profiler.phase("alerts"):
+                    for target, manager in target_alerts.items():
+                        alerts += manager.check(groups.get(target, []))
+            if leak_detector:
+                with profiler.phase("leak"):
+                    alerts += leak_detector.check(stats)
             
-            if exporter:
-                exporter.write(stats)
+            if metrics:
+                with profiler.phase("metrics"):
+                    metrics.update(stats, alerts, tick.timestamp)
             
-            if args.duration and (time.time() - start_time) >= args.duration:
-                break
+            with profiler.phase("top"):
+                rows = None if top is None else top.select(stats)
+            if monitor.details is not None:
+                # Refresh details for alerting and top-K rows ahead of the rest
+                priority = {alert.pid for alert in alerts}
+                if rows is not None:
+                    priority.update(getattr(row, "leader", row.pid) for row in rows)
+                monitor.details.priority = priority
+            
+            sections = None
+            total_rss = None
+            if top is not None:
+                monitor.history.record([row for row in rows if row.timestamp >= tick.timestamp])
+                shown = f"Top {len(rows)} of {top.count} processes"
+                status = f"{shown} | {status}" if status else shown
+                total_rss = top.total
+            elif groups is not None:
+                sections = [(target.label, groups.get(target, [])) for target, _, _ in targets]
+            with profiler.phase("render"):
+                if writer:
+                    writer.write(
+                        tick.timestamp,
+                        stats if rows is None else rows,
+                        alerts,
+                        total_rss=total_rss,
+                        groups=sections,
+                        exits=exits,
+                        missed=tick.missed,
+                        dropped=sampler.dropped,
+                        deferred=deferred
+                    )
+                else:
+                    display.show(
+                        stats if rows is None else rows,
+                        alerts or None,
+                        status=status,
+                        total_rss=total_rss,
+                        groups=sections
+                    )
             
-            time.sleep(args.interval)
+            if exporter or target_exporters:
+                # Rows carried over by the adaptive schedule were exported when sampled
+                fresh = None
+                if schedule is not None:
+                    fresh = {stat.pid for stat in stats if stat.timestamp >= tick.timestamp}
+                with profiler.phase("export"):
+                    if exporter:
+                        exporter.write(stats if fresh is None else [s for s in stats if s.pid in fresh])
+                    for target, target_exporter in target_exporters.items():
+                        members = groups.get(target, [])
+                        target_exporter.write(members if fresh is None else [s for s in members if s.pid in fresh])
+            
+            if not stats:
+                print("All monitored processes exited", file=info)
+                break
             
     except KeyboardInterrupt:
-        print("\n\nMonitoring stopped")
         if exporter:
-            print(f"Data exported to {args.export}")
+            exporter.close()
+        print("\n\nMonitoring stopped", file=info)
+        if sampler and sampler.missed:
+            print(f"Missed {sampler.missed} sampling deadline(s)", file=info)
+        if sampler and sampler.dropped:
+            print(f"Dropped {sampler.dropped} tick(s) while output fell behind", file=info)
+        if exporter:
+            print(f"Data exported to {args.export}", file=info)
+        for _, _, path in targets:
+            if path:
+                print(f"Data exported to {path}", file=info)
+        sys.exit(0)
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
         sys.exit(0)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if sampler:
+            sampler.stop()
+        if display:
+            display.stop()
+        if metrics:
+            metrics.close()
+        if exporter:
+            exporter.close()
+        for target_exporter in target_exporters.values():
+            target_exporter.close()
+        if monitor:
+            monitor.close()
+        if args.profile:
+            profiler.dump(args.profile)
+        if args.export and profiler.enabled:
+            # Keep the overhead report next to the data it was measured on
+            profiler.dump(f"{args.export}.profile.json")
 
 
 if __name__ == "__main__":
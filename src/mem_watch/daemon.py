@@ -0,0 +1,396 @@
+"""Shared sampler daemon serving samples over a Unix domain socket.
+
+Messages are JSON objects sent as frames: a 4-byte big-endian length
+followed by the compact UTF-8 encoding. A client sends one request per
+frame:
+
+``{"op": "subscribe", "pid": ..., "name": ..., "children": ...}``
+    Reply with a ``history`` frame of recent ticks for the target, then
+    stream one ``tick`` frame per sample until the client disconnects.
+``{"op": "history", ...}``
+    Reply with a ``history`` frame only.
+``{"op": "status"}``
+    Reply with subscription and client counts.
+
+Sample rows are ``[pid, name, rss, vms, percent, timestamp]``.
+"""
+
+import json
+import os
+import queue
+import select
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .monitor import MemoryMonitor, ProcessStats, Target
+from .scheduler import Tick
+from .snapshot import Snapshot
+
+HEADER = struct.Struct(">I")
+MAX_FRAME = 64 * 1024 * 1024
+
+
+def default_socket_path() -> str:
+    """Per-user runtime directory if available, else /tmp."""
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    return os.path.join(runtime or "/tmp", "mem-watch.sock")
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(len(body)) + body
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Read one frame, returning None when the peer has closed the socket."""
+    header = _recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME:
+        raise ValueError(f"Frame too large: {size} bytes")
+    body = _recv_exact(sock, size)
+    if body is None:
+        return None
+    return json.loads(body)
+
+
+def stats_rows(stats: List[ProcessStats]) -> List[list]:
+    return [[s.pid, s.name, s.rss, s.vms, s.percent, s.timestamp] for s in stats]
+
+
+def snapshot_rows(snapshot: Snapshot) -> List[list]:
+    timestamp = snapshot.timestamp
+    return [[pid, name, rss, vms, percent, timestamp] for pid, name, rss, vms, percent in snapshot.rows()]
+
+
+def rows_stats(rows: List[list]) -> List[ProcessStats]:
+    return [
+        ProcessStats(pid=pid, name=name, rss=rss, vms=vms, percent=percent, timestamp=timestamp)
+        for pid, name, rss, vms, percent, timestamp in rows
+    ]
+
+
+def _target_key(request: Dict[str, Any]) -> Tuple[Optional[int], Optional[str], bool]:
+    return request.get("pid"), request.get("name"), bool(request.get("children"))
+
+
+def _key_of(target: Target) -> Tuple[Optional[int], Optional[str], bool]:
+    pattern = target.name_pattern.pattern if target.name_pattern else None
+    return target.pid, pattern, target.include_children
+
+
+def _peer_closed(sock: socket.socket) -> bool:
+    readable, _, _ = select.select([sock], [], [], 0)
+    return bool(readable) and not sock.recv(1, socket.MSG_PEEK)
+
+
+class _Client:
+    """Outgoing frame queue for one subscriber; the oldest frame is dropped when full."""
+    
+    def __init__(self, backlog: int):
+        self.frames: queue.Queue = queue.Queue(maxsize=backlog)
+        self.dropped = 0
+    
+    def push(self, frame: Optional[bytes]):
+        while True:
+            try:
+                self.frames.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+
+class _Subscription:
+    """A target shared by every client that asked for the same processes."""
+    
+    def __init__(self, target: Target):
+        self.target = target
+        self.clients: List[_Client] = []
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        daemon: SamplerDaemon = self.server.owner
+        sock = self.request
+        while True:
+            try:
+                request = recv_frame(sock)
+            except (OSError, ValueError):
+                return
+            if request is None:
+                return
+            
+            op = request.get("op")
+            if op == "subscribe":
+                self._stream(daemon, sock, request)
+                return
+            if op == "history":
+                reply = daemon.history(_target_key(request))
+            elif op == "status":
+                reply = daemon.status()
+            else:
+                reply = {"type": "error", "message": f"Unknown op: {op}"}
+            try:
+                sock.sendall(encode_frame(reply))
+            except OSError:
+                return
+    
+    def _stream(self, daemon: "SamplerDaemon", sock: socket.socket, request: Dict[str, Any]):
+        key = _target_key(request)
+        client, history = daemon.subscribe(key)
+        try:
+            sock.sendall(encode_frame(history))
+            while True:
+                try:
+                    frame = client.frames.get(timeout=0.5)
+                except queue.Empty:
+                    # Notice disconnected clients between ticks
+                    if _peer_closed(sock):
+                        return
+                    continue
+                if frame is None:
+                    return
+                sock.sendall(frame)
+        except OSError:
+            return
+        finally:
+            daemon.unsubscribe(key, client)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class SamplerDaemon:
+    """Sample the union of all subscribed targets once per tick.
+
+    Clients asking for the same (pid, name, children) share one target,
+    and each tick's frame for a target is encoded once for all of them.
+    The last ``history_size`` ticks of the union are kept as Snapshots so a
+    new client immediately gets recent samples for its processes.
+    ``targets`` are watched even without subscribers, so their history
+    is already there when a client connects.
+    """
+    
+    def __init__(
+        self,
+        socket_path: str,
+        backend: str = "psutil",
+        proc_root: str = "/proc",
+        history_size: int = 100,
+        targets: Optional[List[Target]] = None,
+        backlog: int = 64
+    ):
+        self.socket_path = socket_path
+        self.backlog = backlog
+        self.monitor = MemoryMonitor(backend=backend, proc_root=proc_root, targets=targets)
+        self.standing = {_key_of(target): target for target in targets or []}
+        self.recent: Deque[Snapshot] = deque(maxlen=history_size)
+        self._subscriptions: Dict[Tuple, _Subscription] = {}
+        self._lock = threading.Lock()
+        
+        if os.path.exists(socket_path):
+            self._remove_stale_socket()
+        self._server = _Server(socket_path, _Handler)
+        self._server.owner = self
+        self._thread: Optional[threading.Thread] = None
+    
+    def _remove_stale_socket(self):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+    
+    def _update_targets(self):
+        targets = dict(self.standing)
+        for key, subscription in self._subscriptions.items():
+            targets[key] = subscription.target
+        self.monitor.targets = list(targets.values())
+    
+    def _target_for(self, key: Tuple) -> Target:
+        subscription = self._subscriptions.get(key)
+        if subscription is not None:
+            return subscription.target
+        target = self.standing.get(key)
+        if target is None:
+            pid, name, children = key
+            target = Target(pid, name, children)
+        return target
+    
+    def subscribe(self, key: Tuple) -> Tuple[_Client, Dict[str, Any]]:
+        """Register a client, returning it with the history it starts from.
+
+        Both happen under one lock, so the first queued tick is always
+        newer than the history.
+        """
+        client = _Client(self.backlog)
+        with self._lock:
+            subscription = self._subscriptions.get(key)
+            if subscription is None:
+                subscription = self._subscriptions[key] = _Subscription(self._target_for(key))
+                self._update_targets()
+            subscription.clients.append(client)
+            return client, self._history(subscription.target)
+    
+    def unsubscribe(self, key: Tuple, client: _Client):
+        with self._lock:
+            subscription = self._subscriptions.get(key)
+            if subscription is None:
+                return
+            if client in subscription.clients:
+                subscription.clients.remove(client)
+            if not subscription.clients:
+                del self._subscriptions[key]
+                self._update_targets()
+    
+    def _history(self, target: Target) -> Dict[str, Any]:
+        pids = set(self.monitor.target_pids.get(target) or target.resolve(self.monitor.index))
+        ticks = [
+            {"timestamp": snapshot.timestamp, "stats": snapshot_rows(snapshot.select(pids))}
+            for snapshot in self.recent
+        ]
+        return {"type": "history", "ticks": ticks}
+    
+    def history(self, key: Tuple) -> Dict[str, Any]:
+        """Recent ticks for the processes a target currently selects."""
+        with self._lock:
+            return self._history(self._target_for(key))
+    
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "type": "status",
+                "subscriptions": len(self._subscriptions),
+                "clients": sum(len(sub.clients) for sub in self._subscriptions.values()),
+                "processes": len(self.recent[-1]) if self.recent else 0,
+                "ticks": len(self.recent)
+            }
+    
+    def tick(self) -> List[ProcessStats]:
+        """Sample once and publish a frame to every subscription."""
+        timestamp = time.time()
+        with self._lock:
+            if not self.monitor.targets:
+                return []
+            stats = self.monitor.collect(record=False)
+            # Kept as columns: history costs arrays, not objects, per tick
+            self.recent.append(Snapshot.from_stats(stats, timestamp))
+            groups = self.monitor.by_target(stats)
+            subscriptions = list(self._subscriptions.values())
+        
+        for subscription in subscriptions:
+            frame = encode_frame({
+                "type": "tick",
+                "timestamp": timestamp,
+                "stats": stats_rows(groups.get(subscription.target, []))
+            })
+            for client in list(subscription.clients):
+                client.push(frame)
+        return stats
+    
+    def start(self):
+        """Accept clients on a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever,
+                kwargs={"poll_interval": 0.1},
+                name="mem-watch-daemon",
+                daemon=True
+            )
+            self._thread.start()
+    
+    def close(self):
+        """Disconnect subscribers, stop serving and remove the socket."""
+        with self._lock:
+            for subscription in self._subscriptions.values():
+                for client in subscription.clients:
+                    client.push(None)
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.monitor.close()
+
+
+class DaemonClient:
+    """Subscribe to a daemon and yield its ticks.
+
+    Offers the ``start``/``ticks``/``stop``/``missed``/``dropped``
+    interface of FixedRateSampler, so the CLI main loop runs unchanged
+    against a daemon. ``history`` holds the (timestamp, stats) ticks received on
+    connect.
+    """
+    
+    def __init__(
+        self,
+        socket_path: str,
+        pid: Optional[int] = None,
+        name: Optional[str] = None,
+        children: bool = False,
+        duration: Optional[float] = None
+    ):
+        self.socket_path = socket_path
+        self.request = {"op": "subscribe", "pid": pid, "name": name, "children": children}
+        self.duration = duration
+        self.missed = 0
+        # Frames the daemon drops for a slow client are not visible here
+        self.dropped = 0
+        self.history: List[Tuple[float, List[ProcessStats]]] = []
+        self._sock: Optional[socket.socket] = None
+    
+    def start(self):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(self.socket_path)
+        self._sock.sendall(encode_frame(self.request))
+        reply = recv_frame(self._sock)
+        if reply is None or reply.get("type") != "history":
+            raise ConnectionError(f"Unexpected reply from {self.socket_path}: {reply}")
+        self.history = [(tick["timestamp"], rows_stats(tick["stats"])) for tick in reply["ticks"]]
+    
+    def ticks(self) -> Iterator[Tick]:
+        deadline = None if self.duration is None else time.monotonic() + self.duration
+        number = 0
+        while self._sock is not None:
+            message = recv_frame(self._sock)
+            if message is None:
+                return
+            if message.get("type") != "tick":
+                continue
+            yield Tick(number, message["timestamp"], rows_stats(message["stats"]), 0)
+            number += 1
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+    
+    def stop(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
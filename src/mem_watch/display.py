@@ -1,21 +1,63 @@
 """Terminal display formatting and output."""
 
 import os
-from typing import List, Optional
-from rich.console import Console
+import time
+from typing import Dict, List, Optional, Tuple
+from rich.console import Console, Group
+from rich.live import Live
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 
+from .sparkline import GLYPHS, Sparkline
+from .top import GROUP_ID_BASE, ProcessGroup
+
+# First element of the key of a target heading row
+_HEADING = object()
+
+
+def _pid_text(pid: int) -> str:
+    """Cgroup and process group rows carry a negative id rather than a PID."""
+    if pid >= 0:
+        return str(pid)
+    return "group" if pid <= GROUP_ID_BASE else "cgroup"
+
 
 class Display:
     """Handle terminal output and formatting."""
     
-    def __init__(self, show_graph: bool = True):
+    def __init__(
+        self,
+        show_graph: bool = True,
+        live: bool = False,
+        max_fps: float = 10.0,
+        trend_by: str = "pid",
+        trend_width: int = 20,
+        profiler=None,
+        history=None,
+        trend_window: Optional[float] = None
+    ):
+        if trend_by not in ("pid", "name"):
+            raise ValueError(f"Unknown trend grouping: {trend_by}")
+        
         self.console = Console()
         self.show_graph = show_graph
         self.history_size = 50
-        self.rss_history: List[int] = []
+        self.total_trend = Sparkline(self.history_size)
+        self.trend_by = trend_by
+        self.trend_width = trend_width
+        self._trends: Dict = {}
+        # With a window, graphs are drawn from the history tier covering it
+        self.history = history
+        self.trend_window = trend_window if history is not None else None
+        self.live = live
+        self.frame_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self._live: Optional[Live] = None
+        self._row_cache: Dict[int, Tuple] = {}
+        self._last_signature = None
+        self._last_frame = 0.0
+        self._pending = None
+        self.profiler = profiler
         
     def _format_bytes(self, bytes_value: int) -> str:
         """Format bytes to human-readable string."""
@@ -25,6 +67,14 @@ class Display:
             bytes_value /= 1024
         return f"{bytes_value:.1f}TB"
     
+    def _format_duration(self, seconds: float) -> str:
+        """Format seconds as a short duration (e.g., '45m', '3.5h', '2.0d')."""
+        if seconds < 3600:
+            return f"{seconds / 60:.0f}m"
+        if seconds < 86400:
+            return f"{seconds / 3600:.1f}h"
+        return f"{seconds / 86400:.1f}d"
+    
     def _get_color(self, percent: float, alerts: List = None) -> str:
         """Determine color based on memory percentage and alerts."""
         if alerts:
@@ -45,24 +95,109 @@ class Display:
         if not values:
             return ""
         
-        max_val = max(values)
+        values = values[-width:]
         min_val = min(values)
-        range_val = max_val - min_val if max_val != min_val else 1
-        
-        bars = "▁▂▃▄▅▆▇█"
-        graph = ""
+        range_val = max(values) - min_val or 1
+        top = len(GLYPHS) - 1
+        factor = top / range_val
         
-        for val in values[-width:]:
-            normalized = (val - min_val) / range_val
-            bar_idx = min(int(normalized * (len(bars) - 1)), len(bars) - 1)
-            graph += bars[bar_idx]
+        return "".join(GLYPHS[min(int((val - min_val) * factor), top)] for val in values)
+    
+    def _update_trends(self, stats: List):
+        """Push this sample into the per-PID or per-name sparklines."""
+        if self.trend_by == "pid":
+            values = {stat.pid: stat.rss for stat in stats}
+        else:
+            values = {}
+            for stat in stats:
+                values[stat.name] = values.get(stat.name, 0) + stat.rss
         
-        return graph
+        trends = {}
+        for key, value in values.items():
+            trend = self._trends.get(key)
+            if trend is None:
+                trend = Sparkline(self.trend_width)
+            trend.push(value)
+            trends[key] = trend
+        self._trends = trends
+    
+    def seed(self, stats: List, total_rss: Optional[int] = None):
+        """Feed a past sample into the trend lines without drawing a frame."""
+        if self.show_graph and stats:
+            self.total_trend.push(sum(stat.rss for stat in stats) if total_rss is None else total_rss)
+            self._update_trends(stats)
+    
+    def _total_graph(self, total_rss: int) -> Tuple[str, int]:
+        """Return the total RSS graph and its peak."""
+        if self.trend_window is None:
+            return self.total_trend.render(), self.total_trend.peak
+        values = self.history.points(None, self.trend_window, self.history_size)
+        peaks = self.history.points(None, self.trend_window, self.history_size, "max")
+        return self._create_graph(values, self.history_size), max(peaks, default=total_rss)
+    
+    def _trend_text(self, stat) -> Optional[str]:
+        if not self.show_graph:
+            return None
+        if self.trend_window is not None and self.trend_by == "pid":
+            values = self.history.points(stat.pid, self.trend_window, self.trend_width)
+            return self._create_graph(values, self.trend_width)
+        trend = self._trends.get(stat.pid if self.trend_by == "pid" else stat.name)
+        return trend.render() if trend else ""
     
-    def show(self, stats: List, alerts: Optional[List] = None):
-        """Display current memory statistics."""
-        self.console.clear()
+    def _row(self, stat, alerts: Optional[List], trend: Optional[str] = None):
+        """Return (key, cells) for a table row, reusing cells that did not change."""
+        color = self._get_color(stat.percent, alerts)
         
+        row_status = "OK"
+        if alerts:
+            for alert in alerts:
+                if alert.pid == stat.pid:
+                    row_status = alert.level.upper()
+                    break
+        
+        ident = f"{stat.count} procs" if isinstance(stat, ProcessGroup) else _pid_text(stat.pid)
+        key = (ident, stat.name, stat.rss, stat.vms, round(stat.percent, 1), color, row_status, trend)
+        cached = self._row_cache.get(stat.pid)
+        if cached is not None and cached[0] == key:
+            return cached
+        
+        cells = (
+            ident,
+            stat.name,
+            Text(self._format_bytes(stat.rss), style=color),
+            self._format_bytes(stat.vms),
+            Text(f"{stat.percent:.1f}%", style=color),
+            Text(row_status, style=color)
+        )
+        if trend is not None:
+            cells += (Text(trend, style=color),)
+        return key, cells
+    
+    def _heading(self, label: str, stats: List):
+        """Return (key, cells) for the row that opens a target's group."""
+        rss = sum(stat.rss for stat in stats)
+        key = (_HEADING, label, len(stats), rss)
+        cells = (
+            "",
+            Text(label, style="bold magenta"),
+            Text(self._format_bytes(rss), style="bold"),
+            "",
+            "",
+            Text(f"{len(stats)} process{'es' if len(stats) != 1 else ''}", style="dim")
+        )
+        if self.show_graph:
+            cells += ("",)
+        return key, cells
+    
+    def _render(
+        self,
+        rows: List,
+        total_rss: int,
+        alerts: Optional[List],
+        status: Optional[str],
+        graph: Optional[Tuple[str, int]] = None
+    ):
+        """Build the renderables for one frame."""
         table = Table(title="Memory Usage Monitor", show_header=True)
         table.add_column("PID", style="cyan")
         table.add_column("Process", style="cyan")
@@ -70,50 +205,125 @@ class Display:
         table.add_column("VMS", justify="right")
         table.add_column("Memory %", justify="right")
         table.add_column("Status")
+        if self.show_graph:
+            table.add_column("Trend")
         
-        total_rss = 0
-        
-        for stat in stats:
-            total_rss += stat.rss
-            color = self._get_color(stat.percent, alerts)
-            
-            status = "OK"
-            if alerts:
-                for alert in alerts:
-                    if alert.pid == stat.pid:
-                        status = alert.level.upper()
-                        break
-            
-            table.add_row(
-                str(stat.pid),
-                stat.name,
-                Text(self._format_bytes(stat.rss), style=color),
-                self._format_bytes(stat.vms),
-                Text(f"{stat.percent:.1f}%", style=color),
-                Text(status, style=color)
-            )
-        
-        self.console.print(table)
+        for index, (key, cells) in enumerate(rows):
+            if key[0] is _HEADING and index:
+                table.add_section()
+            table.add_row(*cells)
         
-        if self.show_graph and stats:
-            self.rss_history.append(total_rss)
-            if len(self.rss_history) > self.history_size:
-                self.rss_history.pop(0)
-            
-            graph = self._create_graph(self.rss_history)
-            graph_panel = Panel(
-                f"RSS History: {graph}\n"
+        renderables = [table]
+        
+        if self.show_graph and rows:
+            text, peak = graph or self._total_graph(total_rss)
+            span = f" ({self._format_duration(self.trend_window)})" if self.trend_window else ""
+            renderables.append(Panel(
+                f"RSS History{span}: {text}\n"
                 f"Current: {self._format_bytes(total_rss)} | "
-                f"Peak: {self._format_bytes(max(self.rss_history))}",
+                f"Peak: {self._format_bytes(peak)}",
                 title="Memory Trend"
-            )
-            self.console.print(graph_panel)
+            ))
         
         if alerts:
             alert_text = Text()
             for alert in alerts:
+                message = f"⚠ {alert.name} ({'PID ' if alert.pid >= 0 else ''}{_pid_text(alert.pid)}): {alert.level.upper()}"
+                if alert.kind == "leak":
+                    message += f" leak, +{self._format_bytes(alert.current * 3600)}/h"
+                    if alert.eta is not None:
+                        message += f", limit in {self._format_duration(alert.eta)}"
                 alert_text.append(
-                    f"⚠ {alert.name} (PID {alert.pid}): {alert.level.upper()}\n",
+                    message + "\n",
                     style="red" if alert.level == "critical" else "yellow"
                 )
-            self.console.print(Panel(alert_text, title="Alerts", border_style="red"))
+            renderables.append(Panel(alert_text, title="Alerts", border_style="red"))
+        
+        if self.profiler is not None:
+            renderables.append(Panel("\n".join(self.profiler.footer()), title="Profile", border_style="dim"))
+        
+        if status:
+            renderables.append(Text(status, style="dim"))
+        
+        return renderables
+    
+    def start(self):
+        """Start live rendering (no-op unless live mode is enabled)."""
+        if self.live and self._live is None:
+            self._live = Live(console=self.console, auto_refresh=False)
+            self._live.start()
+    
+    def stop(self):
+        """Flush any pending frame and stop live rendering."""
+        if self._live is not None:
+            if self._pending is not None:
+                self._live.update(Group(*self._pending), refresh=True)
+                self._pending = None
+            self._live.stop()
+            self._live = None
+    
+    def show(
+        self,
+        stats: List,
+        alerts: Optional[List] = None,
+        status: Optional[str] = None,
+        total_rss: Optional[int] = None,
+        groups: Optional[List[Tuple[str, List]]] = None
+    ):
+        """Display current memory statistics.
+
+        ``total_rss`` overrides the total drawn in the trend panel, for
+        when ``stats`` is only a subset of the monitored processes.
+        With ``groups``, a list of (label, stats), rows are drawn per
+        group under a heading; a process in several groups appears in
+        each of them.
+        """
+        if total_rss is None:
+            total_rss = sum(stat.rss for stat in stats)
+        
+        if self.show_graph and stats:
+            self.total_trend.push(total_rss)
+            self._update_trends(stats)
+        
+        rows = []
+        cache = {}
+        for label, members in groups if groups is not None else ((None, stats),):
+            if label is not None:
+                rows.append(self._heading(label, members))
+            for stat in members:
+                row = cache.get(stat.pid)
+                if row is None:
+                    row = cache[stat.pid] = self._row(stat, alerts, self._trend_text(stat))
+                rows.append(row)
+        
+        self._row_cache = cache
+        graph = self._total_graph(total_rss) if self.show_graph and stats else None
+        
+        if self._live is None:
+            self.console.clear()
+            for renderable in self._render(rows, total_rss, alerts, status, graph):
+                self.console.print(renderable)
+            return
+        
+        signature = (
+            tuple(key for key, _ in rows),
+            tuple((alert.pid, alert.level) for alert in alerts or ()),
+            status,
+            graph,
+            self.profiler.ticks if self.profiler is not None else None
+        )
+        if signature != self._last_signature:
+            self._last_signature = signature
+            self._pending = self._render(rows, total_rss, alerts, status, graph)
+        
+        # Nothing changed since the last frame
+        if self._pending is None:
+            return
+        
+        now = time.monotonic()
+        if now - self._last_frame < self.frame_interval:
+            return
+        
+        self._live.update(Group(*self._pending), refresh=True)
+        self._pending = None
+        self._last_frame = now
@@ -0,0 +1,145 @@
+"""Process exit notification with pidfd and epoll, with a polling fallback."""
+
+import os
+import select
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Called with (pid, exit timestamp) from the watcher's thread
+ExitCallback = Callable[[int, float], None]
+
+
+class ExitEvent:
+    """A tracked process exited; ``stat`` is its last sample."""
+    
+    def __init__(self, stat, timestamp: float):
+        self.stat = stat
+        self.timestamp = timestamp
+
+
+def pidfd_supported() -> bool:
+    """True when os.pidfd_open and epoll exist and the kernel implements pidfds."""
+    if not hasattr(os, "pidfd_open") or not hasattr(select, "epoll"):
+        return False
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:
+        return False
+    return True
+
+
+class PidfdWatcher:
+    """Report process exits as they happen.
+
+    Each tracked process has a pidfd registered with one epoll instance;
+    a pidfd becomes readable when its process exits, so a background
+    thread blocked in ``epoll.poll`` calls ``on_exit`` as soon as it does.
+    """
+    
+    def __init__(self, on_exit: ExitCallback):
+        self.on_exit = on_exit
+        self._epoll = select.epoll()
+        # Written to by close() to wake the thread
+        self._wake_r, self._wake_w = os.pipe()
+        self._epoll.register(self._wake_r, select.EPOLLIN)
+        self._fds: Dict[int, int] = {}
+        self._pids: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="mem-watch-exits", daemon=True)
+        self._thread.start()
+    
+    def __len__(self) -> int:
+        return len(self._fds)
+    
+    def _unwatch(self, pid: int):
+        fd = self._fds.pop(pid, None)
+        if fd is not None:
+            del self._pids[fd]
+            self._epoll.unregister(fd)
+            os.close(fd)
+    
+    def track(self, pids: Iterable[int]):
+        """Watch exactly ``pids``: open pidfds for new ones, close the rest."""
+        pids = set(pids)
+        exited = []
+        with self._lock:
+            for pid in self._fds.keys() - pids:
+                self._unwatch(pid)
+            for pid in pids - self._fds.keys():
+                try:
+                    fd = os.pidfd_open(pid)
+                except ProcessLookupError:
+                    exited.append(pid)
+                    continue
+                except OSError:
+                    continue
+                self._fds[pid] = fd
+                self._pids[fd] = pid
+                self._epoll.register(fd, select.EPOLLIN)
+        now = time.time()
+        for pid in exited:
+            self.on_exit(pid, now)
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                events = self._epoll.poll()
+            except (OSError, ValueError):
+                return
+            now = time.time()
+            exited = []
+            with self._lock:
+                for fd, _ in events:
+                    pid = self._pids.get(fd)
+                    if pid is not None:
+                        self._unwatch(pid)
+                        exited.append(pid)
+            for pid in exited:
+                self.on_exit(pid, now)
+    
+    def close(self):
+        self._stop.set()
+        os.write(self._wake_w, b"x")
+        self._thread.join()
+        with self._lock:
+            for pid in list(self._fds):
+                self._unwatch(pid)
+        self._epoll.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+
+class PollingWatcher:
+    """Fallback for kernels without pidfd: exits are found on each ``track`` call."""
+    
+    def __init__(self, on_exit: ExitCallback, exists: Optional[Callable[[int], bool]] = None):
+        if exists is None:
+            import psutil
+            exists = psutil.pid_exists
+        self.on_exit = on_exit
+        self.exists = exists
+        self._pids: List[int] = []
+    
+    def __len__(self) -> int:
+        return len(self._pids)
+    
+    def track(self, pids: Iterable[int]):
+        pids = list(pids)
+        current = set(pids)
+        now = time.time()
+        for pid in self._pids:
+            if pid not in current and not self.exists(pid):
+                self.on_exit(pid, now)
+        self._pids = pids
+    
+    def close(self):
+        self._pids = []
+
+
+def create_watcher(on_exit: ExitCallback, exists: Optional[Callable[[int], bool]] = None):
+    """Return a PidfdWatcher where supported, otherwise a PollingWatcher."""
+    if pidfd_supported():
+        return PidfdWatcher(on_exit)
+    return PollingWatcher(on_exit, exists)
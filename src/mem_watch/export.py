@@ -1,43 +1,223 @@
 """CSV export functionality for memory usage data."""
 
 import csv
+import gzip
+import os
+import shutil
 import time
-from typing import List
+from typing import List, Optional
 from pathlib import Path
 
+from .profiling import NULL_PROFILER
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+# CSVExporter options the binary trace and SQLite formats have no equivalent for
+CSV_ONLY_OPTIONS = ("flush_interval", "fsync", "max_bytes", "max_age", "compress")
+
+
+def parse_time(text: str) -> float:
+    """Parse an exported timestamp, with or without fractional seconds."""
+    whole, _, fraction = text.partition('.')
+    seconds = time.mktime(time.strptime(whole, TIME_FORMAT))
+    return seconds + float(f"0.{fraction}") if fraction else seconds
+
 
 class CSVExporter:
-    """Export memory statistics to CSV file."""
+    """Export memory statistics to CSV file.
+
+    The file is kept open with a large write buffer and flushed when
+    ``flush_bytes`` have been written or ``flush_interval`` seconds have
+    passed. Files can be rotated by size or age, optionally gzipping the
+    rotated file. Call ``close()`` (or use the exporter as a context
+    manager) to flush the tail of the data.
+
+    With ``detail=True`` the PSS/USS/swap columns and the time they were
+    read are appended; they are empty for processes without detail samples.
+    With ``subsecond=True`` timestamps carry milliseconds, so samples taken
+    within one second (as with an adaptive schedule) stay distinct.
+    Flush time and bytes written are reported to ``profiler`` if given.
+    """
     
-    def __init__(self, filepath: str):
+    HEADER = ['timestamp', 'pid', 'name', 'rss_bytes', 'vms_bytes', 'memory_percent']
+    DETAIL_HEADER = ['pss_bytes', 'uss_bytes', 'swap_bytes', 'detail_timestamp']
+    
+    def __init__(
+        self,
+        filepath: str,
+        buffer_size: int = 1024 * 1024,
+        flush_interval: float = 5.0,
+        flush_bytes: int = 256 * 1024,
+        fsync: bool = False,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        compress: bool = False,
+        detail: bool = False,
+        subsecond: bool = False,
+        profiler=None
+    ):
         self.filepath = Path(filepath)
         self.initialized = False
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self.detail = detail
+        self.subsecond = subsecond
+        self.profiler = profiler or NULL_PROFILER
+        self.rotated: List[Path] = []
+        self._file = None
+        self._writer = None
+        self._size = 0
+        self._unflushed = 0
+        self._opened_at = 0.0
+        self._last_flush = 0.0
+        self._cached_second: Optional[int] = None
+        self._cached_time = ""
+    
+    def _open(self, fresh: bool):
+        """Open the output file, truncating and writing the header if fresh."""
+        mode = 'w' if fresh else 'a'
+        self._file = open(self.filepath, mode, newline='', buffering=self.buffer_size)
+        self._writer = csv.writer(self._file)
+        if fresh:
+            header = self.HEADER + self.DETAIL_HEADER if self.detail else self.HEADER
+            self._size = self._writer.writerow(header)
+        else:
+            self._size = self.filepath.stat().st_size
+        self._unflushed = 0
+        self._opened_at = self._last_flush = time.monotonic()
+        self.initialized = True
+    
+    def _format_time(self, timestamp: float) -> str:
+        """Format a timestamp, calling strftime at most once per second."""
+        second = int(timestamp)
+        if second != self._cached_second:
+            self._cached_second = second
+            self._cached_time = time.strftime(TIME_FORMAT, time.localtime(second))
+        if self.subsecond:
+            return f"{self._cached_time}.{int((timestamp - second) * 1000):03d}"
+        return self._cached_time
+    
+    def _should_rotate(self) -> bool:
+        if self.max_bytes is not None and self._size >= self.max_bytes:
+            return True
+        if self.max_age is not None and time.monotonic() - self._opened_at >= self.max_age:
+            return True
+        return False
+    
+    def _rotate(self):
+        """Close the current file, move it aside and start a new one."""
+        self.close()
+        
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        target = self.filepath.with_name(f"{self.filepath.stem}.{stamp}{self.filepath.suffix}")
+        counter = 1
+        while target.exists() or Path(f"{target}.gz").exists():
+            target = self.filepath.with_name(
+                f"{self.filepath.stem}.{stamp}-{counter}{self.filepath.suffix}"
+            )
+            counter += 1
+        os.replace(self.filepath, target)
         
-    def write(self, stats: List):
-        """Write statistics to CSV file."""
-        mode = 'a' if self.initialized else 'w'
+        if self.compress:
+            compressed = Path(f"{target}.gz")
+            with open(target, 'rb') as src, gzip.open(compressed, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            target.unlink()
+            target = compressed
         
-        with open(self.filepath, mode, newline='') as f:
-            writer = csv.writer(f)
-            
-            if not self.initialized:
-                writer.writerow([
-                    'timestamp',
-                    'pid',
-                    'name',
-                    'rss_bytes',
-                    'vms_bytes',
-                    'memory_percent'
-                ])
-                self.initialized = True
-            
-            timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
-            for stat in stats:
-                writer.writerow([
-                    timestamp,
-                    stat.pid,
-                    stat.name,
-                    stat.rss,
-                    stat.vms,
-                    f"{stat.percent:.2f}"
-                ])
+        self.rotated.append(target)
+        self._open(fresh=True)
+    
+    def write(self, stats: List, timestamp: Optional[float] = None):
+        """Write statistics to CSV file.
+
+        ``timestamp`` is the time the samples were taken; without it each
+        row gets its own sample's timestamp.
+        """
+        if self._file is None:
+            self._open(fresh=not self.initialized)
+        elif self._should_rotate():
+            self._rotate()
+        
+        formatted = None if timestamp is None else self._format_time(timestamp)
+        written = 0
+        for stat in stats:
+            row = [
+                formatted or self._format_time(stat.timestamp),
+                stat.pid,
+                stat.name,
+                stat.rss,
+                stat.vms,
+                f"{stat.percent:.2f}"
+            ]
+            if self.detail:
+                if stat.detail_time is None:
+                    row += ['', '', '', '']
+                else:
+                    row += [
+                        stat.pss,
+                        stat.uss,
+                        stat.swap,
+                        self._format_time(stat.detail_time)
+                    ]
+            written += self._writer.writerow(row)
+        
+        self._size += written
+        self._unflushed += written
+        self.profiler.count("export_bytes", written)
+        if (self._unflushed >= self.flush_bytes
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+    
+    def flush(self):
+        """Push buffered rows to the OS, and to disk if fsync is enabled."""
+        if self._file is None:
+            return
+        with self.profiler.phase("export.flush"):
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+    
+    def close(self):
+        """Flush and close the output file."""
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+        self._writer = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def create_exporter(filepath: str, **options):
+    """Return an exporter for the format implied by the file extension.
+    
+    ``.mwt`` files get a binary TraceWriter, ``.db``/``.sqlite`` files a
+    SQLiteExporter; anything else is CSV, with ``options`` passed through
+    to CSVExporter. Setting one of ``CSV_ONLY_OPTIONS`` for another format
+    raises ValueError rather than silently ignoring it.
+    """
+    suffix = Path(filepath).suffix
+    if suffix == ".mwt" or suffix in SQLITE_SUFFIXES:
+        ignored = [name for name in CSV_ONLY_OPTIONS if options.get(name)]
+        if ignored:
+            raise ValueError(f"{filepath}: {', '.join(ignored)} only supported for CSV exports")
+    if suffix == ".mwt":
+        from .trace import TraceWriter
+        return TraceWriter(filepath)
+    if suffix in SQLITE_SUFFIXES:
+        from .store import SQLiteExporter
+        return SQLiteExporter(filepath)
+    return CSVExporter(filepath, **options)
@@ -0,0 +1,651 @@
+"""Bounded sample history with incremental summary statistics.
+
+Each process keeps its recent raw samples plus round-robin rollups at
+coarser resolutions, so long sessions stay within a fixed memory budget
+while trends and summaries can still reach back days.
+"""
+
+import math
+import threading
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# (resolution in seconds, buckets kept): an hour of 10s, a day of 1m and a week of 1h
+DEFAULT_TIERS = ((10, 360), (60, 1440), (3600, 168))
+DEFAULT_BUDGET = 16 * 1024 * 1024
+CONSOLIDATIONS = ("avg", "min", "max", "last")
+
+
+class RunningStats:
+    """Streaming min/max/mean/variance using Welford's algorithm."""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+    
+    def add(self, value: float):
+        """Fold one value into the running statistics."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+    
+    def merge(self, count: int, mean: float, m2: float, minimum: float, maximum: float):
+        """Fold in the statistics of another group of values (Chan et al.)."""
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        
+        if self.min is None or minimum < self.min:
+            self.min = minimum
+        if self.max is None or maximum > self.max:
+            self.max = maximum
+    
+    @property
+    def variance(self) -> float:
+        """Population variance of the values seen so far."""
+        return self._m2 / self.count if self.count else 0.0
+    
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class LinearTrend:
+    """Incremental least-squares fit of value against time.
+    
+    Times are stored relative to the first sample to keep the sums well
+    conditioned for epoch timestamps.
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self.origin: Optional[float] = None
+        self._sum_t = 0.0
+        self._sum_v = 0.0
+        self._sum_tt = 0.0
+        self._sum_tv = 0.0
+    
+    def add(self, t: float, value: float):
+        if self.origin is None:
+            self.origin = t
+        t -= self.origin
+        self.count += 1
+        self._sum_t += t
+        self._sum_v += value
+        self._sum_tt += t * t
+        self._sum_tv += t * value
+    
+    @property
+    def slope(self) -> float:
+        """Fitted change in value per second (0 until two distinct times are seen)."""
+        denominator = self.count * self._sum_tt - self._sum_t * self._sum_t
+        if self.count < 2 or denominator <= 0:
+            return 0.0
+        return (self.count * self._sum_tv - self._sum_t * self._sum_v) / denominator
+
+
+class RingBuffer:
+    """Fixed-capacity sample buffer stored in typed array columns."""
+    
+    SLOT_BYTES = 32
+    
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("History depth must be at least 1")
+        
+        self.capacity = capacity
+        self.timestamps = array('d', [0.0]) * capacity
+        self.rss = array('q', [0]) * capacity
+        self.vms = array('q', [0]) * capacity
+        self.percent = array('d', [0.0]) * capacity
+        self._next = 0
+        self._len = 0
+    
+    def __len__(self) -> int:
+        return self._len
+    
+    def append(self, timestamp: float, rss: int, vms: int, percent: float):
+        """Store a sample, overwriting the oldest one when full."""
+        i = self._next
+        self.timestamps[i] = timestamp
+        self.rss[i] = rss
+        self.vms[i] = vms
+        self.percent[i] = percent
+        self._next = (i + 1) % self.capacity
+        if self._len < self.capacity:
+            self._len += 1
+    
+    def _indices(self) -> Iterator[int]:
+        start = self._oldest()
+        for offset in range(self._len):
+            yield (start + offset) % self.capacity
+    
+    def column(self, name: str) -> List:
+        """Return one column ('timestamps', 'rss', 'vms', 'percent') oldest first."""
+        values = getattr(self, name)
+        return [values[i] for i in self._indices()]
+    
+    def samples(self) -> Iterator[Tuple[float, int, int, float]]:
+        """Iterate (timestamp, rss, vms, percent) oldest first."""
+        for i in self._indices():
+            yield self.timestamps[i], self.rss[i], self.vms[i], self.percent[i]
+    
+    def last(self) -> Optional[Tuple[float, int, int, float]]:
+        """Return the newest sample."""
+        if not self._len:
+            return None
+        i = (self._next - 1) % self.capacity
+        return self.timestamps[i], self.rss[i], self.vms[i], self.percent[i]
+    
+    @property
+    def nbytes(self) -> int:
+        return self.capacity * self.SLOT_BYTES
+    
+    @property
+    def resolution(self) -> float:
+        """Average spacing of the retained samples in seconds."""
+        if self._len < 2:
+            return 0.0
+        newest = self.timestamps[(self._next - 1) % self.capacity]
+        oldest = self.timestamps[self._oldest()]
+        return (newest - oldest) / (self._len - 1)
+    
+    def _oldest(self) -> int:
+        """Slot of the oldest retained sample."""
+        return (self._next - self._len) % self.capacity
+    
+    def covers(self, since: float) -> bool:
+        """True unless samples newer than ``since`` have been overwritten.
+
+        Nothing is lost before the buffer wraps; after that the oldest
+        retained sample must be at or before ``since``.
+        """
+        if self._len < self.capacity:
+            return True
+        return self.timestamps[self._oldest()] <= since
+    
+    def values(self, since: float, consolidate: str = "avg") -> List[int]:
+        """RSS of the samples taken at or after ``since``."""
+        return [self.rss[i] for i in self._indices() if self.timestamps[i] >= since]
+    
+    def merge_into(self, since: float, rss: RunningStats, percent: RunningStats):
+        for i in self._indices():
+            if self.timestamps[i] >= since:
+                rss.add(self.rss[i])
+                percent.add(self.percent[i])
+
+
+def _combined(a: RunningStats, b: RunningStats) -> RunningStats:
+    stats = RunningStats()
+    for part in (a, b):
+        stats.merge(part.count, part.mean, part._m2, part.min, part.max)
+    return stats
+
+
+class Rollup:
+    """Consolidated buckets of one resolution in a fixed-capacity ring.
+    
+    A bucket keeps the count, min, max, mean, M2 and last value of RSS and
+    the min, max, mean and M2 of the memory percentage, so any run of
+    buckets merges into exact summary statistics. Columns grow as buckets
+    close and wrap once ``capacity`` is reached.
+    
+    Only the finest rollup of a series sees individual samples; each
+    closed bucket is merged into ``parent``, the next coarser rollup.
+    Queries include the buckets still being filled at every level.
+    """
+    
+    SLOT_BYTES = 10 * 8 + 4
+    
+    def __init__(self, resolution: float, capacity: int, source: Optional["Rollup"] = None):
+        if resolution <= 0 or capacity < 1:
+            raise ValueError("Rollup resolution and capacity must be positive")
+        if source is not None and resolution % source.resolution:
+            raise ValueError("Rollup resolutions must be multiples of each other")
+        
+        self.resolution = resolution
+        self.capacity = capacity
+        self.source = source
+        self.parent: Optional[Rollup] = None
+        if source is not None:
+            source.parent = self
+        self.starts = array('d')
+        self.counts = array('I')
+        self.rss_min = array('q')
+        self.rss_max = array('q')
+        self.rss_last = array('q')
+        self.rss_mean = array('d')
+        self.rss_m2 = array('d')
+        self.percent_min = array('d')
+        self.percent_max = array('d')
+        self.percent_mean = array('d')
+        self.percent_m2 = array('d')
+        self._next = 0
+        self._open: Optional[float] = None
+        self._rss = RunningStats()
+        self._percent = RunningStats()
+        self._last = 0
+    
+    @property
+    def nbytes(self) -> int:
+        return len(self.starts) * self.SLOT_BYTES
+    
+    def _start(self, start: float) -> int:
+        """Open the bucket containing ``start``; returns the bytes allocated closing the last one."""
+        start -= start % self.resolution
+        # Late data is folded into the open bucket
+        if self._open is not None and start <= self._open:
+            return 0
+        grown = 0 if self._open is None else self._close()
+        self._open = start
+        self._rss = RunningStats()
+        self._percent = RunningStats()
+        return grown
+    
+    def add(self, timestamp: float, rss: int, percent: float) -> int:
+        """Fold in one sample; returns the bytes allocated by closing buckets."""
+        grown = self._start(timestamp)
+        self._rss.add(rss)
+        self._percent.add(percent)
+        self._last = rss
+        return grown
+    
+    def add_bucket(self, start: float, rss: RunningStats, percent: RunningStats, last: int) -> int:
+        """Merge in a closed bucket of the finer rollup below."""
+        grown = self._start(start)
+        self._rss.merge(rss.count, rss.mean, rss._m2, rss.min, rss.max)
+        self._percent.merge(percent.count, percent.mean, percent._m2, percent.min, percent.max)
+        self._last = last
+        return grown
+    
+    def _close(self) -> int:
+        rss = self._rss
+        percent = self._percent
+        row = (
+            (self.starts, self._open),
+            (self.counts, rss.count),
+            (self.rss_min, rss.min),
+            (self.rss_max, rss.max),
+            (self.rss_last, self._last),
+            (self.rss_mean, rss.mean),
+            (self.rss_m2, rss._m2),
+            (self.percent_min, percent.min),
+            (self.percent_max, percent.max),
+            (self.percent_mean, percent.mean),
+            (self.percent_m2, percent._m2)
+        )
+        grown = 0
+        if self.parent is not None:
+            grown = self.parent.add_bucket(self._open, rss, percent, self._last)
+        
+        if len(self.starts) < self.capacity:
+            for column, value in row:
+                column.append(value)
+            return grown + self.SLOT_BYTES
+        
+        i = self._next
+        for column, value in row:
+            column[i] = value
+        self._next = (i + 1) % self.capacity
+        return grown
+    
+    def _pending(self) -> List[list]:
+        """Buckets not yet closed here, as [start, rss, percent, last] oldest first."""
+        buckets = []
+        if self._open is not None:
+            buckets.append([self._open, self._rss, self._percent, self._last])
+        if self.source is not None:
+            for start, rss, percent, last in self.source._pending():
+                start -= start % self.resolution
+                if buckets and buckets[-1][0] == start:
+                    bucket = buckets[-1]
+                    buckets[-1] = [start, _combined(bucket[1], rss), _combined(bucket[2], percent), last]
+                else:
+                    buckets.append([start, rss, percent, last])
+        return buckets
+    
+    def __len__(self) -> int:
+        """Number of buckets, including those still being filled."""
+        return len(self.starts) + len(self._pending())
+    
+    def _oldest(self) -> int:
+        """Slot of the oldest closed bucket; slots are appended until the columns are full."""
+        return self._next if len(self.starts) == self.capacity else 0
+    
+    def _indices(self, since: float) -> Iterator[int]:
+        size = len(self.starts)
+        oldest = self._oldest()
+        for offset in range(size):
+            i = (oldest + offset) % size
+            if self.starts[i] + self.resolution > since:
+                yield i
+    
+    def covers(self, since: float) -> bool:
+        """True unless buckets newer than ``since`` have been overwritten.
+
+        Nothing is lost before the columns fill up; after that the oldest
+        retained bucket must start at or before ``since``.
+        """
+        if len(self.starts) < self.capacity:
+            return True
+        return self.starts[self._oldest()] <= since
+    
+    def values(self, since: float, consolidate: str = "avg") -> List[float]:
+        """One RSS value per bucket overlapping the window, oldest first."""
+        if consolidate not in CONSOLIDATIONS:
+            raise ValueError(f"Unknown consolidation: {consolidate}")
+        column = {
+            "avg": self.rss_mean,
+            "min": self.rss_min,
+            "max": self.rss_max,
+            "last": self.rss_last
+        }[consolidate]
+        values = [column[i] for i in self._indices(since)]
+        
+        for start, rss, _, last in self._pending():
+            if start + self.resolution > since:
+                values.append({"avg": rss.mean, "min": rss.min, "max": rss.max, "last": last}[consolidate])
+        return values
+    
+    def merge_into(self, since: float, rss: RunningStats, percent: RunningStats):
+        """Merge the buckets overlapping the window into ``rss`` and ``percent``."""
+        for i in self._indices(since):
+            count = self.counts[i]
+            rss.merge(count, self.rss_mean[i], self.rss_m2[i], self.rss_min[i], self.rss_max[i])
+            percent.merge(
+                count, self.percent_mean[i], self.percent_m2[i], self.percent_min[i], self.percent_max[i]
+            )
+        
+        for start, bucket_rss, bucket_percent, _ in self._pending():
+            if start + self.resolution > since:
+                for total, bucket in ((rss, bucket_rss), (percent, bucket_percent)):
+                    total.merge(bucket.count, bucket.mean, bucket._m2, bucket.min, bucket.max)
+
+
+def _downsample(values: List[float], points: int, consolidate: str) -> List[float]:
+    """Consolidate ``values`` into at most ``points`` equal runs."""
+    size = len(values)
+    if size <= points:
+        return values
+    
+    result = []
+    for n in range(points):
+        run = values[n * size // points:(n + 1) * size // points]
+        if consolidate == "max":
+            result.append(max(run))
+        elif consolidate == "min":
+            result.append(min(run))
+        elif consolidate == "last":
+            result.append(run[-1])
+        else:
+            result.append(sum(run) / len(run))
+    return result
+
+
+class Series:
+    """Raw samples of one series plus its rollups."""
+    
+    def __init__(self, depth: int, tiers: Sequence[Tuple[float, int]] = DEFAULT_TIERS):
+        self.buffer = RingBuffer(depth)
+        self.first: Optional[float] = None
+        self.rollups: List[Rollup] = []
+        for resolution, capacity in tiers:
+            source = self.rollups[-1] if self.rollups else None
+            self.rollups.append(Rollup(resolution, capacity, source))
+    
+    @property
+    def nbytes(self) -> int:
+        return self.buffer.nbytes + sum(rollup.nbytes for rollup in self.rollups)
+    
+    def append(self, timestamp: float, rss: int, vms: int, percent: float) -> int:
+        """Store a sample; returns the bytes newly allocated by the rollups."""
+        if self.first is None:
+            self.first = timestamp
+        self.buffer.append(timestamp, rss, vms, percent)
+        return self.rollups[0].add(timestamp, rss, percent) if self.rollups else 0
+    
+    def tier(self, since: float, points: Optional[int] = None):
+        """Pick the tier to answer a query reaching back to ``since``.
+        
+        Without ``points`` this is the finest tier still holding the whole
+        window. With ``points`` it is the coarsest of those whose
+        resolution still gives at least ``points`` values over the data
+        in the window, so a graph gets enough detail without reading more
+        buckets than needed.
+        """
+        tiers = [self.buffer] + self.rollups
+        candidates = [tier for tier in tiers if tier.covers(since)] or [tiers[-1]]
+        if points:
+            newest = self.buffer.last()
+            step = (newest[0] - max(since, self.first)) / points if newest else 0.0
+            fitting = [tier for tier in candidates if tier.resolution <= step]
+            if fitting:
+                return fitting[-1]
+        return candidates[0]
+
+
+class ProcessHistory(Series):
+    """Samples, rollups and running statistics for one process."""
+    
+    def __init__(self, pid: int, name: str, depth: int, tiers: Sequence[Tuple[float, int]] = DEFAULT_TIERS):
+        super().__init__(depth, tiers)
+        self.pid = pid
+        self.name = name
+        self.rss = RunningStats()
+        self.percent = RunningStats()
+        self.last_tick = 0
+    
+    def add(self, stat, tick: int) -> int:
+        self.rss.add(stat.rss)
+        self.percent.add(stat.percent)
+        self.last_tick = tick
+        return self.append(stat.timestamp, stat.rss, stat.vms, stat.percent)
+
+
+def _summarize(rss: RunningStats, percent: RunningStats, samples: int) -> Dict[str, Any]:
+    return {
+        "min_rss": rss.min,
+        "max_rss": rss.max,
+        "avg_rss": rss.mean,
+        "std_rss": rss.stddev,
+        "min_percent": percent.min,
+        "max_percent": percent.max,
+        "avg_percent": percent.mean,
+        "std_percent": percent.stddev,
+        "samples": samples
+    }
+
+
+class History:
+    """Per-PID sample history with bounded memory.
+
+    Each process keeps its last ``depth`` samples in a ring buffer and
+    rollups at each of ``tiers`` (10s, 1m and 1h by default). The tick
+    totals are kept the same way in ``total``. Session-wide summary
+    statistics are updated as samples arrive and cost O(1) to read;
+    windowed summaries and graph points come from whichever tier fits the
+    window. Processes that have not been seen for ``depth`` ticks are
+    dropped, as are the least recently seen ones once the history
+    outgrows ``budget`` bytes. The sampler thread records while the
+    display reads points, so both go through a lock.
+    """
+    
+    def __init__(
+        self,
+        depth: int = 300,
+        tiers: Sequence[Tuple[float, int]] = DEFAULT_TIERS,
+        budget: int = DEFAULT_BUDGET
+    ):
+        if depth < 1:
+            raise ValueError("History depth must be at least 1")
+        
+        self.depth = depth
+        self.tiers = tuple(tiers)
+        self.budget = budget
+        self.ticks = 0
+        self.processes: Dict[int, ProcessHistory] = {}
+        self.total = Series(depth, self.tiers)
+        self.nbytes = self.total.nbytes
+        self.latest: Optional[float] = None
+        self.rss = RunningStats()
+        self.percent = RunningStats()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        """Number of ticks currently retained."""
+        return min(self.ticks, self.depth)
+    
+    def record(self, stats: List):
+        """Add one tick worth of samples."""
+        with self._lock:
+            self.ticks += 1
+            
+            total_rss = 0
+            total_vms = 0
+            total_percent = 0.0
+            timestamp = stats[0].timestamp if stats else None
+            for stat in stats:
+                process = self.processes.get(stat.pid)
+                if process is None or process.name != stat.name:
+                    if process is not None:
+                        self.nbytes -= process.nbytes
+                    process = ProcessHistory(stat.pid, stat.name, self.depth, self.tiers)
+                    self.processes[stat.pid] = process
+                    self.nbytes += process.nbytes
+                self.nbytes += process.add(stat, self.ticks)
+                self.rss.add(stat.rss)
+                self.percent.add(stat.percent)
+                total_rss += stat.rss
+                total_vms += stat.vms
+                total_percent += stat.percent
+                if stat.timestamp > timestamp:
+                    timestamp = stat.timestamp
+            
+            if stats:
+                self.nbytes += self.total.append(timestamp, total_rss, total_vms, total_percent)
+                if self.latest is None or timestamp > self.latest:
+                    self.latest = timestamp
+            
+            if self.ticks % self.depth == 0:
+                self._evict()
+            if self.nbytes > self.budget:
+                self._shed()
+    
+    def _drop(self, pid: int):
+        self.nbytes -= self.processes.pop(pid).nbytes
+    
+    def _evict(self):
+        """Drop processes that have aged out of the window."""
+        cutoff = self.ticks - self.depth
+        stale = [pid for pid, process in self.processes.items() if process.last_tick <= cutoff]
+        for pid in stale:
+            self._drop(pid)
+    
+    def _shed(self):
+        """Drop the least recently seen processes until back under budget."""
+        # Among processes seen equally recently the newest go first, keeping long histories
+        order = sorted(
+            enumerate(self.processes.items()),
+            key=lambda item: (item[1][1].last_tick, -item[0])
+        )
+        for _, (pid, _) in order:
+            if self.nbytes <= self.budget:
+                break
+            self._drop(pid)
+    
+    def get(self, pid: int) -> Optional[ProcessHistory]:
+        return self.processes.get(pid)
+    
+    def points(
+        self,
+        pid: Optional[int],
+        window: float,
+        points: int,
+        consolidate: str = "avg"
+    ) -> List[float]:
+        """Up to ``points`` RSS values covering the last ``window`` seconds.
+        
+        ``pid=None`` gives the per-tick totals. Values come from the tier
+        matching the window and are consolidated down to ``points``.
+        """
+        with self._lock:
+            series = self.total if pid is None else self.processes.get(pid)
+            if series is None or self.latest is None:
+                return []
+            since = self.latest - window
+            values = series.tier(since, points).values(since, consolidate)
+            return _downsample(values, points, consolidate)
+    
+    def _window_summary(self, pid: Optional[int], window: float) -> Dict[str, Any]:
+        if self.latest is None:
+            return {}
+        since = self.latest - window
+        rss = RunningStats()
+        percent = RunningStats()
+        
+        if pid is not None:
+            process = self.processes.get(pid)
+            if process is None:
+                return {}
+            tier = process.tier(since)
+            tier.merge_into(since, rss, percent)
+            if not rss.count:
+                return {}
+            summary = _summarize(rss, percent, rss.count)
+            summary["name"] = process.name
+            summary["resolution"] = tier.resolution
+            return summary
+        
+        for process in self.processes.values():
+            process.tier(since).merge_into(since, rss, percent)
+        if not rss.count:
+            return {}
+        # Tick count from the totals series
+        ticks = RunningStats()
+        tier = self.total.tier(since)
+        tier.merge_into(since, ticks, RunningStats())
+        summary = _summarize(rss, percent, ticks.count)
+        summary["process_samples"] = rss.count
+        summary["resolution"] = tier.resolution
+        return summary
+    
+    def summary(self, pid: Optional[int] = None, window: Optional[float] = None) -> Dict[str, Any]:
+        """Return summary statistics globally or for a single process.
+        
+        With ``window`` (seconds) the statistics cover only that much of
+        the most recent history, read from the finest tier that still
+        holds it; ``resolution`` gives that tier's spacing in seconds.
+        ``samples`` counts ticks for the global summary, over the whole
+        session rather than the retained depth, and the process's samples
+        otherwise; global summaries add the per-process sample count as
+        ``process_samples``.
+        """
+        with self._lock:
+            if window is not None:
+                return self._window_summary(pid, window)
+            if pid is None:
+                if not self.rss.count:
+                    return {}
+                summary = _summarize(self.rss, self.percent, self.ticks)
+                summary["process_samples"] = self.rss.count
+                return summary
+            
+            process = self.processes.get(pid)
+            if process is None:
+                return {}
+            summary = _summarize(process.rss, process.percent, process.rss.count)
+            summary["name"] = process.name
+            return summary
@@ -0,0 +1,113 @@
+"""Incremental index of running processes."""
+
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Set, Tuple
+
+if TYPE_CHECKING:
+    import psutil
+
+# (pid, ppid, name, create_time, psutil.Process or None)
+ScanEntry = Tuple[int, int, str, float, Optional["psutil.Process"]]
+
+
+def psutil_scan() -> Iterator[ScanEntry]:
+    """Enumerate processes with a single psutil.process_iter pass."""
+    import psutil
+    for proc in psutil.process_iter(['ppid', 'name', 'create_time']):
+        info = proc.info
+        yield (
+            proc.pid,
+            info.get('ppid') or 0,
+            info.get('name') or "",
+            info.get('create_time') or 0.0,
+            proc
+        )
+
+
+class ProcessEntry:
+    """Cached identity of a running process."""
+    
+    def __init__(
+        self,
+        pid: int,
+        ppid: int,
+        name: str,
+        create_time: float,
+        proc: Optional["psutil.Process"] = None
+    ):
+        self.pid = pid
+        self.ppid = ppid
+        self.name = name
+        self.create_time = create_time
+        self.proc = proc
+
+
+class ProcessIndex:
+    """Persistent PID index keyed by (pid, create_time).
+
+    Each refresh does one pass over the process table and rebuilds the
+    parent->children map. Name patterns are only evaluated for processes
+    that are new or renamed (by an exec) since the previous refresh;
+    results for exited or reused PIDs are evicted.
+    """
+    
+    def __init__(self, scan: Optional[Callable[[], Iterable[ScanEntry]]] = None):
+        self._scan = scan or psutil_scan
+        self.entries: Dict[int, ProcessEntry] = {}
+        self.children: Dict[int, List[int]] = {}
+        self._matches: Dict[Pattern, Set[int]] = {}
+    
+    def refresh(self):
+        """Rescan the process table and update cached matches."""
+        entries: Dict[int, ProcessEntry] = {}
+        children: Dict[int, List[int]] = {}
+        new: List[ProcessEntry] = []
+        
+        for pid, ppid, name, create_time, proc in self._scan():
+            entry = self.entries.get(pid)
+            if entry is None or entry.create_time != create_time or entry.name != name:
+                entry = ProcessEntry(pid, ppid, name, create_time, proc)
+                new.append(entry)
+            else:
+                # Orphans get reparented, so ppid is refreshed every pass
+                entry.ppid = ppid
+            entries[pid] = entry
+            children.setdefault(ppid, []).append(pid)
+        
+        gone = self.entries.keys() - entries.keys()
+        for pattern, matched in self._matches.items():
+            matched -= gone
+            for entry in new:
+                if pattern.search(entry.name):
+                    matched.add(entry.pid)
+                else:
+                    matched.discard(entry.pid)
+        
+        self.entries = entries
+        self.children = children
+    
+    def matching(self, pattern: Pattern) -> List[int]:
+        """Return PIDs whose name matches the pattern."""
+        matched = self._matches.get(pattern)
+        if matched is None:
+            matched = {
+                pid for pid, entry in self.entries.items()
+                if pattern.search(entry.name)
+            }
+            self._matches[pattern] = matched
+        return sorted(matched)
+    
+    def descendants(self, pid: int) -> List[int]:
+        """Return all descendants of a process from the cached tree."""
+        result = []
+        seen = {pid}
+        stack = list(self.children.get(pid, ()))
+        
+        while stack:
+            child = stack.pop()
+            if child in seen:
+                continue
+            seen.add(child)
+            result.append(child)
+            stack.extend(self.children.get(child, ()))
+        
+        return result
@@ -0,0 +1,103 @@
+"""Headless output writing one JSON object per line for each sample.
+
+Only the standard library is imported here, so runs from cron, health
+checks or log pipelines never load rich.
+"""
+
+import json
+import sys
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+from .top import ProcessGroup
+
+DETAIL_FIELDS = ("pss", "uss", "swap")
+
+
+class JSONLinesWriter:
+    """Write each sample as one compact JSON line.
+    
+    A line holds ``timestamp``, ``total_rss`` and ``processes`` (pid,
+    name, rss, vms, percent and pss/uss/swap with their ``detail_time``
+    only when the detail sampler filled them; --group-by rows give
+    ``group`` and member ``count`` instead of pid and name, and pss with
+    the oldest member sample time once a member was sampled), plus
+    ``alerts``, ``exits``, ``targets`` (label to PIDs), ``missed``
+    deadlines, ``dropped`` ticks and ``deferred`` detail reads when there
+    are any. One encoder is reused for every line, and lines are flushed
+    as written so a reader on a pipe sees each sample as it is taken.
+    """
+    
+    def __init__(self, stream: Optional[IO[str]] = None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.lines = 0
+        self._encoder = json.JSONEncoder(separators=(",", ":"))
+    
+    def _process(self, stat) -> Dict[str, Any]:
+        if isinstance(stat, ProcessGroup):
+            row = {"group": stat.name, "count": stat.count}
+        else:
+            row = {"pid": stat.pid, "name": stat.name}
+        row.update({
+            "rss": stat.rss,
+            "vms": stat.vms,
+            "percent": stat.percent
+        })
+        detail = False
+        for field in DETAIL_FIELDS:
+            value = getattr(stat, field, None)
+            if value is not None:
+                row[field] = value
+                detail = True
+        if detail:
+            # Detail samples are budgeted and may be several ticks older than rss
+            row["detail_time"] = stat.detail_time
+        return row
+    
+    def write(
+        self,
+        timestamp: float,
+        stats: List,
+        alerts: Optional[List] = None,
+        total_rss: Optional[int] = None,
+        groups: Optional[List[Tuple[str, List]]] = None,
+        exits: Optional[List] = None,
+        missed: int = 0,
+        dropped: int = 0,
+        deferred: int = 0
+    ):
+        """Write one sample; ``groups`` is a list of (label, stats) as for Display.show."""
+        line: Dict[str, Any] = {
+            "timestamp": timestamp,
+            "total_rss": sum(stat.rss for stat in stats) if total_rss is None else total_rss,
+            "processes": [self._process(stat) for stat in stats]
+        }
+        if alerts:
+            line["alerts"] = [
+                {
+                    "pid": alert.pid,
+                    "name": alert.name,
+                    "level": alert.level,
+                    "kind": alert.kind,
+                    "value": alert.current,
+                    "threshold": alert.threshold,
+                    "eta": alert.eta
+                }
+                for alert in alerts
+            ]
+        if exits:
+            line["exits"] = [
+                {"pid": event.stat.pid, "name": event.stat.name, "timestamp": event.timestamp, "rss": event.stat.rss}
+                for event in exits
+            ]
+        if groups is not None:
+            line["targets"] = {label: [stat.pid for stat in members] for label, members in groups}
+        if missed:
+            line["missed"] = missed
+        if dropped:
+            line["dropped"] = dropped
+        if deferred:
+            line["deferred"] = deferred
+        
+        self.stream.write(self._encoder.encode(line) + "\n")
+        self.stream.flush()
+        self.lines += 1
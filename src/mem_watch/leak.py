@@ -0,0 +1,172 @@
+"""Online memory-leak detection from RSS growth trends."""
+
+import math
+from typing import Dict, List, Optional
+
+from .alerts import Alert
+
+
+class DecayedTrend:
+    """Least-squares slope with exponentially decaying sample weights.
+
+    Old samples lose half their weight every ``half_life`` seconds, so the
+    fit follows the recent growth rate in constant memory.
+    """
+    
+    def __init__(self, half_life: float):
+        self.rate = math.log(2) / half_life
+        self.origin: Optional[float] = None
+        self.last: Optional[float] = None
+        self.count = 0
+        self._w = 0.0
+        self._sum_t = 0.0
+        self._sum_v = 0.0
+        self._sum_tt = 0.0
+        self._sum_tv = 0.0
+    
+    def add(self, t: float, value: float):
+        if self.origin is None:
+            self.origin = self.last = t
+        if t > self.last:
+            decay = math.exp(-self.rate * (t - self.last))
+            self._w *= decay
+            self._sum_t *= decay
+            self._sum_v *= decay
+            self._sum_tt *= decay
+            self._sum_tv *= decay
+            self.last = t
+        t -= self.origin
+        self.count += 1
+        self._w += 1.0
+        self._sum_t += t
+        self._sum_v += value
+        self._sum_tt += t * t
+        self._sum_tv += t * value
+    
+    @property
+    def slope(self) -> float:
+        """Change in value per second (0 until two distinct times are seen)."""
+        denominator = self._w * self._sum_tt - self._sum_t * self._sum_t
+        if self.count < 2 or denominator <= 1e-9 * self._w * self._sum_tt:
+            return 0.0
+        return (self._w * self._sum_tv - self._sum_t * self._sum_v) / denominator
+    
+    def fitted(self, t: float) -> float:
+        """Value of the fitted line at time ``t``."""
+        if not self._w:
+            return 0.0
+        mean_t = self._sum_t / self._w
+        mean_v = self._sum_v / self._w
+        return mean_v + self.slope * (t - self.origin - mean_t)
+
+
+class _LeakState:
+    """Trend state for one process incarnation."""
+    
+    __slots__ = ("name", "create_time", "started", "bucket_start", "trough", "trough_time", "trend")
+    
+    def __init__(self, name: str, create_time: Optional[float], timestamp: float, half_life: float):
+        self.name = name
+        self.create_time = create_time
+        self.started = timestamp
+        self.bucket_start = timestamp
+        self.trough: Optional[float] = None
+        self.trough_time = timestamp
+        self.trend = DecayedTrend(half_life)
+
+
+class LeakDetector:
+    """Flag processes whose RSS keeps growing.
+
+    Samples are reduced to the minimum RSS of each ``bucket`` seconds
+    before fitting, so garbage-collector sawtooth peaks do not look like
+    growth; the troughs only rise when memory is really retained. A
+    process is reported once it has been watched for ``min_duration``
+    seconds and grows faster than ``min_rate`` bytes per second. The alert
+    carries the projected seconds until RSS reaches ``limit`` bytes, or
+    total system memory when no limit is given, and is critical when that
+    is under ``critical_eta`` seconds.
+
+    State is kept per PID and reset when the PID's create time or name
+    changes, so a reused PID starts a fresh trend.
+    """
+    
+    def __init__(
+        self,
+        bucket: float = 60.0,
+        half_life: float = 3600.0,
+        min_duration: float = 600.0,
+        min_rate: float = 1024 ** 2 / 3600,
+        limit: Optional[int] = None,
+        critical_eta: float = 3600.0
+    ):
+        self.bucket = bucket
+        self.half_life = half_life
+        self.min_duration = min_duration
+        self.min_rate = min_rate
+        self.limit = limit
+        self.critical_eta = critical_eta
+        self._states: Dict[int, _LeakState] = {}
+    
+    def _state(self, stat, timestamp: float) -> _LeakState:
+        state = self._states.get(stat.pid)
+        if state is None or state.name != stat.name or state.create_time != stat.create_time:
+            state = _LeakState(stat.name, stat.create_time, timestamp, self.half_life)
+        return state
+    
+    def _limit(self, stat) -> Optional[float]:
+        if self.limit is not None:
+            return self.limit
+        if stat.percent > 0:
+            return stat.rss * 100 / stat.percent
+        return None
+    
+    def update(self, stat, timestamp: float) -> Optional[float]:
+        """Fold one sample into the process's trend and return its slope."""
+        state = self._states[stat.pid] = self._state(stat, timestamp)
+        
+        if timestamp - state.bucket_start >= self.bucket:
+            if state.trough is not None:
+                state.trend.add(state.trough_time, state.trough)
+            state.bucket_start = timestamp
+            state.trough = None
+        if state.trough is None or stat.rss <= state.trough:
+            state.trough = stat.rss
+            state.trough_time = timestamp
+        return state.trend.slope
+    
+    def check(self, stats: List, now: Optional[float] = None) -> List[Alert]:
+        """Update trends and return leak alerts for growing processes.
+
+        Processes missing from ``stats`` are forgotten.
+        """
+        alerts = []
+        seen = set()
+        
+        for stat in stats:
+            timestamp = now if now is not None else stat.timestamp
+            seen.add(stat.pid)
+            slope = self.update(stat, timestamp)
+            state = self._states[stat.pid]
+            
+            if (timestamp - state.started < self.min_duration
+                    or state.trend.count < 2 or slope < self.min_rate):
+                continue
+            
+            limit = self._limit(stat)
+            eta = None
+            if limit is not None:
+                eta = max(limit - state.trend.fitted(timestamp), 0.0) / slope
+            alerts.append(Alert(
+                pid=stat.pid,
+                name=stat.name,
+                current=slope,
+                threshold=self.min_rate,
+                level="critical" if eta is not None and eta < self.critical_eta else "warning",
+                kind="leak",
+                eta=eta
+            ))
+        
+        if len(seen) != len(self._states):
+            self._states = {pid: state for pid, state in self._states.items() if pid in seen}
+        return alerts
@@ -0,0 +1,204 @@
+"""OpenMetrics/Prometheus HTTP endpoint for the latest sample."""
+
+import gzip
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+TEXT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (metric name, ProcessStats attribute, help text)
+PROCESS_METRICS = (
+    ("mem_watch_process_rss_bytes", "rss", "Resident set size of the process."),
+    ("mem_watch_process_vms_bytes", "vms", "Virtual memory size of the process."),
+    ("mem_watch_process_memory_percent", "percent", "RSS as a percentage of total system memory."),
+    ("mem_watch_process_pss_bytes", "pss", "Proportional set size from smaps_rollup."),
+    ("mem_watch_process_uss_bytes", "uss", "Unique set size from smaps_rollup."),
+    ("mem_watch_process_swap_bytes", "swap", "Swapped-out memory from smaps_rollup."),
+    ("mem_watch_process_detail_timestamp_seconds", "detail_time", "Time pss, uss and swap were last read."),
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class _Payload:
+    """One rendered sample; the gzipped body is built on first request."""
+    
+    __slots__ = ("body", "etag", "_compressed", "_lock")
+    
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = f"\"{hashlib.blake2b(body, digest_size=8).hexdigest()}\""
+        self._compressed: Optional[bytes] = None
+        self._lock = threading.Lock()
+    
+    def compressed(self) -> bytes:
+        if self._compressed is None:
+            with self._lock:
+                if self._compressed is None:
+                    self._compressed = gzip.compress(self.body, compresslevel=6)
+        return self._compressed
+
+
+class MetricsRenderer:
+    """Format samples and active alerts in the OpenMetrics text format.
+
+    The output is also valid Prometheus text format 0.0.4, which reads
+    the trailing ``# EOF`` as a comment. Label strings are cached per
+    (pid, name) between renders.
+    """
+    
+    def __init__(self):
+        self._labels: Dict[Tuple[int, str], str] = {}
+    
+    def _label(self, pid: int, name: str) -> str:
+        key = (pid, name)
+        labels = self._labels.get(key)
+        if labels is None:
+            labels = self._labels[key] = f"pid=\"{pid}\",name=\"{_escape(name)}\""
+        return labels
+    
+    def render(self, stats: List, alerts: Optional[List] = None, timestamp: Optional[float] = None) -> bytes:
+        labels = [self._label(stat.pid, stat.name) for stat in stats]
+        lines = []
+        
+        for metric, attribute, help_text in PROCESS_METRICS:
+            samples = []
+            for label, stat in zip(labels, stats):
+                value = getattr(stat, attribute)
+                if value is not None:
+                    samples.append(f"{metric}{{{label}}} {value}")
+            # Detail families are left out entirely when detail sampling is off
+            if samples or attribute in ("rss", "vms", "percent"):
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.extend(samples)
+        
+        lines.append("# TYPE mem_watch_processes gauge")
+        lines.append("# HELP mem_watch_processes Number of processes in the last sample.")
+        lines.append(f"mem_watch_processes {len(stats)}")
+        
+        if timestamp is not None:
+            lines.append("# TYPE mem_watch_last_sample_timestamp_seconds gauge")
+            lines.append("# HELP mem_watch_last_sample_timestamp_seconds Time of the last sample.")
+            lines.append(f"mem_watch_last_sample_timestamp_seconds {timestamp}")
+        
+        alert_labels = [
+            f"{self._label(alert.pid, alert.name)},level=\"{alert.level}\",kind=\"{alert.kind}\""
+            for alert in alerts or ()
+        ]
+        lines.append("# TYPE mem_watch_alert_active gauge")
+        lines.append("# HELP mem_watch_alert_active Active alerts by process, level and kind.")
+        lines.extend(f"mem_watch_alert_active{{{label}}} 1" for label in alert_labels)
+        lines.append("# TYPE mem_watch_alert_value gauge")
+        lines.append("# HELP mem_watch_alert_value Value that raised the alert (bytes/s for leaks).")
+        lines.extend(
+            f"mem_watch_alert_value{{{label}}} {alert.current}"
+            for label, alert in zip(alert_labels, alerts or ())
+        )
+        
+        lines.append("# EOF")
+        
+        if len(self._labels) > 2 * len(stats) + 1024:
+            self._labels = {(stat.pid, stat.name): label for label, stat in zip(labels, stats)}
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "mem-watch"
+    protocol_version = "HTTP/1.1"
+    
+    def _respond(self, send_body: bool):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        payload = self.server.payload
+        if payload is None:
+            self.send_error(503, "No sample yet")
+            return
+        
+        if payload.etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", payload.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        body = payload.body
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            body = payload.compressed()
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        
+        self.send_response(200)
+        self.send_header("Content-Type", OPENMETRICS_TYPE if openmetrics else TEXT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", payload.etag)
+        self.send_header("Vary", "Accept, Accept-Encoding")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+    
+    def do_GET(self):
+        self._respond(send_body=True)
+    
+    def do_HEAD(self):
+        self._respond(send_body=False)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer:
+    """Serve the latest sample over HTTP at ``/metrics``.
+
+    ``update()`` renders the payload once per sample; request threads only
+    copy the cached bytes, so scrapers never trigger sampling or
+    formatting. Responses carry an ETag for ``If-None-Match`` requests
+    and are gzipped when the client accepts it.
+    """
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 9487):
+        self.renderer = MetricsRenderer()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.payload = None
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+    
+    def update(self, stats: List, alerts: Optional[List] = None, timestamp: Optional[float] = None):
+        """Render a new snapshot and make it the one served."""
+        self._server.payload = _Payload(self.renderer.render(stats, alerts, timestamp))
+    
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever,
+                kwargs={"poll_interval": 0.1},
+                name="mem-watch-metrics",
+                daemon=True
+            )
+            self._thread.start()
+    
+    def close(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
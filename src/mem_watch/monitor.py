@@ -1,67 +1,240 @@
 """Core memory monitoring functionality."""
 
+import os
 import re
+import threading
 import time
-from typing import List, Optional, Dict, Any
-import psutil
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Set, Tuple
+
+from .history import DEFAULT_BUDGET, History
+from .index import ProcessIndex
+from .profiling import NULL_PROFILER
+
+if TYPE_CHECKING:
+    # Imported where used, so the procfs backend and headless startup skip it
+    import psutil
 
 
 class ProcessStats:
-    """Container for process memory statistics."""
+    """Container for process memory statistics.
+
+    ``timestamp`` defaults to now; samplers pass one shared timestamp per
+    tick. ``pss``, ``uss`` and ``swap`` are only filled in when detail
+    sampling is enabled; ``detail_time`` is when they were last read and
+    may be older than ``timestamp``. Instances use ``__slots__``, so long
+    histories do not pay for a ``__dict__`` per sample.
+    """
     
-    def __init__(self, pid: int, name: str, rss: int, vms: int, percent: float):
+    __slots__ = (
+        "pid", "name", "rss", "vms", "percent", "create_time", "timestamp",
+        "pss", "uss", "swap", "detail_time"
+    )
+    
+    def __init__(
+        self,
+        pid: int,
+        name: str,
+        rss: int,
+        vms: int,
+        percent: float,
+        create_time: Optional[float] = None,
+        timestamp: Optional[float] = None
+    ):
         self.pid = pid
         self.name = name
         self.rss = rss
         self.vms = vms
         self.percent = percent
-        self.timestamp = time.time()
+        self.create_time = create_time
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.pss: Optional[int] = None
+        self.uss: Optional[int] = None
+        self.swap: Optional[int] = None
+        self.detail_time: Optional[float] = None
+
+
+class Target:
+    """Processes selected by PID or name regex, optionally with their descendants."""
+    
+    def __init__(
+        self,
+        pid: Optional[int] = None,
+        name_pattern: Optional[str] = None,
+        include_children: bool = False,
+        label: Optional[str] = None
+    ):
+        self.pid = pid
+        self.name_pattern = re.compile(name_pattern) if name_pattern else None
+        self.include_children = include_children
+        if label is None:
+            label = f"pid {pid}" if pid else f"/{self.name_pattern.pattern if self.name_pattern else ''}/"
+            if include_children:
+                label += " +children"
+        self.label = label
+    
+    def resolve(self, index: ProcessIndex) -> List[int]:
+        """Return the target's PIDs from a refreshed process index."""
+        if self.pid:
+            roots = [self.pid] if self.pid in index.entries else []
+        elif self.name_pattern:
+            roots = index.matching(self.name_pattern)
+        else:
+            return []
+        
+        if not self.include_children:
+            return roots
+        
+        pids = []
+        seen = set()
+        for root in roots:
+            for pid in [root] + index.descendants(root):
+                if pid not in seen:
+                    seen.add(pid)
+                    pids.append(pid)
+        return pids
 
 
 class MemoryMonitor:
-    """Monitor memory usage of processes."""
+    """Monitor memory usage of processes.
+
+    Processes are chosen by ``pid``/``name_pattern``, by a list of
+    ``targets`` sampled together from one scan, by ``cgroups`` or with
+    ``all_processes``. With ``targets`` each tick's PIDs per target are
+    kept in ``target_pids`` (see ``by_target``).
+
+    With ``watch_exits`` sampled processes are watched through pidfds
+    (or polled where pidfd is unavailable) and each exit is queued with
+    its last sample for ``pop_exits``. On the procfs backend a PID's
+    child tree is then read from its children files instead of a full
+    process scan.
+    """
     
     def __init__(
         self,
         pid: Optional[int] = None,
         name_pattern: Optional[str] = None,
         include_children: bool = False,
-        interval: float = 1.0
+        interval: float = 1.0,
+        backend: str = "psutil",
+        proc_root: str = "/proc",
+        history_size: int = 300,
+        history_budget: int = DEFAULT_BUDGET,
+        all_processes: bool = False,
+        cgroups: Optional[List[str]] = None,
+        cgroup_root: str = "/sys/fs/cgroup",
+        detail_interval: Optional[float] = None,
+        detail_budget: float = 0.02,
+        schedule=None,
+        profiler=None,
+        targets: Optional[List[Target]] = None,
+        watch_exits: bool = False
     ):
         self.pid = pid
         self.name_pattern = re.compile(name_pattern) if name_pattern else None
         self.include_children = include_children
         self.interval = interval
-        self.history: List[List[ProcessStats]] = []
+        self.all_processes = all_processes
+        self.targets: List[Target] = list(targets or [])
+        self.target_pids: Dict[Target, List[int]] = {}
+        self._target = Target(pid, name_pattern, include_children)
+        self.cgroups = cgroups
+        self.schedule = schedule
+        self.profiler = profiler or NULL_PROFILER
+        self._latest: Dict[int, ProcessStats] = {}
+        self.proc_root = proc_root
+        self.history = History(history_size, budget=history_budget)
+        self.backend = backend
+        self._sampler = None
         
-    def _get_processes(self) -> List[psutil.Process]:
-        """Get list of processes to monitor."""
-        processes = []
+        if backend == "procfs":
+            from .procfs import ProcfsSampler
+            self._sampler = ProcfsSampler(proc_root)
+        elif backend != "psutil":
+            raise ValueError(f"Unknown backend: {backend}")
         
-        if self.pid:
-            try:
-                proc = psutil.Process(self.pid)
-                processes.append(proc)
-                if self.include_children:
-                    processes.extend(proc.children(recursive=True))
-            except psutil.NoSuchProcess:
-                return []
-        elif self.name_pattern:
-            for proc in psutil.process_iter(['pid', 'name']):
+        self.index = ProcessIndex(self._sampler.scan if self._sampler else None)
+        
+        self.details = None
+        if detail_interval is not None:
+            from .smaps import DetailSampler
+            self.details = DetailSampler(proc_root, detail_interval, detail_budget)
+        
+        self._cgroups = None
+        if cgroups:
+            from .cgroup import CgroupSampler
+            self._cgroups = CgroupSampler(cgroup_root, proc_root)
+        
+        self.exits = None
+        self._last: Dict[int, ProcessStats] = {}
+        self._exited: List = []
+        self._gone: Set[Tuple[int, Optional[float]]] = set()
+        self._exit_lock = threading.Lock()
+        if watch_exits and not cgroups:
+            from .events import create_watcher
+            self.exits = create_watcher(self._on_exit, self._exists if self._sampler else None)
+        
+    def _get_pids(self) -> List[int]:
+        """Resolve PIDs to monitor from the process index."""
+        if self.pid and not self.include_children and not self.targets:
+            return [self.pid]
+        
+        if self._cgroups is not None:
+            pids = []
+            for name in self._cgroups.resolve(self.cgroups):
+                pids.extend(self._cgroups.pids(name))
+            return sorted(set(pids))
+        
+        if self.pid and self.exits is not None and self._sampler is not None and not self.targets:
+            tree = self._sampler.descendants(self.pid)
+            if tree is not None:
+                return [self.pid] + tree
+        
+        with self.profiler.phase("enumerate"):
+            self.index.refresh()
+        self.profiler.count("processes_scanned", len(self.index.entries))
+        
+        if self.all_processes:
+            return list(self.index.entries)
+        
+        targets = self.targets
+        if targets:
+            # One scan serves every target; overlapping targets are sampled once
+            target_pids = {}
+            pids: Dict[int, None] = {}
+            for target in targets:
+                target_pids[target] = resolved = target.resolve(self.index)
+                pids.update(dict.fromkeys(resolved))
+            self.target_pids = target_pids
+            return list(pids)
+        
+        return self._target.resolve(self.index)
+    
+    def _process(self, pid: int) -> "psutil.Process":
+        import psutil
+        entry = self.index.entries.get(pid)
+        if entry is not None and entry.proc is not None:
+            return entry.proc
+        return psutil.Process(pid)
+    
+    def _get_processes(self) -> List["psutil.Process"]:
+        """Get list of processes to monitor."""
+        if (self.pid and not self.include_children and not self.targets) or self._cgroups is not None:
+            import psutil
+            processes = []
+            for pid in self._get_pids():
                 try:
-                    if self.name_pattern.search(proc.info['name']):
-                        processes.append(proc)
-                        if self.include_children:
-                            processes.extend(proc.children(recursive=True))
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    processes.append(psutil.Process(pid))
+                except psutil.NoSuchProcess:
                     continue
+            return processes
         
-        return processes
+        return [self.index.entries[pid].proc for pid in self._get_pids()]
     
-    def collect(self) -> List[ProcessStats]:
-        """Collect current memory statistics."""
+    def _sample_psutil(self, processes: List["psutil.Process"]) -> List[ProcessStats]:
+        """Sample memory statistics through psutil."""
+        import psutil
         stats = []
-        processes = self._get_processes()
+        now = time.time()
         
         for proc in processes:
             try:
@@ -73,33 +246,194 @@ class MemoryMonitor:
                     name=proc.name(),
                     rss=mem_info.rss,
                     vms=mem_info.vms,
-                    percent=mem_percent
+                    percent=mem_percent,
+                    create_time=proc.create_time(),
+                    timestamp=now
                 )
                 stats.append(stat)
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
         
-        if stats:
-            self.history.append(stats)
-            if len(self.history) > 100:
-                self.history.pop(0)
+        return stats
+    
+    def _scan_psutil(self) -> List[ProcessStats]:
+        """Sample every process in one psutil.process_iter pass."""
+        import psutil
+        total = psutil.virtual_memory().total
+        stats = []
+        now = time.time()
+        
+        for proc in psutil.process_iter(['name', 'memory_info', 'create_time']):
+            info = proc.info
+            mem_info = info.get('memory_info')
+            if mem_info is None:
+                continue
+            stats.append(ProcessStats(
+                pid=proc.pid,
+                name=info.get('name') or "",
+                rss=mem_info.rss,
+                vms=mem_info.vms,
+                percent=mem_info.rss / total * 100 if total else 0.0,
+                create_time=info.get('create_time'),
+                timestamp=now
+            ))
         
         return stats
     
-    def get_summary(self) -> Dict[str, Any]:
-        """Calculate summary statistics from history."""
-        if not self.history:
-            return {}
+    def _collect_cgroups(self) -> List[ProcessStats]:
+        """Sample the target cgroups, then their member processes when drilling down."""
+        stats = self._cgroups.sample(self._cgroups.resolve(self.cgroups))
+        if self.include_children:
+            if self._sampler is not None:
+                members = self._sampler.sample(self._get_pids())
+            else:
+                members = self._sample_psutil(self._get_processes())
+            if self.details is not None:
+                self.details.update(members)
+            stats += members
+        return stats
+    
+    def _collect_adaptive(self) -> Tuple[List[ProcessStats], List[ProcessStats]]:
+        """Sample the processes that are due and carry the others' latest sample forward.
+
+        Returns (fresh, all) samples; carried samples keep their original timestamps.
+        """
+        pids = self._get_pids()
+        now = time.time()
+        due = self.schedule.due(pids, now)
+        
+        if self._sampler is not None:
+            fresh = self._sampler.sample(due, evict=False)
+            self._sampler.retain(pids)
+        else:
+            import psutil
+            processes = []
+            for pid in due:
+                try:
+                    processes.append(self._process(pid))
+                except psutil.NoSuchProcess:
+                    continue
+            fresh = self._sample_psutil(processes)
+        self.schedule.observe(fresh, now)
+        
+        latest = self._latest
+        for stat in fresh:
+            latest[stat.pid] = stat
+        self._latest = {pid: latest[pid] for pid in pids if pid in latest}
+        return fresh, list(self._latest.values())
+    
+    def _read_counts(self) -> Dict[str, int]:
+        """File reads made so far by the procfs, smaps and cgroup samplers."""
+        return {
+            name: source.reads
+            for name, source in (
+                ("proc_reads", self._sampler), ("smaps_reads", self.details), ("cgroup_reads", self._cgroups)
+            )
+            if source is not None
+        }
+    
+    def collect(self, record: bool = True) -> List[ProcessStats]:
+        """Collect current memory statistics.
+
+        With ``record=False`` the samples are not added to the history,
+        for callers that record a reduced set themselves. With an adaptive
+        ``schedule`` only due processes are sampled; the rest are returned
+        with their previous sample and are not recorded again.
+        """
+        profiling = self.profiler.enabled
+        if profiling:
+            reads = self._read_counts()
+        
+        with self.profiler.phase("collect"):
+            if self._cgroups is not None:
+                stats = fresh = self._collect_cgroups()
+            elif self.schedule is not None and not (self.all_processes and self._sampler is None):
+                fresh, stats = self._collect_adaptive()
+            elif self._sampler is not None:
+                stats = fresh = self._sampler.sample(self._get_pids())
+            elif self.all_processes:
+                stats = fresh = self._scan_psutil()
+            else:
+                stats = fresh = self._sample_psutil(self._get_processes())
         
-        all_rss = [stat.rss for snapshot in self.history for stat in snapshot]
-        all_percent = [stat.percent for snapshot in self.history for stat in snapshot]
+        if fresh and self.details is not None and self._cgroups is None:
+            with self.profiler.phase("details"):
+                self.details.update(fresh)
+        if fresh and record:
+            with self.profiler.phase("history"):
+                self.history.record(fresh)
         
+        if self.exits is not None:
+            # Processes gone since the last tick are still in _last while the
+            # watcher reports them, so their exit carries the final sample
+            with self._exit_lock:
+                # Zombies stay listed until reaped; each exit is reported once
+                live = [stat for stat in stats if (stat.pid, stat.create_time) not in self._gone]
+                self._gone &= {(stat.pid, stat.create_time) for stat in stats}
+                self._last.update((stat.pid, stat) for stat in live)
+            current = [stat.pid for stat in live]
+            self.exits.track(current)
+            with self._exit_lock:
+                self._last = {pid: self._last[pid] for pid in current if pid in self._last}
+        
+        if profiling:
+            self.profiler.count("processes_sampled", len(fresh))
+            for name, n in self._read_counts().items():
+                self.profiler.count(name, n - reads[name])
+        return stats
+    
+    def _exists(self, pid: int) -> bool:
+        return os.path.exists(os.path.join(self.proc_root, str(pid)))
+    
+    def _on_exit(self, pid: int, timestamp: float):
+        from .events import ExitEvent
+        with self._exit_lock:
+            last = self._last.pop(pid, None)
+            if last is not None:
+                self._gone.add((pid, last.create_time))
+                self._exited.append(ExitEvent(last, timestamp))
+    
+    def pop_exits(self) -> List:
+        """Return and clear the exits seen since the last call, oldest first."""
+        with self._exit_lock:
+            exited, self._exited = self._exited, []
+        return exited
+    
+    def by_target(self, stats: List[ProcessStats]) -> Dict[Target, List[ProcessStats]]:
+        """Split a tick's samples between the targets that selected them."""
+        by_pid = {stat.pid: stat for stat in stats}
         return {
-            "min_rss": min(all_rss),
-            "max_rss": max(all_rss),
-            "avg_rss": sum(all_rss) / len(all_rss),
-            "min_percent": min(all_percent),
-            "max_percent": max(all_percent),
-            "avg_percent": sum(all_percent) / len(all_percent),
-            "samples": len(self.history)
+            target: [by_pid[pid] for pid in pids if pid in by_pid]
+            for target, pids in self.target_pids.items()
         }
+    
+    def username(self, pid: int) -> str:
+        """Return the name of the user owning a process, or '?' if unknown."""
+        import psutil
+        try:
+            if self._sampler is not None:
+                import pwd
+                uid = os.stat(os.path.join(self.proc_root, str(pid))).st_uid
+                try:
+                    return pwd.getpwuid(uid).pw_name
+                except KeyError:
+                    return str(uid)
+            return psutil.Process(pid).username()
+        except (OSError, psutil.Error):
+            return "?"
+    
+    def get_summary(self, pid: Optional[int] = None, window: Optional[float] = None) -> Dict[str, Any]:
+        """Return summary statistics for all samples or a single process.
+
+        ``window`` limits them to the last that many seconds.
+        """
+        return self.history.summary(pid, window)
+    
+    def close(self):
+        """Release resources held by the sampling backend."""
+        if self.exits is not None:
+            self.exits.close()
+        if self._sampler is not None:
+            self._sampler.close()
+        if self._cgroups is not None:
+            self._cgroups.close()
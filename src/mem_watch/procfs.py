@@ -0,0 +1,236 @@
+"""Direct /proc sampling backend for Linux."""
+
+import os
+import resource
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .monitor import ProcessStats
+
+
+class ProcfsSampler:
+    """Sample process memory by reading /proc directly.
+
+    ``/proc/<pid>/statm`` descriptors are kept open between ticks and
+    re-read with ``pread`` into a reused buffer, so a steady-state sample
+    costs a single syscall per process. The name and start time are read
+    once per process identity; ``scan`` refreshes cached names, since an
+    exec changes comm without changing the identity. ``reads`` counts
+    /proc file reads.
+    """
+    
+    def __init__(self, proc_root: str = "/proc", max_open: Optional[int] = None):
+        if not hasattr(os, "preadv") or not os.path.isdir(proc_root):
+            raise RuntimeError("procfs backend requires a Linux /proc filesystem")
+        
+        self.proc_root = proc_root
+        self.page_size = os.sysconf("SC_PAGE_SIZE")
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        self.max_open = max_open if max_open is not None else self._default_max_open()
+        self.boot_time = self._read_boot_time()
+        self.total_memory = 0
+        self._buf = bytearray(4096)
+        self._fds: Dict[int, int] = {}
+        self._identity: Dict[int, Tuple[float, str]] = {}
+        self._meminfo_fd: Optional[int] = None
+        self.reads = 0
+    
+    @staticmethod
+    def _default_max_open() -> int:
+        """Leave half of the descriptor limit for everything else."""
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft == resource.RLIM_INFINITY:
+            return 4096
+        return max(soft // 2, 16)
+    
+    def _read_boot_time(self) -> float:
+        """Read system boot time from /proc/stat."""
+        try:
+            with open(os.path.join(self.proc_root, "stat"), "rb") as f:
+                for line in f:
+                    if line.startswith(b"btime"):
+                        return float(line.split()[1])
+        except OSError:
+            pass
+        return 0.0
+    
+    def _pread(self, fd: int) -> bytes:
+        """Read a small /proc file from offset 0 into the shared buffer."""
+        self.reads += 1
+        n = os.preadv(fd, [self._buf], 0)
+        return bytes(self._buf[:n])
+    
+    def _read_total(self) -> int:
+        """Read MemTotal from /proc/meminfo, once per tick."""
+        if self._meminfo_fd is None:
+            self._meminfo_fd = os.open(os.path.join(self.proc_root, "meminfo"), os.O_RDONLY)
+        
+        for line in self._pread(self._meminfo_fd).splitlines():
+            if line.startswith(b"MemTotal:"):
+                return int(line.split()[1]) * 1024
+        return 0
+    
+    def _read_stat(self, pid: int) -> Tuple[int, str, float]:
+        """Read (ppid, name, create_time) for a process from /proc/<pid>/stat."""
+        self.reads += 1
+        with open(os.path.join(self.proc_root, str(pid), "stat"), "rb") as f:
+            data = f.read()
+        
+        # comm may contain spaces and parentheses, so split around the last ')'
+        lparen = data.index(b"(")
+        rparen = data.rindex(b")")
+        name = data[lparen + 1:rparen].decode("utf-8", "replace")
+        fields = data[rparen + 2:].split()
+        create_time = self.boot_time + int(fields[19]) / self.clock_ticks
+        return int(fields[1]), name, create_time
+    
+    def _read_identity(self, pid: int) -> Tuple[float, str]:
+        """Read (create_time, name) for a process."""
+        _, name, create_time = self._read_stat(pid)
+        return create_time, name
+    
+    def scan(self) -> Iterator[Tuple[int, int, str, float, None]]:
+        """Enumerate processes with one /proc/<pid>/stat read each."""
+        for entry in os.listdir(self.proc_root):
+            if not entry.isdigit():
+                continue
+            pid = int(entry)
+            try:
+                ppid, name, create_time = self._read_stat(pid)
+            except (OSError, ValueError, IndexError):
+                continue
+            cached = self._identity.get(pid)
+            if cached is not None and cached[0] == create_time and cached[1] != name:
+                # Same process after an exec: keep the descriptor, take the new comm
+                self._identity[pid] = (create_time, name)
+            yield pid, ppid, name, create_time, None
+    
+    def children(self, pid: int) -> Optional[List[int]]:
+        """Direct children from /proc/<pid>/task/*/children.
+
+        Returns None when the kernel does not provide the children files
+        (CONFIG_PROC_CHILDREN) and an empty list if the process is gone.
+        """
+        task_dir = os.path.join(self.proc_root, str(pid), "task")
+        try:
+            tids = os.listdir(task_dir)
+        except OSError:
+            return []
+        
+        children = []
+        for tid in tids:
+            self.reads += 1
+            try:
+                with open(os.path.join(task_dir, tid, "children"), "rb") as f:
+                    children.extend(int(child) for child in f.read().split())
+            except FileNotFoundError:
+                if not os.path.isdir(os.path.join(task_dir, tid)):
+                    continue  # Thread exited while listing
+                return None
+            except OSError:
+                continue
+        return children
+    
+    def descendants(self, pid: int) -> Optional[List[int]]:
+        """All descendants of a process read from the children files, or None if unsupported."""
+        result = []
+        seen = {pid}
+        stack = [pid]
+        while stack:
+            children = self.children(stack.pop())
+            if children is None:
+                return None
+            for child in children:
+                if child not in seen:
+                    seen.add(child)
+                    result.append(child)
+                    stack.append(child)
+        return result
+    
+    def _open(self, pid: int) -> int:
+        """Open statm for a new process and record its identity."""
+        fd = os.open(os.path.join(self.proc_root, str(pid), "statm"), os.O_RDONLY)
+        try:
+            self._identity[pid] = self._read_identity(pid)
+        except (OSError, ValueError, IndexError):
+            os.close(fd)
+            raise OSError(f"cannot read identity of process {pid}")
+        return fd
+    
+    def _forget(self, pid: int):
+        """Drop cached state for a process that is gone or no longer sampled."""
+        fd = self._fds.pop(pid, None)
+        if fd is not None:
+            os.close(fd)
+        self._identity.pop(pid, None)
+    
+    def identity(self, pid: int) -> Optional[Tuple[float, str]]:
+        """Return cached (create_time, name) for a sampled process."""
+        return self._identity.get(pid)
+    
+    def sample(self, pids: List[int], evict: bool = True) -> List[ProcessStats]:
+        """Sample memory statistics for the given PIDs.
+
+        Descriptors of PIDs not in ``pids`` are closed unless ``evict`` is
+        false, in which case the caller should use ``retain`` instead.
+        """
+        self.total_memory = total = self._read_total()
+        stats = []
+        now = time.time()
+        
+        for pid in pids:
+            fd = self._fds.get(pid)
+            persistent = True
+            try:
+                if fd is None:
+                    fd = self._open(pid)
+                    if len(self._fds) < self.max_open:
+                        self._fds[pid] = fd
+                    else:
+                        persistent = False
+                try:
+                    data = self._pread(fd)
+                finally:
+                    if not persistent:
+                        os.close(fd)
+            except OSError:
+                self._forget(pid)
+                continue
+            
+            fields = data.split()
+            if len(fields) < 2:
+                # Process exited between ticks
+                self._forget(pid)
+                continue
+            
+            rss = int(fields[1]) * self.page_size
+            create_time, name = self._identity[pid]
+            stats.append(ProcessStats(
+                pid=pid,
+                name=name,
+                rss=rss,
+                vms=int(fields[0]) * self.page_size,
+                percent=rss / total * 100 if total else 0.0,
+                create_time=create_time,
+                timestamp=now
+            ))
+            if not persistent:
+                self._identity.pop(pid, None)
+        
+        if evict:
+            self.retain(pids)
+        
+        return stats
+    
+    def retain(self, pids: List[int]):
+        """Close descriptors of processes not in ``pids``."""
+        for pid in self._fds.keys() - set(pids):
+            self._forget(pid)
+    
+    def close(self):
+        """Close all cached descriptors."""
+        for pid in list(self._fds):
+            self._forget(pid)
+        if self._meminfo_fd is not None:
+            os.close(self._meminfo_fd)
+            self._meminfo_fd = None
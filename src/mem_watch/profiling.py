@@ -0,0 +1,197 @@
+"""Self-overhead instrumentation: per-phase timings, read counters and own usage."""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+
+BUCKETS = 32
+
+
+class PhaseStats:
+    """Timing histogram for one phase, in power-of-two microsecond buckets."""
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * BUCKETS
+    
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[min(int(seconds * 1e6).bit_length(), BUCKETS - 1)] += 1
+    
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile, in seconds."""
+        if not self.count:
+            return 0.0
+        rank = max(p / 100 * self.count, 1)
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min((1 << index) / 1e6, self.max)
+        return self.max
+    
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000
+        }
+
+
+class _Phase:
+    __slots__ = ("stats", "lock", "start")
+    
+    def __init__(self, stats: PhaseStats, lock: threading.Lock):
+        self.stats = stats
+        self.lock = lock
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        with self.lock:
+            self.stats.add(elapsed)
+
+
+class Profiler:
+    """Collect mem-watch's own costs while it runs.
+
+    Code wraps its phases in ``with profiler.phase(name)`` and reports
+    work done with ``profiler.count(name, n)``; the main loop calls
+    ``tick()`` once per sample, which closes the counters for that tick
+    and samples mem-watch's own RSS and CPU usage. Phases and counters
+    are updated from both the sampler thread and the main loop, so
+    updates and reads go through a lock.
+    """
+    
+    enabled = True
+    
+    def __init__(self):
+        self.phases: Dict[str, PhaseStats] = {}
+        self.counters: Dict[str, int] = {}
+        self.totals: Dict[str, int] = {}
+        self.last_tick: Dict[str, int] = {}
+        self.ticks = 0
+        self.rss = 0
+        self.cpu_percent = 0.0
+        self.cpu_seconds = 0.0
+        self._started = time.monotonic()
+        self._last_wall = self._started
+        self._last_cpu = self._cpu_time()
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._lock = threading.Lock()
+    
+    def phase(self, name: str):
+        with self._lock:
+            stats = self.phases.get(name)
+            if stats is None:
+                stats = self.phases[name] = PhaseStats()
+        return _Phase(stats, self._lock)
+    
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+    
+    @staticmethod
+    def _cpu_time() -> float:
+        times = os.times()
+        return times.user + times.system
+    
+    def _own_rss(self) -> int:
+        try:
+            with open("/proc/self/statm", "rb") as f:
+                return int(f.read().split()[1]) * self._page_size
+        except (OSError, ValueError, IndexError):
+            import psutil
+            return psutil.Process().memory_info().rss
+    
+    def tick(self):
+        """Close the current tick's counters and sample own usage."""
+        with self._lock:
+            self.ticks += 1
+            self.last_tick = self.counters
+            for name, n in self.counters.items():
+                self.totals[name] = self.totals.get(name, 0) + n
+            self.counters = {}
+        
+        now = time.monotonic()
+        cpu = self._cpu_time()
+        if now > self._last_wall:
+            self.cpu_percent = (cpu - self._last_cpu) / (now - self._last_wall) * 100
+        self.cpu_seconds = cpu
+        self._last_wall = now
+        self._last_cpu = cpu
+        self.rss = self._own_rss()
+    
+    def summary(self) -> Dict[str, Any]:
+        """Everything collected so far, as plain data."""
+        elapsed = time.monotonic() - self._started
+        with self._lock:
+            return {
+                "ticks": self.ticks,
+                "elapsed_s": elapsed,
+                "rss_bytes": self.rss,
+                "cpu_percent": self.cpu_percent,
+                "cpu_seconds": self.cpu_seconds,
+                "phases": {name: stats.summary() for name, stats in sorted(self.phases.items())},
+                "counters_per_tick": {
+                    name: total / self.ticks for name, total in sorted(self.totals.items())
+                } if self.ticks else {},
+                "last_tick": dict(sorted(self.last_tick.items()))
+            }
+    
+    def dump(self, path: Optional[str] = None):
+        """Write the summary as JSON to ``path``, or to stderr when path is None or '-'."""
+        data = json.dumps(self.summary(), indent=2)
+        if path is None or path == "-":
+            print(data, file=sys.stderr)
+        else:
+            with open(path, "w") as f:
+                f.write(data + "\n")
+    
+    def footer(self) -> List[str]:
+        """Short text lines for the display's profile panel."""
+        with self._lock:
+            parts = [
+                f"{name} {stats.percentile(50) * 1000:.2f}/{stats.percentile(95) * 1000:.2f}ms"
+                for name, stats in sorted(self.phases.items())
+            ]
+            counts = [f"{name} {n}" for name, n in sorted(self.last_tick.items())]
+        lines = ["p50/p95: " + "  ".join(parts)] if parts else []
+        if counts:
+            lines.append("per tick: " + "  ".join(counts))
+        lines.append(f"self: RSS {self.rss / 1024 ** 2:.1f}MB  CPU {self.cpu_percent:.1f}%")
+        return lines
+
+
+class NullProfiler:
+    """Profiler stand-in that does nothing, used when profiling is off."""
+    
+    enabled = False
+    _phase = nullcontext()
+    
+    def phase(self, name: str):
+        return self._phase
+    
+    def count(self, name: str, n: int = 1):
+        pass
+    
+    def tick(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,192 @@
+"""Fixed-rate and adaptive sampling schedules."""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+
+class Tick:
+    """One sampling tick published to consumers."""
+    
+    def __init__(self, number: int, timestamp: float, stats: List, missed: int):
+        self.number = number
+        self.timestamp = timestamp
+        self.stats = stats
+        self.missed = missed
+
+
+class FixedRateSampler(threading.Thread):
+    """Collect samples on absolute deadlines from a monotonic clock.
+
+    Deadlines are ``start + n * interval``, so time spent collecting or
+    in consumers never stretches the period. When a deadline has already
+    passed it is skipped and counted in ``missed`` rather than sampled late.
+    Ticks are handed to consumers through a bounded queue; if consumers
+    fall behind, the oldest tick is dropped and counted in ``dropped``.
+    """
+    
+    def __init__(
+        self,
+        collect: Callable[[], List],
+        interval: float,
+        duration: Optional[float] = None,
+        backlog: int = 64,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        super().__init__(name="mem-watch-sampler", daemon=True)
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+        
+        self.collect = collect
+        self.interval = interval
+        self.duration = duration
+        self.clock = clock
+        self.missed = 0
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=backlog)
+        self._stop_event = threading.Event()
+    
+    def _publish(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+    
+    def run(self):
+        start = self.clock()
+        last_slot = None
+        if self.duration is not None:
+            # Tolerate float error so duration=0.3, interval=0.1 gives 4 ticks
+            last_slot = int(self.duration / self.interval + 1e-9)
+        slot = 0
+        number = 0
+        
+        try:
+            while not self._stop_event.is_set():
+                timestamp = time.time()
+                stats = self.collect()
+                self._publish(Tick(number, timestamp, stats, self.missed))
+                number += 1
+                
+                # Deadlines are computed from the start, never accumulated
+                slot += 1
+                deadline = start + slot * self.interval
+                now = self.clock()
+                if now > deadline:
+                    skipped = int((now - deadline) // self.interval) + 1
+                    self.missed += skipped
+                    slot += skipped
+                    deadline = start + slot * self.interval
+                
+                if last_slot is not None and slot > last_slot:
+                    break
+                if self._stop_event.wait(max(deadline - self.clock(), 0)):
+                    break
+        except Exception as e:
+            self._publish(e)
+        self._publish(None)
+    
+    def ticks(self) -> Iterator[Tick]:
+        """Yield published ticks until the sampler finishes."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    
+    def stop(self):
+        """Ask the sampler thread to finish and wait for it."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+
+
+class _ProcessRate:
+    """Sampling state for one process under an AdaptiveSchedule."""
+    
+    __slots__ = ("create_time", "interval", "next_due", "rss")
+    
+    def __init__(self, create_time: Optional[float], interval: float):
+        self.create_time = create_time
+        self.interval = interval
+        self.next_due = 0.0
+        self.rss: Optional[int] = None
+
+
+class AdaptiveSchedule:
+    """Per-process sampling intervals between ``min_interval`` and ``max_interval``.
+
+    The monitor ticks every ``min_interval`` and only samples processes
+    that are due. After each sample a process drops straight to
+    ``min_interval`` if its RSS moved by more than ``change`` (a fraction)
+    since its previous sample, or if ``proximity(stat)`` (its value
+    relative to the alert threshold) is at least ``near``. If RSS moved by
+    less than a quarter of ``change``, its interval doubles, up to
+    ``max_interval``.
+    """
+    
+    def __init__(
+        self,
+        min_interval: float,
+        max_interval: float,
+        change: float = 0.05,
+        near: float = 0.8,
+        proximity: Optional[Callable[[object], float]] = None
+    ):
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Need 0 < min_interval <= max_interval")
+        
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.change = change
+        self.near = near
+        self.proximity = proximity
+        self._rates: Dict[int, _ProcessRate] = {}
+    
+    def due(self, pids: Iterable[int], now: float) -> List[int]:
+        """Return the PIDs to sample at ``now``; state for other PIDs is dropped."""
+        # Half a tick of slack so scheduler jitter does not push a
+        # process to the tick after its deadline
+        horizon = now + self.min_interval / 2
+        rates = {}
+        due = []
+        for pid in pids:
+            rate = self._rates.get(pid)
+            if rate is not None:
+                rates[pid] = rate
+            if rate is None or rate.next_due <= horizon:
+                due.append(pid)
+        self._rates = rates
+        return due
+    
+    def observe(self, stats: List, now: float):
+        """Adjust the intervals of freshly sampled processes."""
+        for stat in stats:
+            rate = self._rates.get(stat.pid)
+            if rate is None or rate.create_time != stat.create_time:
+                rate = self._rates[stat.pid] = _ProcessRate(stat.create_time, self.min_interval)
+            elif rate.rss is not None:
+                moved = abs(stat.rss - rate.rss) / max(rate.rss, 1)
+                if moved > self.change:
+                    rate.interval = self.min_interval
+                elif moved < self.change / 4:
+                    rate.interval = min(rate.interval * 2, self.max_interval)
+            
+            if self.proximity is not None and self.proximity(stat) >= self.near:
+                rate.interval = self.min_interval
+            rate.rss = stat.rss
+            rate.next_due = now + rate.interval
+    
+    def interval(self, pid: int) -> Optional[float]:
+        """Current sampling interval of a process."""
+        rate = self._rates.get(pid)
+        return rate.interval if rate else None
@@ -0,0 +1,95 @@
+"""Tiered sampling of expensive per-process memory fields."""
+
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# (create_time, pss, uss, swap, read at)
+_Detail = Tuple[Optional[float], int, int, int, float]
+
+
+def read_smaps_rollup(proc_root: str, pid: int) -> Tuple[int, int, int]:
+    """Return (pss, uss, swap) in bytes from /proc/<pid>/smaps_rollup."""
+    with open(os.path.join(proc_root, str(pid), "smaps_rollup"), "rb") as f:
+        data = f.read()
+    
+    fields = {}
+    for line in data.splitlines()[1:]:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].endswith(b":"):
+            fields[parts[0][:-1]] = int(parts[1]) * 1024
+    if b"Pss" not in fields:
+        raise ValueError(f"no Pss in smaps_rollup of process {pid}")
+    uss = fields.get(b"Private_Clean", 0) + fields.get(b"Private_Dirty", 0)
+    return fields[b"Pss"], uss, fields.get(b"Swap", 0)
+
+
+class DetailSampler:
+    """Refresh PSS/USS/swap on a slower schedule than RSS.
+
+    Values are cached per process identity and attached to every sample;
+    ``detail_time`` on each stat records when they were read. Each tick,
+    entries older than ``interval`` seconds are re-read, those of processes
+    in ``priority`` first and then the stalest, until ``budget`` seconds
+    have been spent, so the cost per tick stays bounded however many
+    processes are monitored.
+    """
+    
+    def __init__(
+        self,
+        proc_root: str = "/proc",
+        interval: float = 30.0,
+        budget: float = 0.02,
+        timer: Callable[[], float] = time.perf_counter,
+        reader: Callable[[str, int], Tuple[int, int, int]] = read_smaps_rollup
+    ):
+        self.proc_root = proc_root
+        self.interval = interval
+        self.budget = budget
+        self.priority: Set[int] = set()
+        self.deferred = 0
+        self.reads = 0
+        self._timer = timer
+        self._reader = reader
+        self._cache: Dict[int, _Detail] = {}
+    
+    def _candidates(self, stats: List, now: float) -> Iterable:
+        """Stats due for a refresh, priority processes first, then stalest first."""
+        due = []
+        for stat in stats:
+            cached = self._cache.get(stat.pid)
+            if cached is None or cached[0] != stat.create_time:
+                age = float("inf")
+            else:
+                age = now - cached[4]
+            if age >= self.interval:
+                due.append((0 if stat.pid in self.priority else 1, -age, stat))
+        due.sort(key=lambda item: item[:2])
+        return (stat for _, _, stat in due)
+    
+    def update(self, stats: List, now: Optional[float] = None):
+        """Refresh due entries within the budget and attach cached values to ``stats``."""
+        if now is None:
+            now = time.time()
+        
+        start = self._timer()
+        self.deferred = 0
+        for stat in self._candidates(stats, now):
+            if self._timer() - start >= self.budget:
+                self.deferred += 1
+                continue
+            self.reads += 1
+            try:
+                pss, uss, swap = self._reader(self.proc_root, stat.pid)
+            except (OSError, ValueError):
+                continue
+            self._cache[stat.pid] = (stat.create_time, pss, uss, swap, now)
+        
+        cache = {}
+        for stat in stats:
+            cached = self._cache.get(stat.pid)
+            if cached is None or cached[0] != stat.create_time:
+                continue
+            cache[stat.pid] = cached
+            _, stat.pss, stat.uss, stat.swap, stat.detail_time = cached
+        self._cache = cache
@@ -0,0 +1,97 @@
+"""Columnar storage for one tick of samples."""
+
+import math
+import time
+from array import array
+from collections.abc import Sequence
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from .monitor import ProcessStats
+
+# (pid, name, rss, vms, percent)
+Row = Tuple[int, str, int, int, float]
+
+
+class Snapshot(Sequence):
+    """One tick of samples stored as parallel arrays with a shared timestamp.
+
+    Indexing and iteration build ProcessStats on demand, so code written
+    against lists of samples keeps working; bulk consumers should read
+    the ``pids``, ``names``, ``rss``, ``vms``, ``percent`` and
+    ``create_times`` columns (or ``rows()``) instead. A row costs about
+    40 bytes plus its name, against a few hundred for a ProcessStats.
+    PSS/USS/swap details are not stored.
+    """
+    
+    __slots__ = ("timestamp", "pids", "names", "rss", "vms", "percent", "create_times")
+    
+    def __init__(self, timestamp: Optional[float] = None):
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.pids = array('q')
+        self.names: List[str] = []
+        self.rss = array('q')
+        self.vms = array('q')
+        self.percent = array('d')
+        # NaN marks an unknown create time
+        self.create_times = array('d')
+    
+    @classmethod
+    def from_stats(cls, stats: Iterable, timestamp: Optional[float] = None) -> "Snapshot":
+        snapshot = cls(timestamp)
+        for stat in stats:
+            snapshot.append(stat.pid, stat.name, stat.rss, stat.vms, stat.percent, stat.create_time)
+        return snapshot
+    
+    def append(
+        self,
+        pid: int,
+        name: str,
+        rss: int,
+        vms: int,
+        percent: float,
+        create_time: Optional[float] = None
+    ):
+        self.pids.append(pid)
+        self.names.append(name)
+        self.rss.append(rss)
+        self.vms.append(vms)
+        self.percent.append(percent)
+        self.create_times.append(math.nan if create_time is None else create_time)
+    
+    def __len__(self) -> int:
+        return len(self.pids)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            snapshot = Snapshot(self.timestamp)
+            for column in self.__slots__[1:]:
+                setattr(snapshot, column, getattr(self, column)[index])
+            return snapshot
+        
+        create_time = self.create_times[index]
+        return ProcessStats(
+            pid=self.pids[index],
+            name=self.names[index],
+            rss=self.rss[index],
+            vms=self.vms[index],
+            percent=self.percent[index],
+            create_time=None if math.isnan(create_time) else create_time,
+            timestamp=self.timestamp
+        )
+    
+    def rows(self) -> Iterator[Row]:
+        """Iterate (pid, name, rss, vms, percent) without building objects."""
+        return zip(self.pids, self.names, self.rss, self.vms, self.percent)
+    
+    def select(self, pids: Set[int]) -> "Snapshot":
+        """Return the rows whose PID is in ``pids``."""
+        snapshot = Snapshot(self.timestamp)
+        for i, pid in enumerate(self.pids):
+            if pid in pids:
+                snapshot.pids.append(pid)
+                snapshot.names.append(self.names[i])
+                snapshot.rss.append(self.rss[i])
+                snapshot.vms.append(self.vms[i])
+                snapshot.percent.append(self.percent[i])
+                snapshot.create_times.append(self.create_times[i])
+        return snapshot
@@ -0,0 +1,95 @@
+"""Incrementally updated sparkline graphs."""
+
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+GLYPHS = "▁▂▃▄▅▆▇█"
+
+
+class RollingMinMax:
+    """Min and max over the last ``size`` values in amortized O(1).
+
+    Uses two monotonic deques of (index, value): the min deque is
+    increasing and the max deque decreasing, so the extremes are always at
+    the front and expired entries fall off the left.
+    """
+    
+    def __init__(self, size: int):
+        self.size = size
+        self._index = 0
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._max: Deque[Tuple[int, float]] = deque()
+    
+    def push(self, value: float):
+        index = self._index
+        self._index += 1
+        
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        
+        cutoff = index - self.size
+        if self._min[0][0] <= cutoff:
+            self._min.popleft()
+        if self._max[0][0] <= cutoff:
+            self._max.popleft()
+    
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+    
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+
+class Sparkline:
+    """Fixed-width sparkline updated one sample at a time.
+
+    Glyphs are kept in a buffer and only recomputed when the window's
+    min/max changes; otherwise a push appends a single glyph.
+    """
+    
+    def __init__(self, width: int = 50):
+        self.width = width
+        self.values: Deque[float] = deque(maxlen=width)
+        self._window = RollingMinMax(width)
+        self._glyphs: Deque[str] = deque(maxlen=width)
+        self._scale: Optional[Tuple[float, float]] = None
+        self._factor = 0.0
+        self._text: Optional[str] = ""
+    
+    def _glyph(self, value: float) -> str:
+        index = int((value - self._scale[0]) * self._factor)
+        return GLYPHS[min(index, len(GLYPHS) - 1)]
+    
+    def push(self, value: float):
+        """Add a sample to the right edge of the graph."""
+        self.values.append(value)
+        self._window.push(value)
+        
+        scale = (self._window.min, self._window.max)
+        if scale == self._scale:
+            self._glyphs.append(self._glyph(value))
+        else:
+            self._scale = scale
+            range_val = scale[1] - scale[0] or 1
+            self._factor = (len(GLYPHS) - 1) / range_val
+            self._glyphs = deque((self._glyph(v) for v in self.values), maxlen=self.width)
+        self._text = None
+    
+    @property
+    def peak(self) -> Optional[float]:
+        return self._window.max
+    
+    @property
+    def last(self) -> Optional[float]:
+        return self.values[-1] if self.values else None
+    
+    def render(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._glyphs)
+        return self._text
@@ -0,0 +1,173 @@
+"""SQLite export backend and historical queries."""
+
+import math
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    timestamp REAL NOT NULL,
+    pid INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    rss INTEGER NOT NULL,
+    vms INTEGER NOT NULL,
+    percent REAL NOT NULL,
+    pss INTEGER,
+    uss INTEGER,
+    swap INTEGER,
+    detail_time REAL
+);
+CREATE INDEX IF NOT EXISTS idx_samples_pid_time ON samples (pid, timestamp);
+CREATE INDEX IF NOT EXISTS idx_samples_name_time ON samples (name, timestamp);
+"""
+
+DETAIL_COLUMNS = (("pss", "INTEGER"), ("uss", "INTEGER"), ("swap", "INTEGER"), ("detail_time", "REAL"))
+
+
+def connect(filepath: str) -> sqlite3.Connection:
+    """Open a sample database in WAL mode, creating the schema if needed."""
+    conn = sqlite3.connect(filepath)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    
+    # Databases written before detail sampling lack the nullable columns
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(samples)")}
+    for column, kind in DETAIL_COLUMNS:
+        if column not in columns:
+            conn.execute(f"ALTER TABLE samples ADD COLUMN {column} {kind}")
+    return conn
+
+
+class SQLiteExporter:
+    """Export memory statistics to a SQLite database.
+
+    Rows are buffered in memory and inserted in one transaction every
+    ``batch_ticks`` writes.
+    """
+    
+    def __init__(self, filepath: str, batch_ticks: int = 10):
+        self.filepath = filepath
+        self.batch_ticks = batch_ticks
+        self._conn: Optional[sqlite3.Connection] = connect(filepath)
+        self._pending: List[tuple] = []
+        self._ticks = 0
+    
+    def write(self, stats: List, timestamp: Optional[float] = None):
+        """Queue one tick of samples, committing every batch_ticks ticks.
+
+        Without ``timestamp`` each row gets its own sample's timestamp.
+        """
+        self._pending.extend(
+            (
+                stat.timestamp if timestamp is None else timestamp, stat.pid, stat.name, stat.rss, stat.vms, stat.percent,
+                stat.pss, stat.uss, stat.swap, stat.detail_time
+            )
+            for stat in stats
+        )
+        self._ticks += 1
+        if self._ticks >= self.batch_ticks:
+            self.flush()
+    
+    def flush(self):
+        """Insert queued rows in a single transaction."""
+        if self._conn is None:
+            return
+        if self._pending:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO samples (timestamp, pid, name, rss, vms, percent, "
+                    "pss, uss, swap, detail_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._pending
+                )
+            self._pending = []
+        self._ticks = 0
+    
+    def close(self):
+        """Commit pending rows and close the database."""
+        if self._conn is None:
+            return
+        self.flush()
+        self._conn.close()
+        self._conn = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def query(
+    filepath: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    pid: Optional[int] = None,
+    name: Optional[str] = None,
+    percentiles: Sequence[float] = (50, 95, 99)
+) -> List[Dict[str, Any]]:
+    """Return per-process RSS statistics over a time window.
+
+    Percentiles use the nearest-rank method and are computed inside
+    SQLite, so only one value per percentile leaves the database.
+    """
+    conditions = []
+    params: List[Any] = []
+    if pid is not None:
+        conditions.append("pid = ?")
+        params.append(pid)
+    if name is not None:
+        conditions.append("name = ?")
+        params.append(name)
+    if since is not None:
+        conditions.append("timestamp >= ?")
+        params.append(since)
+    if until is not None:
+        conditions.append("timestamp <= ?")
+        params.append(until)
+    where = " AND ".join(conditions) or "1"
+    
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"No such database: {filepath}")
+    
+    conn = connect(filepath)
+    try:
+        groups = conn.execute(
+            f"SELECT pid, name, COUNT(*), MIN(rss), MAX(rss), AVG(rss), "
+            f"MIN(timestamp), MAX(timestamp) FROM samples WHERE {where} "
+            f"GROUP BY pid, name ORDER BY MAX(rss) DESC",
+            params
+        ).fetchall()
+        
+        results = []
+        for group_pid, group_name, count, min_rss, max_rss, avg_rss, first, last in groups:
+            row = {
+                "pid": group_pid,
+                "name": group_name,
+                "samples": count,
+                "min_rss": min_rss,
+                "max_rss": max_rss,
+                "avg_rss": avg_rss,
+                "first": first,
+                "last": last
+            }
+            window = "pid = ? AND name = ?"
+            window_params: List[Any] = [group_pid, group_name]
+            if since is not None:
+                window += " AND timestamp >= ?"
+                window_params.append(since)
+            if until is not None:
+                window += " AND timestamp <= ?"
+                window_params.append(until)
+            for p in percentiles:
+                rank = max(math.ceil(p / 100 * count), 1)
+                (value,) = conn.execute(
+                    f"SELECT rss FROM samples WHERE {window} ORDER BY rss LIMIT 1 OFFSET ?",
+                    window_params + [rank - 1]
+                ).fetchone()
+                row[f"p{p:g}_rss"] = value
+            results.append(row)
+        return results
+    finally:
+        conn.close()
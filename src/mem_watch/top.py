@@ -0,0 +1,167 @@
+"""Top-K selection over the whole process table."""
+
+import heapq
+from typing import Callable, Dict, List, Optional, Tuple
+
+SORT_KEYS = ("rss", "pss", "growth")
+GROUP_KEYS = ("name", "user")
+# Group ids count down from here, below any PID or negated cgroup inode (a u64)
+GROUP_ID_BASE = -(1 << 64)
+
+
+def _pss(stat) -> int:
+    """PSS when detail sampling has provided it, RSS otherwise."""
+    pss = getattr(stat, "pss", None)
+    return stat.rss if pss is None else pss
+
+
+class ProcessGroup:
+    """Aggregated memory statistics for processes sharing a name or user.
+
+    ``pid`` is a synthetic id that stays with the group key, so history
+    and trends follow the group rather than its largest member, and never
+    matches a real PID. ``leader`` is the PID of the largest member and
+    ``count`` the number of processes in the group. ``pss`` stays ``None``
+    until a member has a detail sample; from then on members without one
+    count their RSS. ``detail_time`` is the oldest of those samples.
+    """
+    
+    def __init__(self, name: str, pid: int = GROUP_ID_BASE):
+        self.name = name
+        self.pid = pid
+        self.leader = 0
+        self.count = 0
+        self.rss = 0
+        self.pss: Optional[int] = None
+        self.detail_time: Optional[float] = None
+        self.vms = 0
+        self.percent = 0.0
+        self.growth = 0.0
+        self.timestamp = 0.0
+        self.create_time = None
+        self._largest = -1
+        self._pss_estimate = 0
+    
+    def add(self, stat, growth: float):
+        self.count += 1
+        self.rss += stat.rss
+        pss = getattr(stat, "pss", None)
+        self._pss_estimate += stat.rss if pss is None else pss
+        if pss is not None:
+            detail_time = stat.detail_time
+            if self.detail_time is None or detail_time < self.detail_time:
+                self.detail_time = detail_time
+        if pss is not None or self.pss is not None:
+            self.pss = self._pss_estimate
+        self.vms += stat.vms
+        self.percent += stat.percent
+        self.growth += growth
+        self.timestamp = stat.timestamp
+        if stat.rss > self._largest:
+            self._largest = stat.rss
+            self.leader = stat.pid
+
+
+class TopK:
+    """Keep the ``k`` largest processes (or groups) of each tick.
+
+    Rows are ranked by RSS, by PSS (falling back to RSS for processes
+    without detail samples) or by growth, an exponentially smoothed RSS
+    change in bytes per second. Selection uses a heap, so a tick costs
+    O(n log k) rather than a full sort of the process table.
+    ``user_of(pid)`` resolves owners for ``group_by="user"``; results are
+    cached per process identity.
+    """
+    
+    def __init__(
+        self,
+        k: int = 20,
+        sort: str = "rss",
+        group_by: Optional[str] = None,
+        user_of: Optional[Callable[[int], str]] = None,
+        smoothing: float = 0.3
+    ):
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if group_by is not None and group_by not in GROUP_KEYS:
+            raise ValueError(f"Unknown group key: {group_by}")
+        if group_by == "user" and user_of is None:
+            raise ValueError("Grouping by user needs a user_of function")
+        
+        self.k = k
+        self.sort = sort
+        self.group_by = group_by
+        self.user_of = user_of
+        self.smoothing = smoothing
+        self.total = 0
+        self.count = 0
+        # (pid, create_time) -> (timestamp, rss, smoothed growth)
+        self._growth: Dict[Tuple[int, Optional[float]], Tuple[float, int, float]] = {}
+        self._users: Dict[Tuple[int, Optional[float]], str] = {}
+        self._group_ids: Dict[str, int] = {}
+        self._next_group_id = GROUP_ID_BASE
+    
+    def _update_growth(self, stats: List) -> Dict[int, float]:
+        previous = self._growth
+        current = {}
+        rates = {}
+        alpha = self.smoothing
+        
+        for stat in stats:
+            key = (stat.pid, stat.create_time)
+            last = previous.get(key)
+            rate = 0.0
+            if last is not None and stat.timestamp > last[0]:
+                instant = (stat.rss - last[1]) / (stat.timestamp - last[0])
+                rate = last[2] + alpha * (instant - last[2])
+            elif last is not None:
+                rate = last[2]
+            current[key] = (stat.timestamp, stat.rss, rate)
+            rates[stat.pid] = rate
+        
+        self._growth = current
+        return rates
+    
+    def _user(self, stat) -> str:
+        key = (stat.pid, stat.create_time)
+        user = self._users.get(key)
+        if user is None:
+            user = self._users[key] = self.user_of(stat.pid)
+        return user
+    
+    def _group(self, stats: List, rates: Dict[int, float]) -> List[ProcessGroup]:
+        groups: Dict[str, ProcessGroup] = {}
+        for stat in stats:
+            key = stat.name if self.group_by == "name" else self._user(stat)
+            group = groups.get(key)
+            if group is None:
+                group_id = self._group_ids.get(key)
+                if group_id is None:
+                    group_id = self._group_ids[key] = self._next_group_id
+                    self._next_group_id -= 1
+                group = groups[key] = ProcessGroup(key, group_id)
+            group.add(stat, rates.get(stat.pid, 0.0))
+        
+        if len(self._group_ids) > 2 * len(groups) + 1024:
+            # Ids are never reused, so a group that comes back starts a new series
+            self._group_ids = {key: self._group_ids[key] for key in groups}
+        
+        if self.group_by == "user" and len(self._users) > 2 * len(stats):
+            alive = {(stat.pid, stat.create_time) for stat in stats}
+            self._users = {key: user for key, user in self._users.items() if key in alive}
+        return list(groups.values())
+    
+    def select(self, stats: List) -> List:
+        """Return the top rows of this tick, largest first."""
+        self.count = len(stats)
+        self.total = sum(stat.rss for stat in stats)
+        rates = self._update_growth(stats) if self.sort == "growth" else {}
+        
+        rows = self._group(stats, rates) if self.group_by else stats
+        if self.sort == "rss":
+            return heapq.nlargest(self.k, rows, key=lambda row: row.rss)
+        if self.sort == "pss":
+            return heapq.nlargest(self.k, rows, key=_pss)
+        if self.group_by:
+            return heapq.nlargest(self.k, rows, key=lambda row: row.growth)
+        return heapq.nlargest(self.k, rows, key=lambda row: rates[row.pid])
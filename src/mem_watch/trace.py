@@ -0,0 +1,379 @@
+"""Compact binary trace format for exported samples.
+
+Layout (all integers little-endian)::
+
+    header   magic "MWTRACE1", version, record size, block size, created
+    block*   block header (count, new names, time range)
+             new process names (u16 length + UTF-8 bytes each)
+             fixed-width records: timestamp, pid, name id, rss, vms, percent
+    index    block table, full name table, pid -> blocks table
+    trailer  index offset, magic "MWTINDEX"
+
+PIDs are signed 64-bit since version 2, as cgroup rows carry negative
+ids; version 1 files with unsigned 32-bit PIDs are still readable.
+
+Records are grouped into blocks with a time range, so a reader can jump
+to a time window or to the blocks holding one PID without scanning the
+whole file. If the writer was not closed cleanly the index is missing and
+the reader falls back to walking block headers.
+"""
+
+import bisect
+import csv
+import mmap
+import struct
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"MWTRACE1"
+VERSION = 2
+HEADER = struct.Struct("<8sHHId8x")
+BLOCK_MAGIC = b"BLK1"
+BLOCK_HEADER = struct.Struct("<4sIIIdd")
+RECORD = struct.Struct("<dqIQQf")
+NAME_LENGTH = struct.Struct("<H")
+INDEX_MAGIC = b"IDX1"
+INDEX_HEADER = struct.Struct("<4sIIIB")
+INDEX_BLOCK = struct.Struct("<QIdd")
+INDEX_PID = struct.Struct("<qI")
+# version -> (record, index pid entry)
+FORMATS = {
+    1: (struct.Struct("<dIIQQf"), struct.Struct("<II")),
+    VERSION: (RECORD, INDEX_PID)
+}
+TRAILER_MAGIC = b"MWTINDEX"
+TRAILER = struct.Struct("<Q8s")
+
+# (timestamp, pid, name, rss, vms, percent)
+TraceRecord = Tuple[float, int, str, int, int, float]
+
+
+class TraceFormatError(ValueError):
+    """Raised when a file is not a valid mem-watch trace."""
+
+
+class BlockInfo:
+    """Location and time range of one block of records."""
+    
+    def __init__(self, offset: int, count: int, t_min: float, t_max: float):
+        self.offset = offset
+        self.count = count
+        self.t_min = t_min
+        self.t_max = t_max
+
+
+class TraceWriter:
+    """Write samples to a binary trace file.
+
+    Has the same ``write(stats, timestamp)`` / ``flush()`` / ``close()``
+    interface as CSVExporter so it can be used as an export target.
+    """
+    
+    def __init__(self, filepath: str, block_records: int = 4096):
+        self.filepath = filepath
+        self.block_records = block_records
+        self._file = open(filepath, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, block_records, time.time()))
+        self._offset = HEADER.size
+        self._names: Dict[str, int] = {}
+        self._new_names: List[str] = []
+        self._buffer = bytearray()
+        self._count = 0
+        self._t_min = 0.0
+        self._t_max = 0.0
+        self._blocks: List[BlockInfo] = []
+        self._block_pids = set()
+        self._pid_blocks: Dict[int, List[int]] = {}
+        self._sorted = True
+    
+    def _name_id(self, name: str) -> int:
+        name_id = self._names.get(name)
+        if name_id is None:
+            name_id = len(self._names)
+            self._names[name] = name_id
+            self._new_names.append(name)
+        return name_id
+    
+    def write(self, stats: List, timestamp: Optional[float] = None):
+        """Append one tick of samples.
+
+        Without ``timestamp`` each record gets its own sample's timestamp.
+        """
+        for stat in stats:
+            sample_time = stat.timestamp if timestamp is None else timestamp
+            if not self._count:
+                self._t_min = self._t_max = sample_time
+            else:
+                self._t_min = min(self._t_min, sample_time)
+                self._t_max = max(self._t_max, sample_time)
+            self._buffer += RECORD.pack(
+                sample_time, stat.pid, self._name_id(stat.name), stat.rss, stat.vms, stat.percent
+            )
+            self._block_pids.add(stat.pid)
+            self._count += 1
+            if self._count >= self.block_records:
+                self._write_block()
+    
+    def _write_block(self):
+        if not self._count:
+            return
+        
+        names = bytearray()
+        for name in self._new_names:
+            encoded = name.encode("utf-8")[:0xFFFF]
+            names += NAME_LENGTH.pack(len(encoded)) + encoded
+        
+        block_id = len(self._blocks)
+        if self._blocks and self._t_min < self._blocks[-1].t_max:
+            # Clock went backwards; readers must not bisect on time
+            self._sorted = False
+        self._file.write(BLOCK_HEADER.pack(
+            BLOCK_MAGIC, self._count, len(self._new_names), len(names), self._t_min, self._t_max
+        ))
+        self._file.write(names)
+        self._file.write(self._buffer)
+        self._blocks.append(BlockInfo(self._offset, self._count, self._t_min, self._t_max))
+        for pid in self._block_pids:
+            self._pid_blocks.setdefault(pid, []).append(block_id)
+        
+        self._offset += BLOCK_HEADER.size + len(names) + len(self._buffer)
+        self._new_names = []
+        self._buffer = bytearray()
+        self._block_pids = set()
+        self._count = 0
+    
+    def flush(self):
+        """Write the pending block and flush it to the OS."""
+        self._write_block()
+        self._file.flush()
+    
+    def close(self):
+        """Write the pending block, the index and the trailer."""
+        if self._file is None:
+            return
+        self._write_block()
+        
+        index_offset = self._offset
+        names = sorted(self._names, key=self._names.get)
+        out = bytearray(INDEX_HEADER.pack(
+            INDEX_MAGIC, len(self._blocks), len(names), len(self._pid_blocks), self._sorted
+        ))
+        for block in self._blocks:
+            out += INDEX_BLOCK.pack(block.offset, block.count, block.t_min, block.t_max)
+        for name in names:
+            encoded = name.encode("utf-8")[:0xFFFF]
+            out += NAME_LENGTH.pack(len(encoded)) + encoded
+        for pid, block_ids in self._pid_blocks.items():
+            out += INDEX_PID.pack(pid, len(block_ids))
+            out += struct.pack(f"<{len(block_ids)}I", *block_ids)
+        out += TRAILER.pack(index_offset, TRAILER_MAGIC)
+        
+        self._file.write(out)
+        self._file.close()
+        self._file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _read_names(data, offset: int, count: int) -> Tuple[List[str], int]:
+    names = []
+    for _ in range(count):
+        (length,) = NAME_LENGTH.unpack_from(data, offset)
+        offset += NAME_LENGTH.size
+        names.append(bytes(data[offset:offset + length]).decode("utf-8", "replace"))
+        offset += length
+    return names, offset
+
+
+class TraceReader:
+    """Memory-mapped reader for binary trace files."""
+    
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise TraceFormatError(f"{filepath}: empty file")
+        
+        if len(self._data) < HEADER.size:
+            self.close()
+            raise TraceFormatError(f"{filepath}: truncated header")
+        magic, version, record_size, _, self.created = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version not in FORMATS or record_size != FORMATS[version][0].size:
+            self.close()
+            raise TraceFormatError(f"{filepath}: not a mem-watch trace")
+        self.version = version
+        self._record, self._index_pid = FORMATS[version]
+        
+        self.blocks: List[BlockInfo] = []
+        self.names: List[str] = []
+        self._pid_blocks: Optional[Dict[int, List[int]]] = None
+        self._sorted = True
+        self._block_data: Dict[int, int] = {}
+        
+        if not self._load_index():
+            self._scan_blocks()
+        self._ends = [block.t_max for block in self.blocks]
+    
+    def _load_index(self) -> bool:
+        """Load the index written by TraceWriter.close(), if present."""
+        data = self._data
+        if len(data) < HEADER.size + TRAILER.size:
+            return False
+        index_offset, magic = TRAILER.unpack_from(data, len(data) - TRAILER.size)
+        if magic != TRAILER_MAGIC:
+            return False
+        
+        magic, nblocks, nnames, npids, is_sorted = INDEX_HEADER.unpack_from(data, index_offset)
+        if magic != INDEX_MAGIC:
+            return False
+        offset = index_offset + INDEX_HEADER.size
+        for _ in range(nblocks):
+            self.blocks.append(BlockInfo(*INDEX_BLOCK.unpack_from(data, offset)))
+            offset += INDEX_BLOCK.size
+        self.names, offset = _read_names(data, offset, nnames)
+        self._pid_blocks = {}
+        for _ in range(npids):
+            pid, count = self._index_pid.unpack_from(data, offset)
+            offset += self._index_pid.size
+            self._pid_blocks[pid] = list(struct.unpack_from(f"<{count}I", data, offset))
+            offset += 4 * count
+        self._sorted = bool(is_sorted)
+        return True
+    
+    def _scan_blocks(self):
+        """Rebuild the block table by walking block headers."""
+        data = self._data
+        offset = HEADER.size
+        last_end = None
+        
+        while offset + BLOCK_HEADER.size <= len(data):
+            magic, count, nnames, names_len, t_min, t_max = BLOCK_HEADER.unpack_from(data, offset)
+            end = offset + BLOCK_HEADER.size + names_len + count * self._record.size
+            if magic != BLOCK_MAGIC or end > len(data):
+                break
+            names, _ = _read_names(data, offset + BLOCK_HEADER.size, nnames)
+            self.names.extend(names)
+            if last_end is not None and t_min < last_end:
+                self._sorted = False
+            last_end = t_max
+            self.blocks.append(BlockInfo(offset, count, t_min, t_max))
+            offset = end
+    
+    def _records_offset(self, block: BlockInfo) -> int:
+        """Return the offset of a block's first record."""
+        offset = self._block_data.get(block.offset)
+        if offset is None:
+            _, _, _, names_len, _, _ = BLOCK_HEADER.unpack_from(self._data, block.offset)
+            offset = block.offset + BLOCK_HEADER.size + names_len
+            self._block_data[block.offset] = offset
+        return offset
+    
+    def _candidate_blocks(self, start: Optional[float], end: Optional[float], pid: Optional[int]):
+        if pid is not None and self._pid_blocks is not None:
+            ids = self._pid_blocks.get(pid, [])
+        elif self._sorted and start is not None:
+            ids = range(bisect.bisect_left(self._ends, start), len(self.blocks))
+        else:
+            ids = range(len(self.blocks))
+        
+        for block_id in ids:
+            block = self.blocks[block_id]
+            if start is not None and block.t_max < start:
+                continue
+            if end is not None and block.t_min > end:
+                if self._sorted:
+                    return
+                continue
+            yield block
+    
+    def records(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        pid: Optional[int] = None
+    ) -> Iterator[TraceRecord]:
+        """Iterate records, optionally limited to a time window and/or PID."""
+        names = self.names
+        for block in self._candidate_blocks(start, end, pid):
+            offset = self._records_offset(block)
+            # Copy one block out of the map so no buffer export outlives close()
+            chunk = self._data[offset:offset + block.count * self._record.size]
+            for timestamp, rec_pid, name_id, rss, vms, percent in self._record.iter_unpack(chunk):
+                if pid is not None and rec_pid != pid:
+                    continue
+                if start is not None and timestamp < start:
+                    continue
+                if end is not None and timestamp > end:
+                    continue
+                yield timestamp, rec_pid, names[name_id], rss, vms, percent
+    
+    def series(
+        self,
+        pid: int,
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> List[Tuple[float, int]]:
+        """Return (timestamp, rss) pairs for one process."""
+        return [(record[0], record[3]) for record in self.records(start, end, pid)]
+    
+    def close(self):
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _Sample:
+    """Minimal stats object for feeding records into writers."""
+    
+    def __init__(self, pid: int, name: str, rss: int, vms: int, percent: float):
+        self.pid = pid
+        self.name = name
+        self.rss = rss
+        self.vms = vms
+        self.percent = percent
+
+
+def csv_to_trace(src: str, dst: str):
+    """Convert a CSVExporter file to a binary trace."""
+    from .export import parse_time
+    
+    with open(src, newline='') as f, TraceWriter(dst) as writer:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            timestamp = parse_time(row[0])
+            writer.write(
+                [_Sample(int(row[1]), row[2], int(row[3]), int(row[4]), float(row[5]))],
+                timestamp
+            )
+
+
+def trace_to_csv(src: str, dst: str):
+    """Convert a binary trace to the CSVExporter layout."""
+    from .export import CSVExporter
+    
+    with TraceReader(src) as reader, CSVExporter(dst) as exporter:
+        batch: List[_Sample] = []
+        batch_time = None
+        for timestamp, pid, name, rss, vms, percent in reader.records():
+            if batch and timestamp != batch_time:
+                exporter.write(batch, batch_time)
+                batch = []
+            batch_time = timestamp
+            batch.append(_Sample(pid, name, rss, vms, percent))
+        if batch:
+            exporter.write(batch, batch_time)
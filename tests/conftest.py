@@ -0,0 +1,28 @@
+"""Shared fixtures for tests that sample a fake /proc tree."""
+
+import pytest
+
+
+def write_process(root, pid, name, rss_pages, vms_pages=None, starttime=100, ppid=1, children=None):
+    """Write statm and stat for a fake process; VMS defaults to twice the RSS.
+
+    With ``children`` the process also gets a task/<pid>/children file.
+    """
+    if vms_pages is None:
+        vms_pages = rss_pages * 2
+    proc_dir = root / str(pid)
+    proc_dir.mkdir(exist_ok=True)
+    (proc_dir / "statm").write_text(f"{vms_pages} {rss_pages} 0 0 0 0 0\n")
+    fields = ["S", str(ppid)] + ["0"] * 17 + [str(starttime)] + ["0"] * 10
+    (proc_dir / "stat").write_text(f"{pid} ({name}) {' '.join(fields)}\n")
+    if children is not None:
+        task = proc_dir / "task" / str(pid)
+        task.mkdir(parents=True, exist_ok=True)
+        (task / "children").write_text(" ".join(str(child) for child in children) + " ")
+
+
+@pytest.fixture
+def proc_root(tmp_path):
+    (tmp_path / "meminfo").write_text("MemTotal:        1000000 kB\nMemFree:  1 kB\n")
+    (tmp_path / "stat").write_text("cpu 0 0 0 0\nbtime 1700000000\n")
+    return tmp_path
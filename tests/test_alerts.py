@@ -1,7 +1,8 @@
 """Tests for alert management functionality."""
 
+import json
 import pytest
-from mem_watch.alerts import AlertManager, Alert
+from mem_watch.alerts import Alert, AlertManager, AlertRule, parse_threshold
 from mem_watch.monitor import ProcessStats
 
 
@@ -89,3 +90,159 @@ class TestAlertManager:
         alerts = manager.check(stats)
         
         assert len(alerts) == 2
+
+
+def stat(pid=1, name="test", rss=0, percent=0.0, create_time=None):
+    return ProcessStats(pid=pid, name=name, rss=rss, vms=0, percent=percent, create_time=create_time)
+
+
+class TestParseThreshold:
+    def test_units(self):
+        assert parse_threshold("80%") == ("percent", 80.0)
+        assert parse_threshold("2G") == ("rss", 2 * 1024**3)
+        assert parse_threshold("1024") == ("rss", 1024)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_threshold("lots")
+
+
+class TestAlertRule:
+    def test_default_critical(self):
+        rule = AlertRule("100")
+        assert rule.critical == 120
+
+    def test_mixed_units_rejected(self):
+        with pytest.raises(ValueError):
+            AlertRule("1G", "90%")
+
+    def test_unknown_keys_rejected(self):
+        with pytest.raises(ValueError):
+            AlertRule.from_dict({"warning": "1G", "treshold": "2G"})
+
+
+class TestAlertRules:
+    def test_pid_rule_beats_name_rule(self):
+        manager = AlertManager(rules=[
+            AlertRule("1K", name="^web"),
+            AlertRule("1M", pid=42)
+        ])
+        alerts = manager.check([stat(42, "web", rss=2048), stat(7, "web", rss=2048)])
+        
+        assert [alert.pid for alert in alerts] == [7]
+
+    def test_first_name_rule_wins(self):
+        manager = AlertManager(rules=[
+            AlertRule("1M", name="postgres"),
+            AlertRule("1K", name="post"),
+            AlertRule("1K", name="redis")
+        ])
+        alerts = manager.check([
+            stat(1, "postgres", rss=2048),
+            stat(2, "postfix", rss=2048),
+            stat(3, "redis-server", rss=2048),
+            stat(4, "nginx", rss=2048)
+        ])
+        
+        assert [alert.pid for alert in alerts] == [2, 3]
+
+    def test_fallback_to_threshold(self):
+        manager = AlertManager("1K", rules=[AlertRule("1M", name="big")])
+        alerts = manager.check([stat(1, "big", rss=2048), stat(2, "small", rss=2048)])
+        
+        assert [alert.pid for alert in alerts] == [2]
+
+    def test_match_cached_per_identity(self):
+        manager = AlertManager(rules=[AlertRule("1K", name="web")])
+        manager.check([stat(1, "web", rss=10)])
+        manager.name_rules = []
+        
+        assert len(manager.check([stat(1, "web", rss=2048)])) == 1
+
+    def test_rules_with_inline_flags_and_groups(self):
+        manager = AlertManager(rules=[
+            AlertRule("1K", name=r"(?P<x>a)(?P=x)"),
+            AlertRule("1K", name="(?i)java"),
+            AlertRule("1K", name=r"(?P<x>b)\1")
+        ])
+        alerts = manager.check([
+            stat(1, "xaa", rss=2048),
+            stat(2, "JavaApp", rss=2048),
+            stat(3, "bb", rss=2048),
+            stat(4, "ab", rss=2048)
+        ])
+        
+        assert [alert.pid for alert in alerts] == [1, 2, 3]
+
+    def test_invalid_name_pattern_rejected(self):
+        with pytest.raises(ValueError):
+            AlertRule("1K", name="web(")
+
+    def test_hysteresis(self):
+        manager = AlertManager(rules=[AlertRule("100", "200", hysteresis=0.1)])
+        levels = []
+        for rss in (100, 95, 89, 95, 200, 185, 179):
+            alerts = manager.check([stat(rss=rss)], now=0)
+            levels.append(alerts[0].level if alerts else None)
+        
+        assert levels == [
+            "warning", "warning", None, None, "critical", "critical", "warning"
+        ]
+
+    def test_sustain(self):
+        manager = AlertManager(rules=[AlertRule("100", "200", sustain=10)])
+        levels = []
+        for now, rss in ((0, 150), (5, 250), (10, 250), (15, 250), (16, 50), (17, 150)):
+            alerts = manager.check([stat(rss=rss)], now=now)
+            levels.append(alerts[0].level if alerts else None)
+        
+        assert levels == [None, None, "warning", "critical", None, None]
+
+    def test_state_dropped_for_exited_process(self):
+        manager = AlertManager(rules=[AlertRule("100", hysteresis=0.5)])
+        manager.check([stat(rss=150)], now=0)
+        manager.check([], now=1)
+        
+        assert manager.check([stat(rss=80)], now=2) == []
+
+    def test_state_reset_for_reused_pid(self):
+        manager = AlertManager(rules=[AlertRule("100", hysteresis=0.5)])
+        manager.check([stat(rss=150, create_time=10.0)], now=0)
+        
+        assert len(manager.check([stat(rss=80, create_time=10.0)], now=1)) == 1
+        assert manager.check([stat(rss=80, create_time=20.0)], now=2) == []
+
+    def test_from_config(self, tmp_path):
+        path = tmp_path / "alerts.json"
+        path.write_text(json.dumps({
+            "default": {"warning": "50%"},
+            "rules": [
+                {"name": "^db", "warning": "1K", "critical": "4K", "sustain": 0},
+                {"pid": 9, "warning": "99%"}
+            ]
+        }))
+        manager = AlertManager.from_config(str(path))
+        alerts = manager.check([
+            stat(1, "db", rss=8192, percent=1.0),
+            stat(2, "app", rss=10, percent=55.0),
+            stat(9, "app", rss=10, percent=60.0)
+        ])
+        
+        assert [(alert.pid, alert.level) for alert in alerts] == [(1, "critical"), (2, "warning")]
+
+
+class TestDetailFieldRules:
+    def test_pss_rule_with_fallback(self):
+        manager = AlertManager(rules=[AlertRule("1K", field="pss", max_age=60)])
+        fresh = stat(1, rss=4096)
+        fresh.pss, fresh.detail_time = 512, fresh.timestamp - 10
+        stale = stat(2, rss=4096)
+        stale.pss, stale.detail_time = 512, stale.timestamp - 120
+        
+        alerts = manager.check([fresh, stale, stat(3, rss=4096)])
+        
+        assert [alert.pid for alert in alerts] == [2, 3]
+
+    def test_detail_field_needs_bytes(self):
+        with pytest.raises(ValueError):
+            AlertRule("50%", field="pss")
@@ -0,0 +1,145 @@
+"""Tests for streaming offline analysis."""
+
+import gzip
+import json
+import shutil
+import pytest
+from mem_watch.analyze import StreamingAnalyzer, iter_samples, iter_ticks, replay
+from mem_watch.export import create_exporter
+from mem_watch.monitor import MemoryMonitor, ProcessStats
+from mem_watch.cli import main
+
+
+def make_ticks(ticks=10, pids=(1, 2)):
+    for tick in range(ticks):
+        yield 1000.0 + tick, [
+            ProcessStats(pid=pid, name=f"proc{pid}", rss=pid * 1000 + tick * 100, vms=pid * 2000, percent=pid + tick / 10)
+            for pid in pids
+        ]
+
+
+def write_export(path, ticks=10, pids=(1, 2)):
+    exporter = create_exporter(str(path))
+    for timestamp, stats in make_ticks(ticks, pids):
+        exporter.write(stats, timestamp=timestamp)
+    exporter.close()
+
+
+class TestIterSamples:
+    @pytest.mark.parametrize("suffix", [".csv", ".mwt", ".db"])
+    def test_formats(self, tmp_path, suffix):
+        path = tmp_path / f"data{suffix}"
+        write_export(path)
+        
+        samples = list(iter_samples(str(path)))
+        
+        assert len(samples) == 20
+        assert samples[0][1:5] == (1, "proc1", 1000, 2000)
+        assert samples[-1][1:5] == (2, "proc2", 2900, 4000)
+        assert [s[0] for s in samples] == sorted(s[0] for s in samples)
+
+    def test_gzipped_csv(self, tmp_path):
+        path = tmp_path / "data.csv"
+        write_export(path)
+        with open(path, 'rb') as src, gzip.open(f"{path}.gz", 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        
+        assert list(iter_samples(f"{path}.gz")) == list(iter_samples(str(path)))
+
+    def test_iter_ticks_groups_by_timestamp(self, tmp_path):
+        path = tmp_path / "data.mwt"
+        write_export(path, ticks=3)
+        
+        ticks = list(iter_ticks(iter_samples(str(path))))
+        
+        assert [timestamp for timestamp, _ in ticks] == [1000.0, 1001.0, 1002.0]
+        assert [stat.pid for stat in ticks[0][1]] == [1, 2]
+        assert ticks[2][1][0].timestamp == 1002.0
+
+
+class TestStreamingAnalyzer:
+    def test_summary_matches_monitor(self):
+        monitor = MemoryMonitor(pid=1, history_size=100)
+        analyzer = StreamingAnalyzer()
+        for timestamp, stats in make_ticks():
+            monitor.history.record(stats)
+            for stat in stats:
+                analyzer.add((timestamp, stat.pid, stat.name, stat.rss, stat.vms, stat.percent))
+        
+        expected = monitor.get_summary()
+        summary = analyzer.summary()
+        
+        assert summary.keys() == expected.keys()
+        for key, value in expected.items():
+            assert summary[key] == pytest.approx(value)
+
+    def test_per_process(self):
+        analyzer = StreamingAnalyzer()
+        for timestamp, stats in make_ticks():
+            for stat in stats:
+                analyzer.add((timestamp, stat.pid, stat.name, stat.rss, stat.vms, stat.percent))
+        
+        rows = analyzer.per_process()
+        
+        assert [row["pid"] for row in rows] == [2, 1]
+        assert rows[0]["samples"] == 10
+        assert rows[0]["max_rss"] == 2900
+        assert rows[0]["peak_time"] == 1009.0
+        assert rows[0]["growth_per_hour"] == pytest.approx(100 * 3600)
+
+    def test_pid_filter(self):
+        analyzer = StreamingAnalyzer(pid=1)
+        analyzer.add((1.0, 1, "a", 100, 0, 1.0))
+        analyzer.add((1.0, 2, "b", 900, 0, 9.0))
+        
+        assert analyzer.summary()["max_rss"] == 100
+        assert len(analyzer.per_process()) == 1
+
+    def test_empty(self):
+        assert StreamingAnalyzer().summary() == {}
+
+
+class TestReplay:
+    def test_replay_paces_ticks(self):
+        class Recorder:
+            def __init__(self):
+                self.shown = []
+            
+            def show(self, stats, alerts=None, status=None):
+                self.shown.append(stats)
+        
+        samples = [(10.0, 1, "a", 1, 1, 0.1), (12.0, 1, "a", 2, 2, 0.2), (16.0, 1, "a", 3, 3, 0.3)]
+        display = Recorder()
+        sleeps = []
+        
+        replay(samples, display, speed=2.0, sleep=sleeps.append)
+        
+        assert [stats[0].rss for stats in display.shown] == [1, 2, 3]
+        assert sleeps == [1.0, 2.0]
+
+
+class TestAnalyzeCommand:
+    def test_json_output(self, tmp_path, capsys):
+        path = tmp_path / "data.csv"
+        write_export(path)
+        
+        main(["analyze", str(path), "--json"])
+        
+        result = json.loads(capsys.readouterr().out)
+        assert result["summary"]["samples"] == 10
+        assert result["summary"]["process_samples"] == 20
+        assert len(result["processes"]) == 2
+
+    def test_table_output(self, tmp_path, capsys):
+        path = tmp_path / "data.mwt"
+        write_export(path)
+        
+        main(["analyze", str(path), "--pid", "2"])
+        
+        out = capsys.readouterr().out
+        assert "proc2" in out
+        assert "proc1" not in out
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(SystemExit):
+            main(["analyze", str(tmp_path / "missing.csv")])
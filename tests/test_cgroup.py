@@ -0,0 +1,164 @@
+"""Tests for cgroup v2 collection against a fake cgroupfs tree."""
+
+import os
+import pytest
+from mem_watch.cgroup import CgroupSampler
+from mem_watch.alerts import AlertManager
+from mem_watch.export import create_exporter
+from mem_watch.monitor import MemoryMonitor
+from mem_watch.trace import TraceReader
+
+MB = 1024 * 1024
+
+
+def write_group(root, path, current, peak=None, limit="max", anon=0, file=0, oom_kill=0, pids=()):
+    group = root / path
+    group.mkdir(parents=True, exist_ok=True)
+    (group / "memory.current").write_text(f"{current}\n")
+    if peak is not None:
+        (group / "memory.peak").write_text(f"{peak}\n")
+    (group / "memory.max").write_text(f"{limit}\n")
+    (group / "memory.stat").write_text(f"anon {anon}\nfile {file}\nshmem 0\n")
+    (group / "memory.events").write_text(f"low 0\nhigh 0\nmax 0\noom 0\noom_kill {oom_kill}\n")
+    (group / "cgroup.procs").write_text("".join(f"{pid}\n" for pid in pids))
+    return group
+
+
+@pytest.fixture
+def cgroup_root(tmp_path):
+    root = tmp_path / "cgroup"
+    root.mkdir()
+    (root / "cgroup.controllers").write_text("cpu memory pids\n")
+    return root
+
+
+@pytest.fixture
+def proc_root(tmp_path):
+    proc = tmp_path / "proc"
+    proc.mkdir()
+    (proc / "meminfo").write_text("MemTotal:        1048576 kB\n")
+    return proc
+
+
+class TestCgroupSampler:
+    def test_requires_cgroup2(self, tmp_path):
+        with pytest.raises(RuntimeError):
+            CgroupSampler(str(tmp_path))
+
+    def test_resolve_globs(self, cgroup_root, proc_root):
+        write_group(cgroup_root, "system.slice/nginx.service", 10)
+        write_group(cgroup_root, "system.slice/sshd.service", 10)
+        write_group(cgroup_root, "user.slice", 10)
+        (cgroup_root / "system.slice" / "not-a-group").mkdir()
+        sampler = CgroupSampler(str(cgroup_root), str(proc_root))
+        
+        names = sampler.resolve(["system.slice/*", "user.slice", "system.slice/nginx.service"])
+        
+        assert names == ["/system.slice/nginx.service", "/system.slice/sshd.service", "/user.slice"]
+
+    def test_sample_values(self, cgroup_root, proc_root):
+        group = write_group(
+            cgroup_root, "web", 300 * MB, peak=400 * MB, limit=str(600 * MB),
+            anon=200 * MB, file=100 * MB, oom_kill=2
+        )
+        sampler = CgroupSampler(str(cgroup_root), str(proc_root))
+        
+        (stat,) = sampler.sample(["/web"])
+        
+        assert stat.inode == os.stat(group).st_ino
+        assert stat.pid == -stat.inode
+        assert stat.name == "/web"
+        assert stat.rss == 300 * MB
+        assert stat.peak == 400 * MB
+        assert stat.limit == 600 * MB
+        assert stat.percent == pytest.approx(50.0)
+        assert stat.anon == 200 * MB
+        assert stat.file == 100 * MB
+        assert stat.events["oom_kill"] == 2
+        sampler.close()
+
+    def test_unlimited_group_uses_system_memory(self, cgroup_root, proc_root):
+        write_group(cgroup_root, "batch", 256 * MB)
+        sampler = CgroupSampler(str(cgroup_root), str(proc_root))
+        
+        (stat,) = sampler.sample(["/batch"])
+        
+        assert stat.limit is None
+        assert stat.vms == 256 * MB
+        assert stat.percent == pytest.approx(25.0)
+        sampler.close()
+
+    def test_descriptors_reused(self, cgroup_root, proc_root):
+        group = write_group(cgroup_root, "web", 100)
+        sampler = CgroupSampler(str(cgroup_root), str(proc_root))
+        sampler.sample(["/web"])
+        fds = dict(sampler._fds["/web"])
+        
+        with open(group / "memory.current", "r+") as f:
+            f.write("250\n")
+        (stat,) = sampler.sample(["/web"])
+        
+        assert stat.rss == 250
+        assert sampler._fds["/web"] == fds
+        sampler.close()
+
+    def test_removed_group_skipped(self, cgroup_root, proc_root):
+        write_group(cgroup_root, "web", 100)
+        sampler = CgroupSampler(str(cgroup_root), str(proc_root))
+        
+        assert sampler.sample(["/web", "/gone"])[0].name == "/web"
+        assert sampler.sample([]) == []
+        assert sampler._fds == {}
+
+    @pytest.mark.parametrize("suffix", [".mwt", ".csv", ".db"])
+    def test_rows_exported(self, cgroup_root, proc_root, tmp_path, suffix):
+        write_group(cgroup_root, "web", 300 * MB)
+        sampler = CgroupSampler(str(cgroup_root), str(proc_root))
+        (stat,) = sampler.sample(["/web"])
+        path = str(tmp_path / f"out{suffix}")
+        
+        exporter = create_exporter(path)
+        exporter.write([stat])
+        exporter.close()
+        
+        if suffix == ".mwt":
+            with TraceReader(path) as reader:
+                assert [record[1:4] for record in reader.records()] == [(stat.pid, "/web", 300 * MB)]
+        sampler.close()
+
+    def test_pids_include_descendants(self, cgroup_root, proc_root):
+        write_group(cgroup_root, "app", 100, pids=[10])
+        write_group(cgroup_root, "app/worker", 100, pids=[11, 12])
+        sampler = CgroupSampler(str(cgroup_root), str(proc_root))
+        
+        assert sorted(sampler.pids("/app")) == [10, 11, 12]
+
+
+class TestMonitorCgroups:
+    def test_collect_groups(self, cgroup_root, proc_root):
+        write_group(cgroup_root, "a.service", 100 * MB)
+        write_group(cgroup_root, "b.service", 700 * MB)
+        monitor = MemoryMonitor(cgroups=["*.service"], cgroup_root=str(cgroup_root), proc_root=str(proc_root))
+        
+        stats = monitor.collect()
+        alerts = AlertManager("500M").check(stats)
+        
+        assert [stat.name for stat in stats] == ["/a.service", "/b.service"]
+        assert [alert.name for alert in alerts] == ["/b.service"]
+        assert monitor.get_summary()["max_rss"] == 700 * MB
+        monitor.close()
+
+    def test_drill_down_samples_members(self, cgroup_root, proc_root):
+        write_group(cgroup_root, "self.scope", 100, pids=[os.getpid()])
+        monitor = MemoryMonitor(
+            cgroups=["self.scope"], include_children=True,
+            cgroup_root=str(cgroup_root), proc_root=str(proc_root)
+        )
+        
+        stats = monitor.collect()
+        
+        assert [stat.name for stat in stats][0] == "/self.scope"
+        assert [stat.pid for stat in stats][1:] == [os.getpid()]
+        assert stats[0].pid < 0
+        assert set(monitor.history.processes) == {stats[0].pid, os.getpid()}
+        monitor.close()
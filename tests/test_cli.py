@@ -1,7 +1,12 @@
 """Tests for CLI functionality."""
 
+import json
+import os
+import subprocess
+import sys
+import time
 import pytest
-from mem_watch.cli import parse_memory_value
+from mem_watch.cli import parse_duration, parse_memory_value, parse_target, parse_time_value
 
 
 class TestParseMemoryValue:
@@ -26,3 +31,124 @@ class TestParseMemoryValue:
 
     def test_parse_with_whitespace(self):
         assert parse_memory_value(" 100M ") == 100 * 1024 * 1024
+
+
+class TestParseTimeValue:
+    def test_relative_hours(self):
+        assert parse_time_value("12h", now=100000.0) == 100000.0 - 12 * 3600
+
+    def test_relative_minutes(self):
+        assert parse_time_value("90m", now=10000.0) == 10000.0 - 5400
+
+    def test_epoch(self):
+        assert parse_time_value("1700000000") == 1700000000.0
+
+    def test_datetime(self):
+        expected = time.mktime(time.strptime("2024-01-02 03:04:05", "%Y-%m-%d %H:%M:%S"))
+        assert parse_time_value("2024-01-02 03:04:05") == expected
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_time_value("yesterday")
+
+
+class TestParseDuration:
+    def test_units(self):
+        assert parse_duration("90s") == 90
+        assert parse_duration("15m") == 900
+        assert parse_duration("7d") == 7 * 86400
+        assert parse_duration("2.5") == 2.5
+
+
+class TestParseTarget:
+    def test_pid_target(self):
+        target, threshold, export = parse_target("db=pid:1234")
+        
+        assert target.label == "db"
+        assert target.pid == 1234
+        assert not target.include_children
+        assert threshold is None and export is None
+
+    def test_name_target_with_options(self):
+        target, threshold, export = parse_target("api=name:gunicorn,children,threshold=1G,export=api.csv")
+        
+        assert target.name_pattern.pattern == "gunicorn"
+        assert target.include_children
+        assert threshold == "1G"
+        assert export == "api.csv"
+
+    def test_regex_with_comma(self):
+        target, threshold, _ = parse_target("jobs=name:job-[0-9]{1,3},threshold=80%")
+        
+        assert target.name_pattern.pattern == "job-[0-9]{1,3}"
+        assert threshold == "80%"
+
+    @pytest.mark.parametrize("spec", ["pid:12", "x=port:80", "x=name:", "=pid:1"])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_target(spec)
+
+
+class TestArguments:
+    def test_adaptive_all_needs_procfs(self, capsys):
+        from mem_watch.cli import main
+        
+        with pytest.raises(SystemExit):
+            main(["--all", "--max-interval", "5"])
+        
+        assert "--backend procfs" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("path", ["out.mwt", "out.db"])
+    def test_csv_only_export_options_rejected(self, path, capsys):
+        from mem_watch.cli import main
+        
+        with pytest.raises(SystemExit):
+            main(["--all", "--export", path, "--rotate-size", "10M", "--fsync"])
+        
+        assert "--rotate-size, --fsync only supported for CSV exports" in capsys.readouterr().err
+
+
+class TestWatchExits:
+    @pytest.mark.parametrize("backend", ["procfs", "psutil"])
+    def test_exit_of_watched_process_reported(self, backend):
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(1)"])
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        monitor = subprocess.Popen(
+            [
+                sys.executable, "-c", "from mem_watch.cli import main; main()",
+                "--pid", str(child.pid), "--watch-exits", "--format", "json",
+                "-i", "0.2", "--backend", backend
+            ],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env
+        )
+        child.wait()
+        out, err = monitor.communicate(timeout=20)
+        
+        assert monitor.returncode == 0, err
+        last = json.loads(out.splitlines()[-1])
+        assert last["processes"] == []
+        assert [event["pid"] for event in last["exits"]] == [child.pid]
+
+
+class TestLazyImports:
+    def run(self, code):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+        assert result.returncode == 0, result.stderr
+        return result.stdout.split()
+
+    def test_cli_import_skips_heavy_modules(self):
+        loaded = self.run(
+            "import sys, mem_watch.cli; "
+            "print(*(m in sys.modules for m in ('rich', 'psutil', 'mem_watch.display', 'mem_watch.export')))"
+        )
+        
+        assert loaded == ["False"] * 4
+
+    def test_package_attributes_load_on_access(self):
+        loaded = self.run(
+            "import sys, mem_watch; print('mem_watch.monitor' in sys.modules); "
+            "mem_watch.MemoryMonitor; print('mem_watch.monitor' in sys.modules)"
+        )
+        
+        assert loaded == ["False", "True"]
@@ -0,0 +1,200 @@
+"""Tests for the shared sampler daemon and its socket protocol."""
+
+import os
+import shutil
+import socket
+import tempfile
+import time
+import pytest
+from conftest import write_process
+from mem_watch.daemon import DaemonClient, SamplerDaemon, encode_frame, recv_frame, rows_stats, stats_rows
+from mem_watch.monitor import ProcessStats, Target
+
+PAGE = os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.fixture
+def proc_root(proc_root):
+    write_process(proc_root, 10, "web", 100)
+    write_process(proc_root, 11, "worker", 200, ppid=10)
+    write_process(proc_root, 20, "db", 300)
+    return proc_root
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 bytes, so avoid pytest's tmp_path
+    directory = tempfile.mkdtemp(prefix="mw")
+    yield os.path.join(directory, "mw.sock")
+    shutil.rmtree(directory)
+
+
+@pytest.fixture
+def make_daemon(proc_root, socket_path):
+    daemons = []
+    
+    def factory(**options):
+        daemon = SamplerDaemon(socket_path, backend="procfs", proc_root=str(proc_root), **options)
+        daemon.start()
+        daemons.append(daemon)
+        return daemon
+    
+    yield factory
+    for daemon in daemons:
+        daemon.close()
+
+
+def request(path, message):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(encode_frame(message))
+        return recv_frame(sock)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out")
+        time.sleep(0.01)
+
+
+class TestFraming:
+    def test_round_trip(self):
+        left, right = socket.socketpair()
+        with left, right:
+            left.sendall(encode_frame({"type": "tick", "stats": [[1, "a", 2, 3, 0.5, 9.0]]}))
+            
+            assert recv_frame(right) == {"type": "tick", "stats": [[1, "a", 2, 3, 0.5, 9.0]]}
+    
+    def test_eof(self):
+        left, right = socket.socketpair()
+        with right:
+            left.close()
+            
+            assert recv_frame(right) is None
+    
+    def test_rows_round_trip(self):
+        stat = ProcessStats(pid=1, name="a", rss=2, vms=3, percent=0.5)
+        
+        (restored,) = rows_stats(stats_rows([stat]))
+        
+        assert (restored.pid, restored.name, restored.rss, restored.timestamp) == (1, "a", 2, stat.timestamp)
+
+
+class TestSamplerDaemon:
+    def test_idle_without_targets(self, make_daemon):
+        daemon = make_daemon()
+        
+        assert daemon.tick() == []
+        assert not daemon.recent
+    
+    def test_union_of_subscriptions_sampled_once(self, make_daemon):
+        daemon = make_daemon()
+        first, _ = daemon.subscribe((10, None, True))
+        second, _ = daemon.subscribe((None, "web|db", False))
+        
+        stats = daemon.tick()
+        
+        assert sorted(stat.pid for stat in stats) == [10, 11, 20]
+        assert [row[0] for row in recv(first)["stats"]] == [10, 11]
+        assert sorted(row[0] for row in recv(second)["stats"]) == [10, 20]
+    
+    def test_identical_requests_share_target(self, make_daemon):
+        daemon = make_daemon()
+        first, _ = daemon.subscribe((None, "db", False))
+        second, _ = daemon.subscribe((None, "db", False))
+        
+        daemon.tick()
+        
+        assert len(daemon.monitor.targets) == 1
+        assert first.frames.get_nowait() is second.frames.get_nowait()
+    
+    def test_unsubscribe_drops_target(self, make_daemon):
+        daemon = make_daemon()
+        client, _ = daemon.subscribe((20, None, False))
+        
+        daemon.unsubscribe((20, None, False), client)
+        
+        assert daemon.monitor.targets == []
+        assert daemon.status()["subscriptions"] == 0
+    
+    def test_standing_target_history(self, make_daemon):
+        daemon = make_daemon(targets=[Target(name_pattern="web", include_children=True)])
+        daemon.tick()
+        daemon.tick()
+        
+        _, history = daemon.subscribe((None, "web", True))
+        
+        assert len(history["ticks"]) == 2
+        assert [row[0] for row in history["ticks"][0]["stats"]] == [10, 11]
+    
+    def test_history_bounded(self, make_daemon):
+        daemon = make_daemon(targets=[Target(pid=20)], history_size=3)
+        for _ in range(5):
+            daemon.tick()
+        
+        assert len(daemon.history((20, None, False))["ticks"]) == 3
+    
+    def test_slow_client_drops_oldest(self, make_daemon):
+        daemon = make_daemon(backlog=2)
+        client, _ = daemon.subscribe((20, None, False))
+        
+        for _ in range(4):
+            daemon.tick()
+        
+        assert client.dropped == 2
+        assert client.frames.qsize() == 2
+    
+    def test_refuses_live_socket(self, make_daemon, proc_root, socket_path):
+        make_daemon()
+        
+        with pytest.raises(RuntimeError):
+            SamplerDaemon(socket_path, backend="procfs", proc_root=str(proc_root))
+
+
+class TestSocketApi:
+    def test_status_and_history_requests(self, make_daemon, socket_path):
+        daemon = make_daemon(targets=[Target(pid=20)])
+        daemon.tick()
+        
+        assert request(socket_path, {"op": "status"})["ticks"] == 1
+        history = request(socket_path, {"op": "history", "pid": 20})
+        assert history["ticks"][0]["stats"][0][:3] == [20, "db", 300 * PAGE]
+        assert request(socket_path, {"op": "bogus"})["type"] == "error"
+    
+    def test_client_gets_history_then_ticks(self, make_daemon, socket_path):
+        daemon = make_daemon(targets=[Target(pid=20)])
+        daemon.tick()
+        client = DaemonClient(socket_path, pid=20)
+        client.start()
+        try:
+            assert len(client.history) == 1
+            assert client.history[0][1][0].name == "db"
+            
+            wait_for(lambda: daemon.status()["clients"] == 1)
+            daemon.tick()
+            tick = next(client.ticks())
+            
+            assert [stat.pid for stat in tick.stats] == [20]
+        finally:
+            client.stop()
+        wait_for(lambda: daemon.status()["clients"] == 0)
+    
+    def test_close_ends_client_stream(self, make_daemon, socket_path):
+        daemon = make_daemon()
+        client = DaemonClient(socket_path, name="web")
+        client.start()
+        wait_for(lambda: daemon.status()["clients"] == 1)
+        
+        daemon.close()
+        
+        assert list(client.ticks()) == []
+        assert not os.path.exists(socket_path)
+        client.stop()
+
+
+def recv(client):
+    import json
+    frame = client.frames.get_nowait()
+    return json.loads(frame[4:])
@@ -1,9 +1,13 @@
 """Tests for display functionality."""
 
+import io
 import pytest
+from unittest.mock import Mock
+from rich.console import Console
 from mem_watch.display import Display
 from mem_watch.monitor import ProcessStats
 from mem_watch.alerts import Alert
+from mem_watch.top import TopK
 
 
 class TestDisplay:
@@ -47,3 +51,197 @@ class TestDisplay:
         display = Display()
         graph = display._create_graph([100])
         assert len(graph) == 1
+
+
+def make_stat(pid=1234, rss=1024000, percent=5.0):
+    return ProcessStats(pid=pid, name="test", rss=rss, vms=2048000, percent=percent)
+
+
+class TestDisplayRendering:
+    def test_show_prints_status(self):
+        display = Display()
+        display.console = Console(file=io.StringIO(), width=120)
+        
+        display.show([make_stat()], status="Missed 2 sampling deadline(s)")
+        
+        assert "Missed 2 sampling deadline(s)" in display.console.file.getvalue()
+
+    def test_unchanged_rows_reuse_cells(self):
+        display = Display(show_graph=False)
+        display.console = Console(file=io.StringIO())
+        
+        display.show([make_stat()])
+        first = display._row_cache[1234]
+        display.show([make_stat()])
+        
+        assert display._row_cache[1234] is first
+
+    def test_changed_rows_reformatted(self):
+        display = Display()
+        display.console = Console(file=io.StringIO())
+        
+        display.show([make_stat(rss=1000)])
+        first = display._row_cache[1234]
+        display.show([make_stat(rss=2000)])
+        
+        assert display._row_cache[1234] is not first
+
+
+class TestLiveDisplay:
+    def test_identical_frames_skipped(self):
+        display = Display(show_graph=False, live=True, max_fps=0)
+        display._live = Mock()
+        
+        display.show([make_stat()])
+        display.show([make_stat()])
+        
+        assert display._live.update.call_count == 1
+
+    def test_changed_frames_rendered(self):
+        display = Display(live=True, max_fps=0)
+        display._live = Mock()
+        
+        display.show([make_stat(rss=1000)])
+        display.show([make_stat(rss=2000)])
+        
+        assert display._live.update.call_count == 2
+
+    def test_frame_rate_cap(self):
+        display = Display(live=True, max_fps=1)
+        display._live = Mock()
+        
+        display.show([make_stat(rss=1000)])
+        display.show([make_stat(rss=2000)])
+        
+        assert display._live.update.call_count == 1
+        assert display._pending is not None
+
+    def test_stop_flushes_pending_frame(self):
+        display = Display(live=True, max_fps=1)
+        live = Mock()
+        display._live = live
+        display.show([make_stat(rss=1000)])
+        display.show([make_stat(rss=2000)])
+        
+        display.stop()
+        
+        assert live.update.call_count == 2
+        live.stop.assert_called_once()
+
+    def test_start_stop(self):
+        display = Display(live=True)
+        display.console = Console(file=io.StringIO())
+        
+        display.start()
+        display.show([make_stat()])
+        display.stop()
+        
+        assert "Memory Usage Monitor" in display.console.file.getvalue()
+
+    def test_start_noop_without_live(self):
+        display = Display()
+        display.start()
+        assert display._live is None
+
+
+class TestTrends:
+    def test_per_pid_trends(self):
+        display = Display()
+        display.console = Console(file=io.StringIO())
+        
+        display.show([make_stat(pid=1, rss=100), make_stat(pid=2, rss=100)])
+        display.show([make_stat(pid=1, rss=200), make_stat(pid=2, rss=50)])
+        
+        assert display._trends[1].render() == "▁█"
+        assert display._trends[2].render() == "█▁"
+
+    def test_trends_grouped_by_name(self):
+        display = Display(trend_by="name")
+        display.console = Console(file=io.StringIO())
+        
+        display.show([make_stat(pid=1, rss=100), make_stat(pid=2, rss=100)])
+        
+        assert list(display._trends) == ["test"]
+        assert display._trends["test"].last == 200
+
+    def test_exited_process_trend_dropped(self):
+        display = Display()
+        display.console = Console(file=io.StringIO())
+        
+        display.show([make_stat(pid=1), make_stat(pid=2)])
+        display.show([make_stat(pid=1)])
+        
+        assert list(display._trends) == [1]
+
+    def test_group_rows_show_member_count(self):
+        display = Display()
+        display.console = Console(file=io.StringIO(), width=120)
+        
+        display.show(TopK(group_by="name").select([make_stat(pid=1), make_stat(pid=2)]))
+        
+        output = display.console.file.getvalue()
+        assert "2 procs" in output
+        assert "-18446744073709551616" not in output
+
+    def test_invalid_trend_grouping(self):
+        with pytest.raises(ValueError):
+            Display(trend_by="user")
+
+
+class TestWindowedTrends:
+    def test_trends_drawn_from_history(self):
+        from mem_watch.history import History
+        history = History(depth=5)
+        display = Display(history=history, trend_window=600)
+        display.console = Console(file=io.StringIO(), width=120)
+        
+        for t in range(600):
+            stat = ProcessStats(pid=1234, name="test", rss=1000 + t, vms=0, percent=1.0, timestamp=float(t))
+            history.record([stat])
+        display.show([stat])
+        
+        assert len(display._trend_text(stat)) == display.trend_width
+        assert display._total_graph(1599)[1] == 1599
+        assert "RSS History (10m)" in display.console.file.getvalue()
+
+
+class TestLeakAlertRendering:
+    def test_leak_alert_message(self):
+        display = Display(show_graph=False)
+        stats = [ProcessStats(pid=1, name="app", rss=1024 ** 2, vms=1024 ** 2, percent=1.0)]
+        alert = Alert(pid=1, name="app", current=1024 ** 2 / 3600, threshold=0, level="warning", kind="leak", eta=5400)
+        
+        with display.console.capture() as capture:
+            display.show(stats, [alert])
+        
+        assert "+1.0MB/h, limit in 1.5h" in capture.get()
+
+
+class TestProfilePanel:
+    def test_profile_footer_rendered(self):
+        from mem_watch.profiling import Profiler
+        profiler = Profiler()
+        profiler.count("proc_reads", 7)
+        profiler.tick()
+        display = Display(show_graph=False, profiler=profiler)
+        
+        with display.console.capture() as capture:
+            display.show([make_stat()])
+        
+        assert "per tick: proc_reads 7" in capture.get()
+
+
+class TestGroupedRows:
+    def test_rows_grouped_under_target_headings(self):
+        display = Display(show_graph=False)
+        web = ProcessStats(pid=1, name="web", rss=1024 ** 2, vms=1024 ** 2, percent=1.0)
+        shared = ProcessStats(pid=2, name="helper", rss=1024 ** 2, vms=1024 ** 2, percent=1.0)
+        
+        with display.console.capture() as capture:
+            display.show([web, shared], groups=[("api", [web, shared]), ("jobs", [shared]), ("idle", [])])
+        
+        output = capture.get()
+        assert output.index("api") < output.index("web") < output.index("jobs")
+        assert output.count("helper") == 2
+        assert "2 processes" in output
+        assert "0 processes" in output
@@ -0,0 +1,153 @@
+"""Tests for process exit notification."""
+
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import pytest
+from conftest import write_process
+from mem_watch import events
+from mem_watch.events import PidfdWatcher, PollingWatcher, create_watcher, pidfd_supported
+from mem_watch.monitor import MemoryMonitor
+
+needs_pidfd = pytest.mark.skipif(not pidfd_supported(), reason="pidfd not supported")
+
+
+class Recorder:
+    def __init__(self):
+        self.exits = []
+        self.event = threading.Event()
+    
+    def __call__(self, pid, timestamp):
+        self.exits.append(pid)
+        self.event.set()
+
+
+@needs_pidfd
+class TestPidfdWatcher:
+    def test_exit_reported_immediately(self):
+        recorder = Recorder()
+        watcher = PidfdWatcher(recorder)
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        try:
+            watcher.track([child.pid])
+            assert len(watcher) == 1
+            
+            child.kill()
+            
+            assert recorder.event.wait(2.0)
+            assert recorder.exits == [child.pid]
+            assert len(watcher) == 0
+        finally:
+            child.kill()
+            child.wait()
+            watcher.close()
+    
+    def test_already_exited(self):
+        recorder = Recorder()
+        watcher = PidfdWatcher(recorder)
+        child = subprocess.Popen([sys.executable, "-c", "pass"])
+        child.wait()
+        
+        watcher.track([child.pid])
+        
+        assert recorder.exits == [child.pid]
+        watcher.close()
+    
+    def test_untracked_pids_closed(self):
+        watcher = PidfdWatcher(Recorder())
+        
+        watcher.track([os.getpid()])
+        watcher.track([])
+        
+        assert len(watcher) == 0
+        watcher.close()
+
+
+class TestPollingWatcher:
+    def test_exit_found_on_next_track(self):
+        recorder = Recorder()
+        alive = {1, 2}
+        watcher = PollingWatcher(recorder, exists=alive.__contains__)
+        watcher.track([1, 2])
+        
+        alive.discard(2)
+        watcher.track([1])
+        
+        assert recorder.exits == [2]
+    
+    def test_untracked_but_alive_is_not_an_exit(self):
+        recorder = Recorder()
+        watcher = PollingWatcher(recorder, exists=lambda pid: True)
+        watcher.track([1, 2])
+        
+        watcher.track([1])
+        
+        assert recorder.exits == []
+    
+    def test_fallback_without_pidfd(self, monkeypatch):
+        monkeypatch.setattr(events, "pidfd_supported", lambda: False)
+        
+        assert isinstance(create_watcher(Recorder()), PollingWatcher)
+
+
+class TestMonitorExits:
+    def test_exit_carries_last_sample(self, proc_root, monkeypatch):
+        monkeypatch.setattr(events, "pidfd_supported", lambda: False)
+        write_process(proc_root, 10, "web", 100)
+        write_process(proc_root, 11, "job", 300)
+        monitor = MemoryMonitor(name_pattern=".", backend="procfs", proc_root=str(proc_root), watch_exits=True)
+        monitor.collect()
+        
+        shutil.rmtree(proc_root / "11")
+        monitor.collect()
+        exits = monitor.pop_exits()
+        
+        assert [(event.stat.pid, event.stat.rss) for event in exits] == [(11, 300 * os.sysconf("SC_PAGE_SIZE"))]
+        assert monitor.pop_exits() == []
+        monitor.close()
+    
+    def test_zombie_reported_once(self, proc_root, monkeypatch):
+        monkeypatch.setattr(events, "pidfd_supported", lambda: False)
+        write_process(proc_root, 10, "web", 100)
+        monitor = MemoryMonitor(pid=10, backend="procfs", proc_root=str(proc_root), watch_exits=True)
+        stat = monitor.collect()[0]
+        
+        # The exit is seen while /proc still lists the zombie
+        monitor._on_exit(10, stat.timestamp)
+        monitor.collect()
+        monitor._on_exit(10, stat.timestamp)
+        
+        assert len(monitor.pop_exits()) == 1
+        monitor.close()
+    
+    def test_child_tree_from_children_files(self, proc_root, monkeypatch):
+        monkeypatch.setattr(events, "pidfd_supported", lambda: False)
+        write_process(proc_root, 10, "parent", 1, children=[11])
+        write_process(proc_root, 11, "child", 1, ppid=10, children=[12])
+        write_process(proc_root, 12, "grandchild", 1, ppid=11, children=[])
+        write_process(proc_root, 13, "other", 1, children=[])
+        monitor = MemoryMonitor(
+            pid=10, include_children=True, backend="procfs", proc_root=str(proc_root), watch_exits=True
+        )
+        
+        stats = monitor.collect()
+        
+        assert [stat.pid for stat in stats] == [10, 11, 12]
+        # No full scan was needed
+        assert monitor.index.entries == {}
+        monitor.close()
+    
+    def test_children_files_unsupported_fall_back_to_scan(self, proc_root, monkeypatch):
+        monkeypatch.setattr(events, "pidfd_supported", lambda: False)
+        write_process(proc_root, 10, "parent", 1)
+        write_process(proc_root, 11, "child", 1, ppid=10)
+        (proc_root / "10" / "task" / "10").mkdir(parents=True)
+        monitor = MemoryMonitor(
+            pid=10, include_children=True, backend="procfs", proc_root=str(proc_root), watch_exits=True
+        )
+        
+        assert sorted(stat.pid for stat in monitor.collect()) == [10, 11]
+        assert 11 in monitor.index.entries
+        monitor.close()
@@ -2,8 +2,10 @@
 
 import pytest
 import csv
+import gzip
+import time
 from pathlib import Path
-from mem_watch.export import CSVExporter
+from mem_watch.export import CSVExporter, parse_time
 from mem_watch.monitor import ProcessStats
 
 
@@ -17,12 +19,25 @@ class TestCSVExporter:
         
         assert filepath.exists()
 
+    def test_profiler_counts_bytes_and_flushes(self, tmp_path):
+        from mem_watch.profiling import Profiler
+        profiler = Profiler()
+        exporter = CSVExporter(str(tmp_path / "test.csv"), profiler=profiler)
+        stats = [ProcessStats(pid=1234, name="test", rss=1024000, vms=2048000, percent=5.5)]
+        
+        exporter.write(stats)
+        exporter.close()
+        
+        assert profiler.counters["export_bytes"] > 0
+        assert profiler.phases["export.flush"].count >= 1
+
     def test_write_headers(self, tmp_path):
         filepath = tmp_path / "test.csv"
         exporter = CSVExporter(str(filepath))
         stats = [ProcessStats(pid=1234, name="test", rss=1024000, vms=2048000, percent=5.5)]
         
         exporter.write(stats)
+        exporter.close()
         
         with open(filepath, 'r') as f:
             reader = csv.reader(f)
@@ -35,6 +50,7 @@ class TestCSVExporter:
         stats = [ProcessStats(pid=1234, name="test", rss=1024000, vms=2048000, percent=5.5)]
         
         exporter.write(stats)
+        exporter.close()
         
         with open(filepath, 'r') as f:
             reader = csv.reader(f)
@@ -55,6 +71,7 @@ class TestCSVExporter:
         ]
         
         exporter.write(stats)
+        exporter.close()
         
         with open(filepath, 'r') as f:
             reader = csv.reader(f)
@@ -70,9 +87,143 @@ class TestCSVExporter:
         
         exporter.write(stats1)
         exporter.write(stats2)
+        exporter.close()
         
         with open(filepath, 'r') as f:
             reader = csv.reader(f)
             next(reader)  # Skip headers
             rows = list(reader)
             assert len(rows) == 2
+
+    def test_write_uses_sample_timestamp(self, tmp_path):
+        filepath = tmp_path / "test.csv"
+        stats = [ProcessStats(pid=1234, name="test", rss=1024000, vms=2048000, percent=5.5)]
+        
+        with CSVExporter(str(filepath)) as exporter:
+            exporter.write(stats, timestamp=0)
+        
+        with open(filepath, 'r') as f:
+            rows = list(csv.reader(f))
+            assert rows[1][0] == time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(0))
+
+    def test_file_kept_open_between_writes(self, tmp_path):
+        filepath = tmp_path / "test.csv"
+        exporter = CSVExporter(str(filepath))
+        stats = [ProcessStats(pid=1234, name="test", rss=1024000, vms=2048000, percent=5.5)]
+        
+        exporter.write(stats)
+        handle = exporter._file
+        exporter.write(stats)
+        
+        assert exporter._file is handle
+        exporter.close()
+
+    def test_flush_interval(self, tmp_path):
+        filepath = tmp_path / "test.csv"
+        exporter = CSVExporter(str(filepath), flush_interval=0)
+        stats = [ProcessStats(pid=1234, name="test", rss=1024000, vms=2048000, percent=5.5)]
+        
+        exporter.write(stats)
+        
+        with open(filepath, 'r') as f:
+            assert len(list(csv.reader(f))) == 2
+        exporter.close()
+
+    def test_buffered_until_flush(self, tmp_path):
+        filepath = tmp_path / "test.csv"
+        exporter = CSVExporter(str(filepath), flush_interval=3600)
+        stats = [ProcessStats(pid=1234, name="test", rss=1024000, vms=2048000, percent=5.5)]
+        
+        exporter.write(stats)
+        assert filepath.read_text() == ""
+        exporter.flush()
+        
+        assert len(filepath.read_text().splitlines()) == 2
+        exporter.close()
+
+    def test_reopen_after_close_appends(self, tmp_path):
+        filepath = tmp_path / "test.csv"
+        exporter = CSVExporter(str(filepath))
+        stats = [ProcessStats(pid=1234, name="test", rss=1024000, vms=2048000, percent=5.5)]
+        
+        exporter.write(stats)
+        exporter.close()
+        exporter.write(stats)
+        exporter.close()
+        
+        assert len(filepath.read_text().splitlines()) == 3
+
+    def test_rotate_by_size(self, tmp_path):
+        filepath = tmp_path / "test.csv"
+        exporter = CSVExporter(str(filepath), max_bytes=100)
+        stats = [ProcessStats(pid=1234, name="test", rss=1024000, vms=2048000, percent=5.5)]
+        
+        for _ in range(6):
+            exporter.write(stats)
+        exporter.close()
+        
+        assert len(exporter.rotated) >= 1
+        for path in exporter.rotated + [filepath]:
+            with open(path, 'r') as f:
+                assert next(csv.reader(f))[0] == 'timestamp'
+
+    def test_rotate_by_age_with_gzip(self, tmp_path):
+        filepath = tmp_path / "test.csv"
+        exporter = CSVExporter(str(filepath), max_age=0, compress=True)
+        stats = [ProcessStats(pid=1234, name="test", rss=1024000, vms=2048000, percent=5.5)]
+        
+        exporter.write(stats)
+        exporter.write(stats)
+        exporter.close()
+        
+        assert len(exporter.rotated) == 1
+        assert exporter.rotated[0].suffix == ".gz"
+        with gzip.open(exporter.rotated[0], 'rt') as f:
+            rows = list(csv.reader(f))
+            assert len(rows) == 2
+
+    def test_detail_columns(self, tmp_path):
+        filepath = tmp_path / "test.csv"
+        sampled = ProcessStats(pid=1, name="a", rss=100, vms=200, percent=1.0)
+        sampled.pss, sampled.uss, sampled.swap = 60, 40, 8
+        sampled.detail_time = time.mktime((2024, 1, 2, 3, 4, 5, 0, 0, -1))
+        pending = ProcessStats(pid=2, name="b", rss=100, vms=200, percent=1.0)
+        
+        with CSVExporter(str(filepath), detail=True) as exporter:
+            exporter.write([sampled, pending])
+        
+        with open(filepath, newline='') as f:
+            rows = list(csv.reader(f))
+        assert rows[0][6:] == ['pss_bytes', 'uss_bytes', 'swap_bytes', 'detail_timestamp']
+        assert rows[1][6:] == ['60', '40', '8', '2024-01-02 03:04:05']
+        assert rows[2][6:] == ['', '', '', '']
+
+    def test_per_sample_timestamps(self, tmp_path):
+        filepath = tmp_path / "test.csv"
+        stats = []
+        for pid, when in ((1, (2024, 1, 2, 3, 4, 5)), (2, (2024, 1, 2, 3, 4, 9))):
+            stat = ProcessStats(pid=pid, name="a", rss=1, vms=1, percent=0.0)
+            stat.timestamp = time.mktime(when + (0, 0, -1))
+            stats.append(stat)
+        
+        with CSVExporter(str(filepath)) as exporter:
+            exporter.write(stats)
+        
+        with open(filepath, newline='') as f:
+            rows = list(csv.reader(f))
+        assert [row[0] for row in rows[1:]] == ['2024-01-02 03:04:05', '2024-01-02 03:04:09']
+
+    def test_subsecond_timestamps(self, tmp_path):
+        filepath = tmp_path / "test.csv"
+        base = time.mktime((2024, 1, 2, 3, 4, 5, 0, 0, -1))
+        stats = [ProcessStats(pid=1, name="a", rss=1, vms=1, percent=0.0, timestamp=base + 0.25)]
+        
+        with CSVExporter(str(filepath), subsecond=True) as exporter:
+            exporter.write(stats)
+            exporter.write(stats, timestamp=base + 0.5)
+        
+        with open(filepath, newline='') as f:
+            rows = list(csv.reader(f))
+        assert [row[0] for row in rows[1:]] == ['2024-01-02 03:04:05.250', '2024-01-02 03:04:05.500']
+        assert parse_time(rows[2][0]) == pytest.approx(base + 0.5)
+        assert parse_time('2024-01-02 03:04:05') == base
@@ -0,0 +1,307 @@
+"""Tests for ring-buffer history and running statistics."""
+
+import statistics
+import threading
+import pytest
+from mem_watch.history import History, LinearTrend, RingBuffer, Rollup, RunningStats, Series
+from mem_watch.monitor import ProcessStats
+
+
+class TestRunningStats:
+    def test_matches_batch_statistics(self):
+        values = [5.0, 1.0, 9.0, 3.0, 7.0]
+        running = RunningStats()
+        for value in values:
+            running.add(value)
+        
+        assert running.count == 5
+        assert running.min == 1.0
+        assert running.max == 9.0
+        assert running.mean == pytest.approx(statistics.mean(values))
+        assert running.variance == pytest.approx(statistics.pvariance(values))
+
+    def test_empty(self):
+        running = RunningStats()
+        assert running.variance == 0.0
+        assert running.min is None
+
+    def test_merge_matches_single_pass(self):
+        values = [5.0, 1.0, 9.0, 3.0, 7.0, 2.0]
+        left = RunningStats()
+        right = RunningStats()
+        for value in values[:2]:
+            left.add(value)
+        for value in values[2:]:
+            right.add(value)
+        
+        left.merge(right.count, right.mean, right._m2, right.min, right.max)
+        
+        assert left.count == 6
+        assert (left.min, left.max) == (1.0, 9.0)
+        assert left.mean == pytest.approx(statistics.mean(values))
+        assert left.variance == pytest.approx(statistics.pvariance(values))
+
+
+class TestRingBuffer:
+    def test_append_and_order(self):
+        buffer = RingBuffer(3)
+        for i in range(5):
+            buffer.append(float(i), i * 10, i * 20, i / 10)
+        
+        assert len(buffer) == 3
+        assert buffer.column('rss') == [20, 30, 40]
+        assert buffer.last() == (4.0, 40, 80, 0.4)
+        assert [sample[0] for sample in buffer.samples()] == [2.0, 3.0, 4.0]
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            RingBuffer(0)
+
+    def test_covers_from_oldest_sample(self):
+        buffer = RingBuffer(4)
+        for i in range(3):
+            buffer.append(float(10 + i), i, 0, 0.0)
+        assert buffer.covers(0.0)
+        
+        for i in range(3, 6):
+            buffer.append(float(10 + i), i, 0, 0.0)
+        assert buffer.covers(12.0)
+        assert not buffer.covers(11.5)
+
+
+class TestHistory:
+    def test_len_capped_at_depth(self):
+        history = History(depth=3)
+        for _ in range(5):
+            history.record([ProcessStats(pid=1, name="a", rss=100, vms=200, percent=1.0)])
+        
+        assert len(history) == 3
+        assert len(history.get(1).buffer) == 3
+
+    def test_global_summary(self):
+        history = History(depth=10)
+        history.record([
+            ProcessStats(pid=1, name="a", rss=100, vms=0, percent=1.0),
+            ProcessStats(pid=2, name="b", rss=300, vms=0, percent=3.0)
+        ])
+        history.record([ProcessStats(pid=1, name="a", rss=200, vms=0, percent=2.0)])
+        
+        summary = history.summary()
+        
+        assert summary["min_rss"] == 100
+        assert summary["max_rss"] == 300
+        assert summary["avg_rss"] == pytest.approx(200)
+        assert summary["max_percent"] == 3.0
+        assert summary["samples"] == 2
+        assert summary["process_samples"] == 3
+
+    def test_global_counts_not_capped_at_depth(self):
+        history = History(depth=2)
+        for _ in range(5):
+            history.record([ProcessStats(pid=1, name="a", rss=100, vms=0, percent=1.0)])
+        
+        summary = history.summary()
+        
+        assert len(history) == 2
+        assert summary["samples"] == 5
+        assert summary["process_samples"] == 5
+
+    def test_per_process_summary(self):
+        history = History(depth=10)
+        history.record([ProcessStats(pid=1, name="a", rss=100, vms=0, percent=1.0)])
+        history.record([ProcessStats(pid=1, name="a", rss=300, vms=0, percent=3.0)])
+        
+        summary = history.summary(pid=1)
+        
+        assert summary["name"] == "a"
+        assert summary["avg_rss"] == pytest.approx(200)
+        assert summary["std_rss"] == pytest.approx(100)
+        assert summary["samples"] == 2
+        assert history.summary(pid=99) == {}
+
+    def test_stale_processes_evicted(self):
+        history = History(depth=2)
+        history.record([ProcessStats(pid=1, name="a", rss=1, vms=0, percent=0.0)])
+        for _ in range(4):
+            history.record([ProcessStats(pid=2, name="b", rss=1, vms=0, percent=0.0)])
+        
+        assert history.get(1) is None
+        assert history.get(2) is not None
+
+    def test_reused_pid_resets_process(self):
+        history = History(depth=10)
+        history.record([ProcessStats(pid=1, name="a", rss=100, vms=0, percent=0.0)])
+        history.record([ProcessStats(pid=1, name="b", rss=500, vms=0, percent=0.0)])
+        
+        assert history.summary(pid=1)["min_rss"] == 500
+
+
+def make_series(seconds, depth=10, tiers=((10, 6), (60, 4))):
+    series = Series(depth, tiers)
+    for t in range(seconds):
+        series.append(float(t), 1000 + t, 0, 1.0)
+    return series
+
+
+class TestRollup:
+    def test_buckets_consolidate_samples(self):
+        rollup = Rollup(10, 4)
+        for t in range(25):
+            rollup.add(float(t), t, 0.0)
+        
+        assert len(rollup) == 3
+        assert rollup.values(0.0, "min") == [0, 10, 20]
+        assert rollup.values(0.0, "max") == [9, 19, 24]
+        assert rollup.values(0.0, "last") == [9, 19, 24]
+        assert rollup.values(0.0) == [4.5, 14.5, 22.0]
+
+    def test_wraps_at_capacity(self):
+        rollup = Rollup(10, 2)
+        for t in range(50):
+            rollup.add(float(t), t, 0.0)
+        
+        assert rollup.values(0.0, "min") == [20, 30, 40]
+        assert not rollup.covers(15.0)
+        assert rollup.covers(25.0)
+
+    def test_window(self):
+        rollup = Rollup(10, 10)
+        for t in range(40):
+            rollup.add(float(t), t, 0.0)
+        
+        assert rollup.values(25.0, "min") == [20, 30]
+
+    def test_cascaded_rollup_sees_open_buckets(self):
+        series = make_series(150)
+        minutes = series.rollups[1]
+        rss = RunningStats()
+        
+        minutes.merge_into(0.0, rss, RunningStats())
+        
+        assert minutes.values(0.0, "max") == [1059, 1119, 1149]
+        assert rss.count == 150
+        assert rss.mean == pytest.approx(statistics.mean(1000 + t for t in range(150)))
+        assert rss.variance == pytest.approx(statistics.pvariance(1000 + t for t in range(150)))
+
+    def test_resolutions_must_nest(self):
+        with pytest.raises(ValueError):
+            Series(10, ((10, 6), (15, 4)))
+
+
+class TestSeriesTier:
+    def test_finest_covering_tier(self):
+        series = make_series(200)
+        
+        assert series.tier(195.0) is series.buffer
+        assert series.tier(150.0) is series.rollups[0]
+        assert series.tier(0.0) is series.rollups[1]
+
+    def test_points_pick_coarser_tier(self):
+        series = make_series(200)
+        
+        # 50 seconds in 5 points needs no more than 10s buckets
+        assert series.tier(149.0, points=5) is series.rollups[0]
+        assert series.tier(149.0, points=50) is series.rollups[0]
+        assert series.tier(195.0, points=2) is series.buffer
+
+    def test_points_limited_to_recorded_span(self):
+        series = make_series(8)
+        
+        assert series.tier(-3600.0, points=20) is series.buffer
+
+
+class TestTieredHistory:
+    def record_seconds(self, history, seconds, pids=(1,)):
+        for t in range(seconds):
+            history.record([
+                ProcessStats(pid=pid, name="a", rss=1000 + t, vms=0, percent=1.0, timestamp=float(t))
+                for pid in pids
+            ])
+
+    def test_window_summary_reaches_past_raw_samples(self):
+        history = History(depth=10, tiers=((10, 100), (60, 100)))
+        self.record_seconds(history, 600)
+        
+        recent = history.summary(pid=1, window=5)
+        hour = history.summary(pid=1, window=3600)
+        
+        assert recent["samples"] == 6
+        assert recent["resolution"] == 1.0
+        assert hour["samples"] == 600
+        assert hour["min_rss"] == 1000
+        assert hour["avg_rss"] == pytest.approx(1299.5)
+        assert history.summary(window=3600)["samples"] == 600
+
+    def test_short_window_on_fresh_history_uses_raw_samples(self):
+        history = History()
+        self.record_seconds(history, 10)
+        
+        summary = history.summary(pid=1, window=2.5)
+        
+        assert summary["resolution"] == 1.0
+        assert summary["samples"] == 3
+        assert history.points(1, 2.5, 20) == [1007, 1008, 1009]
+
+    def test_points_while_recording(self):
+        history = History(depth=10, tiers=((1, 5), (2, 5)))
+        thread = threading.Thread(target=self.record_seconds, args=(history, 20000))
+        thread.start()
+        while thread.is_alive():
+            points = history.points(1, 4, 4, "max")
+            assert len(points) <= 4
+        thread.join()
+        
+        assert history.points(1, 4, 4, "max")[-1] == 20999
+
+    def test_points(self):
+        history = History(depth=10, tiers=((10, 100), (60, 100)))
+        self.record_seconds(history, 600)
+        
+        points = history.points(1, 600, 10, "max")
+        
+        assert len(points) == 10
+        assert points[-1] == 1599
+        assert history.points(None, 5, 10) == [1594, 1595, 1596, 1597, 1598, 1599]
+        assert history.points(99, 600, 10) == []
+
+    def test_budget_drops_least_recently_seen(self):
+        history = History(depth=10, tiers=((10, 100),), budget=0)
+        history.record([ProcessStats(pid=1, name="a", rss=1, vms=0, percent=0.0, timestamp=0.0)])
+        
+        assert history.get(1) is None
+        assert history.nbytes == history.total.nbytes
+
+    def test_budget_keeps_recent_processes(self):
+        history = History(depth=10, tiers=((10, 100),))
+        self.record_seconds(history, 30, pids=(1, 2))
+        history.budget = history.nbytes
+        history.record([ProcessStats(pid=2, name="a", rss=1, vms=0, percent=0.0, timestamp=40.0)])
+        
+        assert history.get(1) is None
+        assert history.get(2) is not None
+        assert history.nbytes <= history.budget
+
+    def test_week_fits_in_a_few_megabytes(self):
+        history = History()
+        series = Series(history.depth, history.tiers)
+        for t in range(0, 7 * 86400, 10):
+            series.append(float(t), t, 0, 0.0)
+        
+        assert series.nbytes < 256 * 1024
+        assert series.tier(0.0) is series.rollups[-1]
+
+
+class TestLinearTrend:
+    def test_slope(self):
+        trend = LinearTrend()
+        for t in range(10):
+            trend.add(1700000000.0 + t, 1000 + 50 * t)
+        
+        assert trend.slope == pytest.approx(50)
+
+    def test_slope_needs_two_times(self):
+        trend = LinearTrend()
+        trend.add(5.0, 100)
+        trend.add(5.0, 200)
+        
+        assert trend.slope == 0.0
@@ -0,0 +1,125 @@
+"""Tests for the incremental process index."""
+
+import re
+from mem_watch.index import ProcessIndex
+
+
+class FakeScan:
+    def __init__(self, table):
+        self.table = table
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        for pid, (ppid, name, create_time) in self.table.items():
+            yield pid, ppid, name, create_time, None
+
+
+class CountingPattern:
+    """Wrap a compiled regex and count search calls."""
+    
+    def __init__(self, pattern):
+        self.regex = re.compile(pattern)
+        self.searches = 0
+
+    def search(self, name):
+        self.searches += 1
+        return self.regex.search(name)
+
+
+class TestProcessIndex:
+    def test_refresh_builds_children_map(self):
+        scan = FakeScan({1: (0, "init", 1.0), 10: (1, "a", 2.0), 11: (10, "b", 3.0)})
+        index = ProcessIndex(scan)
+        
+        index.refresh()
+        
+        assert index.children[1] == [10]
+        assert index.children[10] == [11]
+        assert scan.calls == 1
+
+    def test_descendants(self):
+        scan = FakeScan({
+            1: (0, "init", 1.0),
+            10: (1, "a", 2.0),
+            11: (10, "b", 3.0),
+            12: (11, "c", 4.0),
+            20: (1, "d", 5.0)
+        })
+        index = ProcessIndex(scan)
+        index.refresh()
+        
+        assert sorted(index.descendants(10)) == [11, 12]
+        assert index.descendants(20) == []
+
+    def test_matching(self):
+        scan = FakeScan({1: (0, "python3", 1.0), 2: (0, "bash", 1.0)})
+        index = ProcessIndex(scan)
+        index.refresh()
+        
+        assert index.matching(re.compile("python")) == [1]
+
+    def test_only_new_processes_matched(self):
+        scan = FakeScan({1: (0, "python3", 1.0), 2: (0, "bash", 1.0)})
+        index = ProcessIndex(scan)
+        pattern = CountingPattern("python")
+        index.refresh()
+        index.matching(pattern)
+        assert pattern.searches == 2
+        
+        scan.table[3] = (0, "python2", 1.0)
+        index.refresh()
+        
+        assert pattern.searches == 3
+        assert index.matching(pattern) == [1, 3]
+
+    def test_exited_process_evicted(self):
+        scan = FakeScan({1: (0, "python3", 1.0), 2: (0, "python3", 1.0)})
+        index = ProcessIndex(scan)
+        pattern = re.compile("python")
+        index.refresh()
+        index.matching(pattern)
+        
+        del scan.table[2]
+        index.refresh()
+        
+        assert index.matching(pattern) == [1]
+        assert 2 not in index.entries
+
+    def test_reused_pid_rematched(self):
+        scan = FakeScan({1: (0, "python3", 1.0)})
+        index = ProcessIndex(scan)
+        pattern = re.compile("python")
+        index.refresh()
+        index.matching(pattern)
+        
+        scan.table[1] = (0, "bash", 9.0)
+        index.refresh()
+        
+        assert index.matching(pattern) == []
+        assert index.entries[1].name == "bash"
+
+    def test_exec_rematched(self):
+        scan = FakeScan({1: (0, "bash", 1.0)})
+        index = ProcessIndex(scan)
+        pattern = re.compile("python")
+        index.refresh()
+        assert index.matching(pattern) == []
+        
+        scan.table[1] = (0, "python3", 1.0)
+        index.refresh()
+        
+        assert index.matching(pattern) == [1]
+        assert index.entries[1].name == "python3"
+
+    def test_reparented_process(self):
+        scan = FakeScan({1: (0, "init", 1.0), 10: (1, "a", 2.0), 11: (10, "b", 3.0)})
+        index = ProcessIndex(scan)
+        index.refresh()
+        
+        del scan.table[10]
+        scan.table[11] = (1, "b", 3.0)
+        index.refresh()
+        
+        assert index.children[1] == [11]
+        assert index.entries[11].ppid == 1
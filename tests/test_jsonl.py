@@ -0,0 +1,93 @@
+"""Tests for headless JSON-lines output."""
+
+import io
+import json
+from mem_watch.alerts import Alert
+from mem_watch.events import ExitEvent
+from mem_watch.jsonl import JSONLinesWriter
+from mem_watch.monitor import ProcessStats
+from mem_watch.top import TopK
+
+
+def make_stat(pid=1, rss=1000):
+    return ProcessStats(pid=pid, name=f"p{pid}", rss=rss, vms=2000, percent=1.5, timestamp=10.0)
+
+
+class TestJSONLinesWriter:
+    def test_one_line_per_sample(self):
+        stream = io.StringIO()
+        writer = JSONLinesWriter(stream)
+        
+        writer.write(10.0, [make_stat(1), make_stat(2, rss=3000)])
+        writer.write(11.0, [make_stat(1)])
+        
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert writer.lines == 2
+        assert lines[0]["total_rss"] == 4000
+        assert lines[0]["processes"][1] == {"pid": 2, "name": "p2", "rss": 3000, "vms": 2000, "percent": 1.5}
+        assert lines[1]["timestamp"] == 11.0
+        assert "alerts" not in lines[1]
+
+    def test_details_only_when_sampled(self):
+        stream = io.StringIO()
+        stat = make_stat()
+        stat.pss = 800
+        stat.detail_time = 7.5
+        
+        JSONLinesWriter(stream).write(10.0, [stat, make_stat(2)])
+        
+        processes = json.loads(stream.getvalue())["processes"]
+        assert (processes[0]["pss"], processes[0]["detail_time"]) == (800, 7.5)
+        assert "uss" not in processes[0]
+        assert "pss" not in processes[1]
+        assert "detail_time" not in processes[1]
+    
+    def test_group_detail_time_is_oldest_sample(self):
+        stream = io.StringIO()
+        stats = [make_stat(1), make_stat(2), make_stat(3, rss=10)]
+        for stat, detail_time in zip(stats, (8.0, 6.0)):
+            stat.name = "web"
+            stat.pss = 500
+            stat.detail_time = detail_time
+        
+        JSONLinesWriter(stream).write(10.0, TopK(group_by="name").select(stats))
+        
+        processes = json.loads(stream.getvalue())["processes"]
+        assert [(row["group"], row.get("detail_time")) for row in processes] == [("web", 6.0), ("p3", None)]
+
+    def test_group_rows_without_details(self):
+        stream = io.StringIO()
+        groups = TopK(group_by="name").select([make_stat(1), make_stat(2)])
+        
+        JSONLinesWriter(stream).write(10.0, groups)
+        
+        processes = json.loads(stream.getvalue())["processes"]
+        assert set(processes[0]) == {"group", "count", "rss", "vms", "percent"}
+        assert (processes[0]["group"], processes[0]["count"]) == ("p1", 1)
+
+    def test_alerts_exits_and_targets(self):
+        stream = io.StringIO()
+        stat = make_stat()
+        alert = Alert(pid=1, name="p1", current=1000, threshold=500, level="critical")
+        
+        JSONLinesWriter(stream).write(
+            10.0,
+            [stat],
+            [alert],
+            total_rss=5000,
+            groups=[("api", [stat])],
+            exits=[ExitEvent(make_stat(3), 9.5)],
+            missed=2,
+            dropped=3,
+            deferred=4
+        )
+        
+        line = json.loads(stream.getvalue())
+        assert line["total_rss"] == 5000
+        assert line["alerts"][0]["level"] == "critical"
+        assert line["alerts"][0]["value"] == 1000
+        assert line["exits"] == [{"pid": 3, "name": "p3", "timestamp": 9.5, "rss": 1000}]
+        assert line["targets"] == {"api": [1]}
+        assert line["missed"] == 2
+        assert line["dropped"] == 3
+        assert line["deferred"] == 4
@@ -0,0 +1,94 @@
+"""Tests for leak detection."""
+
+import pytest
+from mem_watch.leak import DecayedTrend, LeakDetector
+from mem_watch.monitor import ProcessStats
+
+MB = 1024 * 1024
+
+
+def stat(rss, pid=1, name="app", percent=None, create_time=1.0):
+    if percent is None:
+        percent = rss / (1024 * MB) * 100
+    return ProcessStats(pid=pid, name=name, rss=rss, vms=0, percent=percent, create_time=create_time)
+
+
+def run(detector, rss_at, seconds, step=10, **kwargs):
+    alerts = []
+    for t in range(0, seconds, step):
+        alerts = detector.check([stat(rss_at(t), **kwargs)], now=1000.0 + t)
+    return alerts
+
+
+class TestDecayedTrend:
+    def test_linear_slope(self):
+        trend = DecayedTrend(half_life=100)
+        for t in range(10):
+            trend.add(1e9 + t * 10, 5 + t * 20)
+        
+        assert trend.slope == pytest.approx(2.0)
+        assert trend.fitted(1e9 + 90) == pytest.approx(185)
+
+    def test_recent_samples_dominate(self):
+        trend = DecayedTrend(half_life=10)
+        for t in range(100):
+            trend.add(t, 0)
+        for t in range(100, 200):
+            trend.add(t, (t - 100) * 3.0)
+        
+        assert trend.slope == pytest.approx(3.0, rel=0.05)
+
+    def test_needs_two_times(self):
+        trend = DecayedTrend(half_life=10)
+        trend.add(1.0, 5)
+        trend.add(1.0, 7)
+        assert trend.slope == 0.0
+
+
+class TestLeakDetector:
+    def test_steady_growth_alerts_with_eta(self):
+        detector = LeakDetector(bucket=60, min_duration=600)
+        alerts = run(detector, lambda t: 100 * MB + t * 10 * 1024, 3600)
+        
+        assert len(alerts) == 1
+        alert = alerts[0]
+        assert alert.kind == "leak"
+        assert alert.current == pytest.approx(10 * 1024, rel=0.01)
+        expected = (1024 * MB - (100 * MB + 3590 * 10 * 1024)) / (10 * 1024)
+        assert alert.eta == pytest.approx(expected, rel=0.05)
+        assert alert.level == "warning"
+
+    def test_critical_when_limit_near(self):
+        detector = LeakDetector(limit=150 * MB, critical_eta=3600)
+        alerts = run(detector, lambda t: 100 * MB + t * 10 * 1024, 3600)
+        
+        assert alerts[0].level == "critical"
+
+    def test_flat_process_ignored(self):
+        detector = LeakDetector()
+        assert run(detector, lambda t: 100 * MB, 3600) == []
+
+    def test_gc_sawtooth_ignored(self):
+        # Heap grows 50MB over five minutes, then a collection frees it
+        detector = LeakDetector(bucket=600)
+        assert run(detector, lambda t: 100 * MB + (t % 300) * 170 * 1024, 7200) == []
+
+    def test_waits_for_min_duration(self):
+        detector = LeakDetector(min_duration=600)
+        assert run(detector, lambda t: 100 * MB + t * MB, 500) == []
+
+    def test_pid_reuse_resets(self):
+        detector = LeakDetector(min_duration=600)
+        run(detector, lambda t: 100 * MB + t * 10 * 1024, 3600)
+        
+        alerts = detector.check([stat(10 * MB, create_time=2.0)], now=5000.0)
+        
+        assert alerts == []
+        assert detector._states[1].trend.count == 0
+
+    def test_exited_process_forgotten(self):
+        detector = LeakDetector()
+        detector.check([stat(MB, pid=1), stat(MB, pid=2)], now=0.0)
+        detector.check([stat(MB, pid=2)], now=1.0)
+        
+        assert list(detector._states) == [2]
@@ -0,0 +1,145 @@
+"""Tests for the OpenMetrics endpoint."""
+
+import gzip
+import http.client
+import pytest
+from mem_watch.alerts import Alert
+from mem_watch.metrics import MetricsRenderer, MetricsServer, OPENMETRICS_TYPE, TEXT_TYPE
+from mem_watch.monitor import ProcessStats
+
+
+def make_stats():
+    return [
+        ProcessStats(pid=1, name="web", rss=1000, vms=2000, percent=1.5),
+        ProcessStats(pid=2, name='odd "name"', rss=3000, vms=4000, percent=2.5)
+    ]
+
+
+@pytest.fixture
+def server():
+    with MetricsServer("127.0.0.1", 0) as server:
+        yield server
+
+
+def get(server, path="/metrics", headers=None, method="GET"):
+    conn = http.client.HTTPConnection(*server.address, timeout=5)
+    try:
+        conn.request(method, path, headers=headers or {})
+        response = conn.getresponse()
+        return response, response.read()
+    finally:
+        conn.close()
+
+
+class TestMetricsRenderer:
+    def test_process_gauges(self):
+        body = MetricsRenderer().render(make_stats()).decode()
+        
+        assert 'mem_watch_process_rss_bytes{pid="1",name="web"} 1000' in body
+        assert 'mem_watch_process_vms_bytes{pid="2",name="odd \\"name\\""} 4000' in body
+        assert "mem_watch_processes 2" in body
+        assert body.endswith("# EOF\n")
+    
+    def test_detail_families_only_when_sampled(self):
+        stats = make_stats()
+        assert "pss" not in MetricsRenderer().render(stats).decode()
+        
+        stats[0].pss = 800
+        stats[0].detail_time = 7.5
+        body = MetricsRenderer().render(stats).decode()
+        
+        assert 'mem_watch_process_pss_bytes{pid="1",name="web"} 800' in body
+        assert 'pid="2",name="odd \\"name\\""} 800' not in body
+        assert 'mem_watch_process_detail_timestamp_seconds{pid="1",name="web"} 7.5' in body
+        assert body.count("mem_watch_process_detail_timestamp_seconds{") == 1
+    
+    def test_alert_labels(self):
+        alerts = [
+            Alert(pid=1, name="web", current=1000, threshold=500, level="critical"),
+            Alert(pid=2, name="db", current=10.0, threshold=0, level="warning", kind="leak")
+        ]
+        
+        body = MetricsRenderer().render(make_stats(), alerts).decode()
+        
+        assert 'mem_watch_alert_active{pid="1",name="web",level="critical",kind="threshold"} 1' in body
+        assert 'mem_watch_alert_value{pid="2",name="db",level="warning",kind="leak"} 10.0' in body
+    
+    def test_families_contiguous(self):
+        alerts = [Alert(pid=1, name="web", current=1000, threshold=500, level="warning")]
+        lines = MetricsRenderer().render(make_stats(), alerts).decode().splitlines()
+        
+        families = []
+        for line in lines:
+            if line.startswith("# TYPE"):
+                families.append(line.split()[2])
+            elif not line.startswith("#"):
+                assert line.startswith(families[-1])
+
+
+class TestMetricsServer:
+    def test_unavailable_before_first_sample(self, server):
+        response, _ = get(server)
+        
+        assert response.status == 503
+    
+    def test_serves_latest_payload(self, server):
+        server.update(make_stats(), timestamp=1700000000.0)
+        
+        response, body = get(server)
+        
+        assert response.status == 200
+        assert response.getheader("Content-Type") == TEXT_TYPE
+        assert b"mem_watch_last_sample_timestamp_seconds 1700000000.0" in body
+    
+    def test_openmetrics_content_type(self, server):
+        server.update(make_stats())
+        
+        response, _ = get(server, headers={"Accept": "application/openmetrics-text; version=1.0.0"})
+        
+        assert response.getheader("Content-Type") == OPENMETRICS_TYPE
+    
+    def test_gzip(self, server):
+        server.update(make_stats())
+        
+        response, body = get(server, headers={"Accept-Encoding": "gzip"})
+        
+        assert response.getheader("Content-Encoding") == "gzip"
+        assert gzip.decompress(body) == server._server.payload.body
+    
+    def test_conditional_request(self, server):
+        server.update(make_stats())
+        response, _ = get(server)
+        etag = response.getheader("ETag")
+        
+        response, body = get(server, headers={"If-None-Match": etag})
+        assert response.status == 304
+        assert body == b""
+        
+        server.update(make_stats()[:1])
+        response, _ = get(server, headers={"If-None-Match": etag})
+        assert response.status == 200
+    
+    def test_payload_rendered_once_per_update(self, server):
+        server.update(make_stats())
+        payload = server._server.payload
+        
+        get(server)
+        get(server)
+        
+        assert server._server.payload is payload
+    
+    def test_head(self, server):
+        server.update(make_stats())
+        
+        response, body = get(server, method="HEAD")
+        
+        assert response.status == 200
+        assert int(response.getheader("Content-Length")) > 0
+        assert body == b""
+    
+    def test_unknown_path(self, server):
+        server.update(make_stats())
+        
+        response, _ = get(server, path="/")
+        
+        assert response.status == 404
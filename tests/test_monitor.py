@@ -15,6 +15,13 @@ class TestProcessStats:
         assert stats.vms == 2048000
         assert stats.percent == 5.5
         assert stats.timestamp > 0
+    
+    def test_slotted(self):
+        stats = ProcessStats(pid=1, name="test", rss=1, vms=1, percent=0.0, timestamp=42.0)
+        assert stats.timestamp == 42.0
+        assert not hasattr(stats, "__dict__")
+        with pytest.raises(AttributeError):
+            stats.extra = 1
 
 
 class TestMemoryMonitor:
@@ -54,25 +61,45 @@ class TestMemoryMonitor:
             assert stats[0].name == "python3"
 
     def test_monitor_with_children(self):
-        with patch('psutil.Process') as mock_process:
+        with patch('psutil.process_iter') as mock_iter:
             child_proc = Mock()
             child_proc.pid = 5678
+            child_proc.info = {'ppid': 1234, 'name': 'child', 'create_time': 2.0}
             child_proc.name.return_value = "child"
             child_proc.memory_info.return_value = Mock(rss=512000, vms=1024000)
             child_proc.memory_percent.return_value = 2.5
             
             parent_proc = Mock()
             parent_proc.pid = 1234
+            parent_proc.info = {'ppid': 1, 'name': 'parent', 'create_time': 1.0}
             parent_proc.name.return_value = "parent"
             parent_proc.memory_info.return_value = Mock(rss=1024000, vms=2048000)
             parent_proc.memory_percent.return_value = 5.5
-            parent_proc.children.return_value = [child_proc]
-            mock_process.return_value = parent_proc
+            mock_iter.return_value = [parent_proc, child_proc]
             
             monitor = MemoryMonitor(pid=1234, include_children=True)
             stats = monitor.collect()
             
             assert len(stats) == 2
+            parent_proc.children.assert_not_called()
+
+    def test_monitor_name_pattern_with_children_deduplicated(self):
+        with patch('psutil.process_iter') as mock_iter:
+            procs = []
+            for pid, ppid, name in [(10, 1, 'python'), (11, 10, 'python'), (12, 11, 'sh')]:
+                proc = Mock()
+                proc.pid = pid
+                proc.info = {'ppid': ppid, 'name': name, 'create_time': 1.0}
+                proc.name.return_value = name
+                proc.memory_info.return_value = Mock(rss=1024, vms=2048)
+                proc.memory_percent.return_value = 0.1
+                procs.append(proc)
+            mock_iter.return_value = procs
+            
+            monitor = MemoryMonitor(name_pattern="python", include_children=True)
+            stats = monitor.collect()
+            
+            assert sorted(stat.pid for stat in stats) == [10, 11, 12]
 
     def test_monitor_no_such_process(self):
         with patch('psutil.Process') as mock_process:
@@ -121,3 +148,43 @@ class TestMemoryMonitor:
         monitor = MemoryMonitor(pid=1234)
         summary = monitor.get_summary()
         assert summary == {}
+
+    def test_history_size(self):
+        with patch('psutil.Process') as mock_process:
+            mock_proc = Mock()
+            mock_proc.pid = 1234
+            mock_proc.name.return_value = "test"
+            mock_proc.memory_info.return_value = Mock(rss=1024000, vms=2048000)
+            mock_proc.memory_percent.return_value = 5.5
+            mock_process.return_value = mock_proc
+            
+            monitor = MemoryMonitor(pid=1234, history_size=3)
+            for _ in range(5):
+                monitor.collect()
+            
+            assert len(monitor.history) == 3
+            assert monitor.get_summary(pid=1234)["samples"] == 5
+
+
+class TestAllProcesses:
+    def test_single_scan(self):
+        with patch('psutil.process_iter') as mock_iter, patch('psutil.virtual_memory') as mock_vm:
+            mock_vm.return_value = Mock(total=1000)
+            procs = []
+            for pid, rss in ((1, 100), (2, 250)):
+                proc = Mock()
+                proc.pid = pid
+                proc.info = {'name': f"p{pid}", 'memory_info': Mock(rss=rss, vms=rss * 2), 'create_time': 1.0}
+                procs.append(proc)
+            gone = Mock()
+            gone.pid = 3
+            gone.info = {'name': "gone", 'memory_info': None, 'create_time': None}
+            mock_iter.return_value = procs + [gone]
+            
+            monitor = MemoryMonitor(all_processes=True)
+            stats = monitor.collect(record=False)
+            
+            assert [(stat.pid, stat.rss, stat.percent) for stat in stats] == [(1, 100, 10.0), (2, 250, 25.0)]
+            assert len(monitor.history) == 0
+            mock_iter.assert_called_once()
+            procs[0].memory_info.assert_not_called()
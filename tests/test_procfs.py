@@ -0,0 +1,244 @@
+"""Tests for the direct /proc sampling backend."""
+
+import os
+import pytest
+from conftest import write_process
+from mem_watch.procfs import ProcfsSampler
+from mem_watch.monitor import MemoryMonitor
+
+PAGE = os.sysconf("SC_PAGE_SIZE")
+
+
+class TestProcfsSampler:
+    def test_sample_values(self, proc_root):
+        write_process(proc_root, 1234, "worker", rss_pages=100, vms_pages=300)
+        sampler = ProcfsSampler(str(proc_root))
+        
+        stats = sampler.sample([1234])
+        
+        assert len(stats) == 1
+        assert stats[0].pid == 1234
+        assert stats[0].name == "worker"
+        assert stats[0].rss == 100 * PAGE
+        assert stats[0].vms == 300 * PAGE
+        assert stats[0].percent == pytest.approx(100 * PAGE / (1000000 * 1024) * 100)
+        sampler.close()
+
+    def test_descriptor_reused_across_ticks(self, proc_root):
+        write_process(proc_root, 1234, "worker", rss_pages=100, vms_pages=300)
+        sampler = ProcfsSampler(str(proc_root))
+        
+        sampler.sample([1234])
+        fd = sampler._fds[1234]
+        write_process(proc_root, 1234, "renamed", rss_pages=200, vms_pages=300)
+        stats = sampler.sample([1234])
+        
+        assert sampler._fds[1234] == fd
+        assert stats[0].rss == 200 * PAGE
+        assert stats[0].name == "worker"
+        sampler.close()
+
+    def test_scan_refreshes_name_after_exec(self, proc_root):
+        write_process(proc_root, 1234, "bash", rss_pages=100, vms_pages=300)
+        sampler = ProcfsSampler(str(proc_root))
+        
+        sampler.sample([1234])
+        write_process(proc_root, 1234, "python3", rss_pages=100, vms_pages=300)
+        list(sampler.scan())
+        stats = sampler.sample([1234])
+        
+        assert stats[0].name == "python3"
+        assert sampler.identity(1234)[1] == "python3"
+        sampler.close()
+
+    def test_name_with_parentheses(self, proc_root):
+        write_process(proc_root, 1234, "odd (name)", rss_pages=1, vms_pages=1)
+        sampler = ProcfsSampler(str(proc_root))
+        
+        stats = sampler.sample([1234])
+        
+        assert stats[0].name == "odd (name)"
+        sampler.close()
+
+    def test_identity_create_time(self, proc_root):
+        write_process(proc_root, 1234, "worker", rss_pages=1, vms_pages=1, starttime=500)
+        sampler = ProcfsSampler(str(proc_root))
+        
+        sampler.sample([1234])
+        create_time, name = sampler.identity(1234)
+        
+        assert create_time == 1700000000 + 500 / os.sysconf("SC_CLK_TCK")
+        assert name == "worker"
+        sampler.close()
+
+    def test_missing_process_skipped(self, proc_root):
+        write_process(proc_root, 1234, "worker", rss_pages=1, vms_pages=1)
+        sampler = ProcfsSampler(str(proc_root))
+        
+        stats = sampler.sample([1234, 9999])
+        
+        assert [stat.pid for stat in stats] == [1234]
+        sampler.close()
+
+    def test_exited_process_forgotten(self, proc_root, monkeypatch):
+        write_process(proc_root, 1234, "worker", rss_pages=1, vms_pages=1)
+        sampler = ProcfsSampler(str(proc_root))
+        sampler.sample([1234])
+        dead_fd = sampler._fds[1234]
+        real_preadv = os.preadv
+        
+        def preadv(fd, buffers, offset):
+            if fd == dead_fd:
+                raise ProcessLookupError()
+            return real_preadv(fd, buffers, offset)
+        
+        monkeypatch.setattr(os, "preadv", preadv)
+        stats = sampler.sample([1234])
+        
+        assert stats == []
+        assert 1234 not in sampler._fds
+        sampler.close()
+
+    def test_unrequested_pids_closed(self, proc_root):
+        write_process(proc_root, 1, "a", rss_pages=1, vms_pages=1)
+        write_process(proc_root, 2, "b", rss_pages=1, vms_pages=1)
+        sampler = ProcfsSampler(str(proc_root))
+        
+        sampler.sample([1, 2])
+        sampler.sample([2])
+        
+        assert list(sampler._fds) == [2]
+        sampler.close()
+
+    def test_max_open_limit(self, proc_root):
+        write_process(proc_root, 1, "a", rss_pages=1, vms_pages=1)
+        write_process(proc_root, 2, "b", rss_pages=2, vms_pages=2)
+        sampler = ProcfsSampler(str(proc_root), max_open=1)
+        
+        stats = sampler.sample([1, 2])
+        
+        assert len(stats) == 2
+        assert len(sampler._fds) == 1
+        sampler.close()
+
+    def test_close(self, proc_root):
+        write_process(proc_root, 1234, "worker", rss_pages=1, vms_pages=1)
+        sampler = ProcfsSampler(str(proc_root))
+        sampler.sample([1234])
+        
+        sampler.close()
+        
+        assert sampler._fds == {}
+
+    def test_scan(self, proc_root):
+        write_process(proc_root, 10, "parent", rss_pages=1, vms_pages=1, ppid=1)
+        write_process(proc_root, 11, "child", rss_pages=1, vms_pages=1, ppid=10)
+        sampler = ProcfsSampler(str(proc_root))
+        
+        entries = sorted(sampler.scan())
+        
+        assert [(pid, ppid, name) for pid, ppid, name, _, _ in entries] == [
+            (10, 1, "parent"),
+            (11, 10, "child")
+        ]
+        sampler.close()
+
+
+class TestMonitorProcfsBackend:
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            MemoryMonitor(pid=1234, backend="bogus")
+
+    @pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="requires Linux /proc")
+    def test_collect_uses_sampler(self):
+        monitor = MemoryMonitor(pid=os.getpid(), backend="procfs")
+        stats = monitor.collect()
+        
+        assert len(stats) == 1
+        assert stats[0].pid == os.getpid()
+        assert stats[0].rss > 0
+        monitor.close()
+
+    def test_collect_children_from_fake_root(self, proc_root):
+        write_process(proc_root, 10, "parent", rss_pages=1, vms_pages=1, ppid=1)
+        write_process(proc_root, 11, "child", rss_pages=2, vms_pages=2, ppid=10)
+        write_process(proc_root, 12, "other", rss_pages=3, vms_pages=3, ppid=1)
+        monitor = MemoryMonitor(pid=10, include_children=True, backend="procfs", proc_root=str(proc_root))
+        
+        stats = monitor.collect()
+        
+        assert sorted(stat.pid for stat in stats) == [10, 11]
+        monitor.close()
+
+    def test_collect_all_processes(self, proc_root):
+        write_process(proc_root, 10, "parent", rss_pages=1, vms_pages=1)
+        write_process(proc_root, 12, "other", rss_pages=3, vms_pages=3)
+        monitor = MemoryMonitor(all_processes=True, backend="procfs", proc_root=str(proc_root))
+        
+        stats = monitor.collect()
+        
+        assert sorted(stat.pid for stat in stats) == [10, 12]
+        assert stats[0].create_time is not None
+        monitor.close()
+
+    def test_username(self, proc_root):
+        import pwd
+        write_process(proc_root, 10, "parent", rss_pages=1, vms_pages=1)
+        monitor = MemoryMonitor(all_processes=True, backend="procfs", proc_root=str(proc_root))
+        
+        assert monitor.username(10) == pwd.getpwuid(os.getuid()).pw_name
+        assert monitor.username(99) == "?"
+        monitor.close()
+
+    def test_adaptive_schedule_carries_samples(self, proc_root):
+        from mem_watch.scheduler import AdaptiveSchedule
+        write_process(proc_root, 10, "steady", rss_pages=100, vms_pages=100)
+        write_process(proc_root, 11, "busy", rss_pages=100, vms_pages=100)
+        schedule = AdaptiveSchedule(60.0, 600.0)
+        monitor = MemoryMonitor(name_pattern=".", backend="procfs", proc_root=str(proc_root), schedule=schedule)
+        monitor.collect()
+        schedule._rates[11].next_due = 0.0
+        write_process(proc_root, 10, "steady", rss_pages=500, vms_pages=100)
+        write_process(proc_root, 11, "busy", rss_pages=300, vms_pages=100)
+        
+        stats = monitor.collect()
+        
+        assert [(stat.pid, stat.rss // PAGE) for stat in stats] == [(10, 100), (11, 300)]
+        assert monitor.history.get(10).rss.count == 1
+        assert monitor.history.get(11).rss.count == 2
+        assert set(monitor._sampler._fds) == {10, 11}
+        monitor.close()
+
+    def test_targets_share_one_scan(self, proc_root):
+        from mem_watch.monitor import Target
+        write_process(proc_root, 10, "parent", rss_pages=1, vms_pages=1)
+        write_process(proc_root, 11, "child", rss_pages=2, vms_pages=2, ppid=10)
+        write_process(proc_root, 12, "other", rss_pages=3, vms_pages=3)
+        family = Target(pid=10, include_children=True)
+        named = Target(name_pattern="child|other")
+        monitor = MemoryMonitor(backend="procfs", proc_root=str(proc_root), targets=[family, named])
+        
+        stats = monitor.collect()
+        groups = monitor.by_target(stats)
+        
+        assert sorted(stat.pid for stat in stats) == [10, 11, 12]
+        assert [stat.pid for stat in groups[family]] == [10, 11]
+        assert [stat.pid for stat in groups[named]] == [11, 12]
+        assert groups[family][1] is groups[named][0]
+        monitor.close()
+
+    def test_profiler_counts_reads(self, proc_root):
+        from mem_watch.profiling import Profiler
+        write_process(proc_root, 10, "parent", rss_pages=1, vms_pages=1)
+        write_process(proc_root, 12, "other", rss_pages=3, vms_pages=3)
+        profiler = Profiler()
+        monitor = MemoryMonitor(all_processes=True, backend="procfs", proc_root=str(proc_root), profiler=profiler)
+        
+        monitor.collect()
+        profiler.tick()
+        
+        assert profiler.last_tick["processes_sampled"] == 2
+        assert profiler.last_tick["processes_scanned"] == 2
+        assert profiler.last_tick["proc_reads"] >= 2
+        assert {"collect", "enumerate", "history"} <= set(profiler.phases)
+        monitor.close()
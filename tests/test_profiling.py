@@ -0,0 +1,138 @@
+"""Tests for self-overhead instrumentation."""
+
+import json
+import threading
+import pytest
+from mem_watch.profiling import NULL_PROFILER, PhaseStats, Profiler
+
+
+class TestPhaseStats:
+    def test_empty(self):
+        stats = PhaseStats()
+        
+        assert stats.percentile(50) == 0.0
+        assert stats.summary()["mean_ms"] == 0.0
+    
+    def test_percentiles_bucketed(self):
+        stats = PhaseStats()
+        for _ in range(99):
+            stats.add(0.000010)
+        stats.add(0.010)
+        
+        # 10us falls in the 8-16us bucket
+        assert stats.percentile(50) == pytest.approx(16e-6)
+        assert stats.percentile(99) == pytest.approx(16e-6)
+        assert stats.percentile(100) == pytest.approx(0.010)
+        assert stats.max == pytest.approx(0.010)
+    
+    def test_percentile_capped_at_max(self):
+        stats = PhaseStats()
+        stats.add(0.000100)
+        
+        assert stats.percentile(50) == pytest.approx(0.000100)
+    
+    def test_summary_in_milliseconds(self):
+        stats = PhaseStats()
+        stats.add(0.002)
+        stats.add(0.004)
+        
+        summary = stats.summary()
+        
+        assert summary["count"] == 2
+        assert summary["mean_ms"] == pytest.approx(3.0)
+        assert summary["max_ms"] == pytest.approx(4.0)
+
+
+class TestProfiler:
+    def test_phase_records_time(self):
+        profiler = Profiler()
+        
+        with profiler.phase("collect"):
+            pass
+        with profiler.phase("collect"):
+            pass
+        
+        assert profiler.phases["collect"].count == 2
+    
+    def test_tick_closes_counters(self):
+        profiler = Profiler()
+        profiler.count("proc_reads", 3)
+        profiler.count("proc_reads", 2)
+        profiler.tick()
+        profiler.count("proc_reads", 1)
+        profiler.tick()
+        
+        assert profiler.last_tick == {"proc_reads": 1}
+        assert profiler.totals == {"proc_reads": 6}
+        assert profiler.summary()["counters_per_tick"] == {"proc_reads": 3.0}
+    
+    def test_counts_from_threads_not_lost(self):
+        profiler = Profiler()
+        
+        def work():
+            for _ in range(5000):
+                profiler.count("proc_reads")
+                with profiler.phase("collect"):
+                    pass
+        
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            profiler.tick()
+        for thread in threads:
+            thread.join()
+        profiler.tick()
+        
+        assert profiler.totals["proc_reads"] == 20000
+        assert profiler.phases["collect"].count == 20000
+    
+    def test_tick_samples_own_usage(self):
+        profiler = Profiler()
+        
+        profiler.tick()
+        
+        assert profiler.rss > 0
+        assert profiler.cpu_seconds > 0
+    
+    def test_dump_to_file(self, tmp_path):
+        profiler = Profiler()
+        with profiler.phase("render"):
+            pass
+        profiler.tick()
+        path = tmp_path / "profile.json"
+        
+        profiler.dump(str(path))
+        
+        data = json.loads(path.read_text())
+        assert data["ticks"] == 1
+        assert data["phases"]["render"]["count"] == 1
+    
+    def test_dump_to_stderr(self, capsys):
+        Profiler().dump("-")
+        
+        assert json.loads(capsys.readouterr().err)["ticks"] == 0
+    
+    def test_footer(self):
+        profiler = Profiler()
+        with profiler.phase("collect"):
+            pass
+        profiler.count("proc_reads", 4)
+        profiler.tick()
+        
+        lines = profiler.footer()
+        
+        assert lines[0].startswith("p50/p95: collect ")
+        assert lines[1] == "per tick: proc_reads 4"
+        assert lines[2].startswith("self: RSS ")
+
+
+class TestNullProfiler:
+    def test_noop(self):
+        with NULL_PROFILER.phase("collect"):
+            pass
+        NULL_PROFILER.count("proc_reads", 3)
+        NULL_PROFILER.tick()
+        
+        assert not NULL_PROFILER.enabled
+        assert not hasattr(NULL_PROFILER, "phases")
@@ -0,0 +1,137 @@
+"""Tests for the sampling schedules."""
+
+import time
+import pytest
+from mem_watch.monitor import ProcessStats
+from mem_watch.scheduler import AdaptiveSchedule, FixedRateSampler
+
+
+class TestFixedRateSampler:
+    def test_duration_bounds_ticks(self):
+        sampler = FixedRateSampler(lambda: [1], interval=0.01, duration=0.05)
+        sampler.start()
+        
+        ticks = list(sampler.ticks())
+        sampler.stop()
+        
+        assert len(ticks) == 6
+        assert [tick.number for tick in ticks] == list(range(6))
+        assert all(tick.stats == [1] for tick in ticks)
+
+    def test_deadlines_do_not_drift(self):
+        sampler = FixedRateSampler(lambda: [], interval=0.02, duration=0.2)
+        sampler.start()
+        
+        ticks = list(sampler.ticks())
+        sampler.stop()
+        
+        elapsed = ticks[-1].timestamp - ticks[0].timestamp
+        assert elapsed == pytest.approx(0.02 * (len(ticks) - 1), abs=0.015)
+
+    def test_slow_collect_counts_missed_deadlines(self):
+        def slow_collect():
+            time.sleep(0.05)
+            return []
+        
+        sampler = FixedRateSampler(slow_collect, interval=0.02, duration=0.2)
+        sampler.start()
+        
+        ticks = list(sampler.ticks())
+        sampler.stop()
+        
+        assert sampler.missed > 0
+        assert len(ticks) < 11
+
+    def test_slow_consumer_does_not_delay_sampling(self):
+        sampler = FixedRateSampler(lambda: [], interval=0.01, duration=0.1, backlog=2)
+        sampler.start()
+        time.sleep(0.2)
+        
+        ticks = list(sampler.ticks())
+        sampler.stop()
+        
+        assert sampler.dropped > 0
+        assert ticks[-1].number == 10
+
+    def test_collect_error_propagates(self):
+        def failing_collect():
+            raise RuntimeError("boom")
+        
+        sampler = FixedRateSampler(failing_collect, interval=0.01)
+        sampler.start()
+        
+        with pytest.raises(RuntimeError):
+            list(sampler.ticks())
+        sampler.stop()
+
+    def test_stop(self):
+        sampler = FixedRateSampler(lambda: [], interval=10)
+        sampler.start()
+        next(sampler.ticks())
+        
+        sampler.stop()
+        
+        assert not sampler.is_alive()
+
+    def test_invalid_interval(self):
+        with pytest.raises(ValueError):
+            FixedRateSampler(lambda: [], interval=0)
+
+
+def sample(pid, rss):
+    return ProcessStats(pid=pid, name=f"p{pid}", rss=rss, vms=0, percent=0.0, create_time=1.0)
+
+
+class TestAdaptiveSchedule:
+    def test_new_processes_due(self):
+        schedule = AdaptiveSchedule(1.0, 8.0)
+        assert schedule.due([1, 2], now=0.0) == [1, 2]
+
+    def test_stable_process_backs_off(self):
+        schedule = AdaptiveSchedule(1.0, 4.0)
+        intervals = []
+        now = 0.0
+        for _ in range(5):
+            assert schedule.due([1], now) == [1]
+            schedule.observe([sample(1, 1000)], now)
+            intervals.append(schedule.interval(1))
+            now += schedule.interval(1)
+        
+        assert intervals == [1.0, 2.0, 4.0, 4.0, 4.0]
+
+    def test_not_due_between_samples(self):
+        schedule = AdaptiveSchedule(1.0, 4.0)
+        for now in (0.0, 1.0):
+            schedule.due([1], now)
+            schedule.observe([sample(1, 1000)], now)
+        
+        assert schedule.due([1], 2.0) == []
+        assert schedule.due([1], 3.0) == [1]
+
+    def test_fast_change_speeds_up(self):
+        schedule = AdaptiveSchedule(1.0, 8.0, change=0.05)
+        for now in (0.0, 1.0, 3.0, 7.0):
+            schedule.observe([sample(1, 1000)], now)
+        assert schedule.interval(1) == 8.0
+        
+        schedule.observe([sample(1, 2000)], 15.0)
+        assert schedule.interval(1) == 1.0
+
+    def test_near_threshold_stays_fast(self):
+        schedule = AdaptiveSchedule(1.0, 8.0, near=0.8, proximity=lambda stat: stat.rss / 1000)
+        for now in range(5):
+            schedule.observe([sample(1, 900), sample(2, 100)], float(now))
+        
+        assert schedule.interval(1) == 1.0
+        assert schedule.interval(2) == 8.0
+
+    def test_exited_processes_forgotten(self):
+        schedule = AdaptiveSchedule(1.0, 8.0)
+        schedule.observe([sample(1, 1), sample(2, 1)], 0.0)
+        schedule.due([2], 1.0)
+        
+        assert schedule.interval(1) is None
+
+    def test_invalid_bounds(self):
+        with pytest.raises(ValueError):
+            AdaptiveSchedule(2.0, 1.0)
@@ -0,0 +1,150 @@
+"""Tests for tiered PSS/USS/swap sampling."""
+
+import pytest
+from mem_watch.monitor import MemoryMonitor, ProcessStats
+from mem_watch.smaps import DetailSampler, read_smaps_rollup
+
+ROLLUP = """55e82a560000-7ffe9a402000 ---p 00000000 00:00 0                          [rollup]
+Rss:                1408 kB
+Pss:                 408 kB
+Shared_Clean:       1268 kB
+Private_Clean:        40 kB
+Private_Dirty:       100 kB
+Swap:                 12 kB
+SwapPss:               6 kB
+"""
+
+
+def stat(pid, create_time=1.0, timestamp=100.0):
+    result = ProcessStats(pid=pid, name=f"p{pid}", rss=1000, vms=1000, percent=1.0, create_time=create_time)
+    result.timestamp = timestamp
+    return result
+
+
+class FakeReader:
+    def __init__(self):
+        self.calls = []
+    
+    def __call__(self, proc_root, pid):
+        self.calls.append(pid)
+        return pid * 10, pid, 0
+
+
+class FakeTimer:
+    """Advances by ``step`` on every call."""
+    
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+    
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+class TestReadSmapsRollup:
+    def test_parse(self, tmp_path):
+        (tmp_path / "42").mkdir()
+        (tmp_path / "42" / "smaps_rollup").write_text(ROLLUP)
+        
+        assert read_smaps_rollup(str(tmp_path), 42) == (408 * 1024, 140 * 1024, 12 * 1024)
+
+    def test_missing(self, tmp_path):
+        with pytest.raises(OSError):
+            read_smaps_rollup(str(tmp_path), 42)
+
+
+class TestDetailSampler:
+    def test_values_attached_with_freshness(self):
+        sampler = DetailSampler(interval=30, reader=FakeReader())
+        stats = [stat(1), stat(2)]
+        
+        sampler.update(stats, now=100.0)
+        
+        assert (stats[0].pss, stats[0].uss, stats[0].swap) == (10, 1, 0)
+        assert stats[1].detail_time == 100.0
+
+    def test_refresh_only_when_stale(self):
+        reader = FakeReader()
+        sampler = DetailSampler(interval=30, reader=reader)
+        sampler.update([stat(1)], now=100.0)
+        
+        later = [stat(1)]
+        sampler.update(later, now=110.0)
+        assert reader.calls == [1]
+        assert later[0].pss == 10
+        assert later[0].detail_time == 100.0
+        
+        sampler.update([stat(1)], now=130.0)
+        assert reader.calls == [1, 1]
+
+    def test_budget_defers_reads(self):
+        reader = FakeReader()
+        sampler = DetailSampler(interval=30, budget=2.5, reader=reader, timer=FakeTimer(1.0))
+        stats = [stat(pid) for pid in range(1, 6)]
+        
+        sampler.update(stats, now=100.0)
+        
+        assert reader.calls == [1, 2]
+        assert sampler.deferred == 3
+        assert stats[4].pss is None
+
+    def test_priority_first(self):
+        reader = FakeReader()
+        sampler = DetailSampler(interval=30, budget=1.5, reader=reader, timer=FakeTimer(1.0))
+        sampler.priority = {3}
+        
+        sampler.update([stat(1), stat(2), stat(3)], now=100.0)
+        
+        assert reader.calls == [3]
+
+    def test_priority_respects_interval(self):
+        reader = FakeReader()
+        sampler = DetailSampler(interval=30, reader=reader)
+        sampler.priority = {1}
+        sampler.update([stat(1)], now=100.0)
+        
+        sampler.update([stat(1)], now=110.0)
+        assert reader.calls == [1]
+        
+        sampler.update([stat(1)], now=130.0)
+        assert reader.calls == [1, 1]
+
+    def test_stalest_first(self):
+        reader = FakeReader()
+        sampler = DetailSampler(interval=10, reader=reader)
+        sampler.update([stat(1)], now=100.0)
+        sampler.update([stat(1), stat(2)], now=105.0)
+        reader.calls.clear()
+        
+        sampler.budget = 0.0
+        sampler.update([stat(1), stat(2)], now=120.0)
+        assert reader.calls == []
+        
+        sampler.budget = 1.5
+        sampler._timer = FakeTimer(1.0)
+        sampler.update([stat(1), stat(2)], now=120.0)
+        assert reader.calls == [1]
+
+    def test_pid_reuse_drops_cached_values(self):
+        sampler = DetailSampler(interval=30, budget=0.0, reader=FakeReader())
+        sampler._cache[1] = (1.0, 5, 5, 5, 90.0)
+        reused = [stat(1, create_time=2.0)]
+        
+        sampler.update(reused, now=100.0)
+        
+        assert reused[0].pss is None
+        assert sampler._cache == {}
+
+
+class TestMonitorDetails:
+    def test_collect_attaches_details(self, tmp_path):
+        import os
+        if not os.path.exists(f"/proc/{os.getpid()}/smaps_rollup"):
+            pytest.skip("requires /proc/<pid>/smaps_rollup")
+        monitor = MemoryMonitor(pid=os.getpid(), detail_interval=30)
+        
+        (result,) = monitor.collect()
+        
+        assert result.pss > 0
+        assert result.detail_time is not None
@@ -0,0 +1,82 @@
+"""Tests for columnar tick snapshots."""
+
+import tracemalloc
+from mem_watch.monitor import ProcessStats
+from mem_watch.snapshot import Snapshot
+
+
+def make_stats(count=3):
+    return [
+        ProcessStats(pid=pid, name=f"p{pid}", rss=pid * 1000, vms=pid * 2000, percent=pid / 10, create_time=pid + 0.5)
+        for pid in range(1, count + 1)
+    ]
+
+
+class TestSnapshot:
+    def test_round_trip(self):
+        snapshot = Snapshot.from_stats(make_stats(), timestamp=100.0)
+        
+        stat = snapshot[1]
+        
+        assert len(snapshot) == 3
+        assert (stat.pid, stat.name, stat.rss, stat.vms, stat.create_time) == (2, "p2", 2000, 4000, 2.5)
+        assert stat.percent == 0.2
+        assert stat.timestamp == 100.0
+    
+    def test_unknown_create_time(self):
+        snapshot = Snapshot(1.0)
+        snapshot.append(1, "a", 10, 20, 0.1)
+        
+        assert snapshot[0].create_time is None
+    
+    def test_sequence_api(self):
+        snapshot = Snapshot.from_stats(make_stats(), timestamp=100.0)
+        
+        assert [stat.pid for stat in snapshot] == [1, 2, 3]
+        assert snapshot[-1].pid == 3
+        assert sum(stat.rss for stat in snapshot) == 6000
+    
+    def test_slice(self):
+        snapshot = Snapshot.from_stats(make_stats(), timestamp=100.0)
+        
+        head = snapshot[:2]
+        
+        assert isinstance(head, Snapshot)
+        assert list(head.pids) == [1, 2]
+        assert head.timestamp == 100.0
+    
+    def test_columns_and_rows(self):
+        snapshot = Snapshot.from_stats(make_stats(), timestamp=100.0)
+        
+        assert list(snapshot.rss) == [1000, 2000, 3000]
+        assert list(snapshot.rows())[0] == (1, "p1", 1000, 2000, 0.1)
+    
+    def test_select(self):
+        snapshot = Snapshot.from_stats(make_stats(), timestamp=100.0)
+        
+        selected = snapshot.select({1, 3})
+        
+        assert list(selected.pids) == [1, 3]
+        assert selected.names == ["p1", "p3"]
+        assert selected[1].create_time == 3.5
+    
+    def test_smaller_than_objects(self):
+        stats = make_stats(2000)
+        
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            snapshot = Snapshot.from_stats(stats, timestamp=1.0)
+            columnar = tracemalloc.get_traced_memory()[0] - before
+            
+            before = tracemalloc.get_traced_memory()[0]
+            copies = [
+                ProcessStats(stat.pid, stat.name, stat.rss, stat.vms, stat.percent, stat.create_time, 1.0)
+                for stat in stats
+            ]
+            objects = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        
+        assert len(snapshot) == len(copies)
+        assert columnar * 2 < objects
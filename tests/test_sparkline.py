@@ -0,0 +1,55 @@
+"""Tests for incremental sparklines."""
+
+import random
+from mem_watch.sparkline import GLYPHS, RollingMinMax, Sparkline
+from mem_watch.display import Display
+
+
+class TestRollingMinMax:
+    def test_matches_window_scan(self):
+        rng = random.Random(42)
+        window = RollingMinMax(5)
+        values = []
+        for _ in range(200):
+            value = rng.randint(0, 100)
+            values.append(value)
+            window.push(value)
+            assert window.min == min(values[-5:])
+            assert window.max == max(values[-5:])
+
+    def test_empty(self):
+        window = RollingMinMax(3)
+        assert window.min is None
+        assert window.max is None
+
+
+class TestSparkline:
+    def test_matches_full_rebuild(self):
+        rng = random.Random(7)
+        display = Display()
+        spark = Sparkline(width=10)
+        values = []
+        for _ in range(100):
+            value = rng.randint(0, 1000)
+            values.append(value)
+            spark.push(value)
+            assert spark.render() == display._create_graph(values[-10:], width=10)
+
+    def test_width_bounded(self):
+        spark = Sparkline(width=4)
+        for value in range(10):
+            spark.push(value)
+        
+        assert len(spark.render()) == 4
+        assert spark.peak == 9
+        assert spark.last == 9
+
+    def test_constant_values(self):
+        spark = Sparkline(width=4)
+        for _ in range(3):
+            spark.push(100)
+        
+        assert spark.render() == GLYPHS[0] * 3
+
+    def test_empty(self):
+        assert Sparkline().render() == ""
@@ -0,0 +1,130 @@
+"""Tests for the SQLite export backend."""
+
+import sqlite3
+import pytest
+from mem_watch.store import SQLiteExporter, query
+from mem_watch.export import create_exporter
+from mem_watch.monitor import ProcessStats
+from mem_watch.cli import main
+
+
+def fill(path, ticks=100):
+    with SQLiteExporter(str(path), batch_ticks=7) as exporter:
+        for tick in range(ticks):
+            exporter.write([
+                ProcessStats(pid=1, name="worker", rss=(tick + 1) * 1000, vms=0, percent=1.0),
+                ProcessStats(pid=2, name="cache", rss=500, vms=0, percent=0.5)
+            ], timestamp=1000.0 + tick)
+
+
+class TestSQLiteExporter:
+    def test_rows_written(self, tmp_path):
+        path = tmp_path / "samples.db"
+        fill(path, ticks=10)
+        
+        conn = sqlite3.connect(str(path))
+        assert conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0] == 20
+        conn.close()
+
+    def test_batched_transactions(self, tmp_path):
+        path = tmp_path / "samples.db"
+        exporter = SQLiteExporter(str(path), batch_ticks=3)
+        stats = [ProcessStats(pid=1, name="a", rss=1, vms=1, percent=0.0)]
+        
+        exporter.write(stats)
+        exporter.write(stats)
+        conn = sqlite3.connect(str(path))
+        assert conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0] == 0
+        exporter.write(stats)
+        assert conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0] == 3
+        conn.close()
+        exporter.close()
+
+    def test_wal_mode_and_indexes(self, tmp_path):
+        path = tmp_path / "samples.db"
+        fill(path, ticks=1)
+        
+        conn = sqlite3.connect(str(path))
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(samples)")}
+        assert {"idx_samples_pid_time", "idx_samples_name_time"} <= indexes
+        conn.close()
+
+    def test_create_exporter_by_extension(self, tmp_path):
+        exporter = create_exporter(str(tmp_path / "samples.db"))
+        assert isinstance(exporter, SQLiteExporter)
+        exporter.close()
+
+    def test_detail_columns(self, tmp_path):
+        path = tmp_path / "samples.db"
+        stat = ProcessStats(pid=1, name="a", rss=100, vms=100, percent=0.0)
+        stat.pss, stat.uss, stat.swap, stat.detail_time = 60, 40, 0, 990.0
+        with SQLiteExporter(str(path)) as exporter:
+            exporter.write([stat], timestamp=1000.0)
+        
+        conn = sqlite3.connect(str(path))
+        assert conn.execute("SELECT pss, uss, swap, detail_time FROM samples").fetchone() == (60, 40, 0, 990.0)
+        conn.close()
+
+    def test_old_database_migrated(self, tmp_path):
+        path = tmp_path / "samples.db"
+        conn = sqlite3.connect(str(path))
+        conn.execute(
+            "CREATE TABLE samples (timestamp REAL NOT NULL, pid INTEGER NOT NULL, name TEXT NOT NULL, "
+            "rss INTEGER NOT NULL, vms INTEGER NOT NULL, percent REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO samples VALUES (1.0, 1, 'a', 1, 1, 0.0)")
+        conn.commit()
+        conn.close()
+        
+        fill(path, ticks=1)
+        
+        assert [row["samples"] for row in query(str(path), pid=1)] == [1, 1]
+
+
+class TestQuery:
+    def test_per_process_statistics(self, tmp_path):
+        path = tmp_path / "samples.db"
+        fill(path)
+        
+        rows = query(str(path))
+        
+        assert [row["name"] for row in rows] == ["worker", "cache"]
+        worker = rows[0]
+        assert worker["samples"] == 100
+        assert worker["min_rss"] == 1000
+        assert worker["max_rss"] == 100000
+        assert worker["avg_rss"] == pytest.approx(50500)
+        assert worker["p50_rss"] == 50000
+        assert worker["p99_rss"] == 99000
+
+    def test_time_window(self, tmp_path):
+        path = tmp_path / "samples.db"
+        fill(path)
+        
+        rows = query(str(path), since=1010.0, until=1019.0, pid=1)
+        
+        assert len(rows) == 1
+        assert rows[0]["samples"] == 10
+        assert rows[0]["min_rss"] == 11000
+        assert rows[0]["p50_rss"] == 15000
+
+    def test_name_filter(self, tmp_path):
+        path = tmp_path / "samples.db"
+        fill(path)
+        
+        rows = query(str(path), name="cache")
+        
+        assert [row["pid"] for row in rows] == [2]
+
+    def test_missing_database(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            query(str(tmp_path / "missing.db"))
+
+    def test_query_command(self, tmp_path, capsys):
+        path = tmp_path / "samples.db"
+        fill(path)
+        
+        main(["query", str(path), "--name", "worker"])
+        
+        assert "worker" in capsys.readouterr().out
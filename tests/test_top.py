@@ -0,0 +1,102 @@
+"""Tests for top-K selection."""
+
+import pytest
+from mem_watch.monitor import ProcessStats
+from mem_watch.top import GROUP_ID_BASE, TopK
+
+
+def stat(pid, rss, name=None, timestamp=0.0):
+    result = ProcessStats(pid=pid, name=name or f"p{pid}", rss=rss, vms=rss, percent=rss / 100, create_time=1.0)
+    result.timestamp = timestamp
+    return result
+
+
+class TestTopK:
+    def test_largest_by_rss(self):
+        top = TopK(k=3)
+        stats = [stat(pid, rss) for pid, rss in enumerate([5, 90, 10, 70, 30, 80])]
+        
+        rows = top.select(stats)
+        
+        assert [row.rss for row in rows] == [90, 80, 70]
+        assert top.count == 6
+        assert top.total == 285
+
+    def test_fewer_than_k(self):
+        assert len(TopK(k=10).select([stat(1, 5), stat(2, 6)])) == 2
+
+    def test_sort_by_growth(self):
+        top = TopK(k=1, sort="growth", smoothing=1.0)
+        top.select([stat(1, 1000, timestamp=0.0), stat(2, 10, timestamp=0.0)])
+        
+        rows = top.select([stat(1, 1000, timestamp=1.0), stat(2, 50, timestamp=1.0)])
+        
+        assert [row.pid for row in rows] == [2]
+
+    def test_growth_resets_on_pid_reuse(self):
+        top = TopK(sort="growth", smoothing=1.0)
+        top.select([stat(1, 10, timestamp=0.0)])
+        reused = stat(1, 5000, timestamp=1.0)
+        reused.create_time = 2.0
+        top.select([reused])
+        
+        assert top._growth[(1, 2.0)][2] == 0.0
+
+    def test_group_by_name(self):
+        top = TopK(k=2, group_by="name")
+        stats = [stat(1, 10, "web"), stat(2, 30, "web"), stat(3, 25, "db"), stat(4, 1, "cron")]
+        
+        rows = top.select(stats)
+        
+        assert [(row.name, row.count, row.rss, row.leader) for row in rows] == [
+            ("web", 2, 40, 2), ("db", 1, 25, 3)
+        ]
+    
+    def test_group_ids_stable_and_synthetic(self):
+        top = TopK(group_by="name")
+        first = {row.name: row.pid for row in top.select([stat(1, 10, "web"), stat(2, 30, "web"), stat(3, 25, "db")])}
+        rows = top.select([stat(1, 50, "web"), stat(2, 30, "web"), stat(3, 25, "db")])
+        
+        assert {row.name: row.pid for row in rows} == first
+        assert [row.leader for row in rows] == [1, 3]
+        assert len(set(first.values())) == 2
+        assert all(pid <= GROUP_ID_BASE for pid in first.values())
+
+    def test_group_pss_only_from_detail_samples(self):
+        sampled = stat(2, 30, "web")
+        sampled.pss = 12
+        
+        rows = TopK(group_by="name").select([stat(1, 10, "web"), sampled, stat(3, 25, "db")])
+        
+        assert [(row.name, row.pss) for row in rows] == [("web", 22), ("db", None)]
+
+    def test_group_by_user_caches_lookups(self):
+        calls = []
+        
+        def user_of(pid):
+            calls.append(pid)
+            return "root" if pid < 3 else "app"
+        
+        top = TopK(group_by="user", user_of=user_of)
+        stats = [stat(1, 10), stat(2, 10), stat(3, 50)]
+        top.select(stats)
+        rows = top.select(stats)
+        
+        assert [(row.name, row.rss) for row in rows] == [("app", 50), ("root", 20)]
+        assert calls == [1, 2, 3]
+
+    def test_invalid_options(self):
+        with pytest.raises(ValueError):
+            TopK(sort="size")
+        with pytest.raises(ValueError):
+            TopK(group_by="user")
+
+    def test_sort_by_pss(self):
+        shared = stat(1, 900)
+        shared.pss = 100
+        private = stat(2, 500)
+        private.pss = 480
+        
+        rows = TopK(k=2, sort="pss").select([shared, private, stat(3, 200)])
+        
+        assert [row.pid for row in rows] == [2, 3]
@@ -0,0 +1,180 @@
+"""Tests for the binary trace format."""
+
+import csv
+import os
+import pytest
+from mem_watch import trace
+from mem_watch.trace import (
+    FORMATS, RECORD, TraceFormatError, TraceReader, TraceWriter, csv_to_trace, trace_to_csv
+)
+from mem_watch.export import CSVExporter, create_exporter
+from mem_watch.monitor import ProcessStats
+from mem_watch.cli import main
+
+
+def write_trace(path, ticks=10, pids=(1, 2, 3), block_records=4):
+    with TraceWriter(str(path), block_records=block_records) as writer:
+        for tick in range(ticks):
+            stats = [
+                ProcessStats(pid=pid, name=f"proc{pid}", rss=pid * 1000 + tick, vms=pid * 2000, percent=pid / 10)
+                for pid in pids
+            ]
+            writer.write(stats, timestamp=1000.0 + tick)
+
+
+class TestTraceWriter:
+    def test_record_size_is_compact(self):
+        assert RECORD.size <= 40
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "trace.mwt"
+        write_trace(path)
+        
+        with TraceReader(str(path)) as reader:
+            records = list(reader.records())
+        
+        assert len(records) == 30
+        assert records[0] == (1000.0, 1, "proc1", 1000, 2000, pytest.approx(0.1))
+        assert records[-1][:5] == (1009.0, 3, "proc3", 3009, 6000)
+
+    def test_names_stored_once(self, tmp_path):
+        path = tmp_path / "trace.mwt"
+        write_trace(path, ticks=100, pids=(1,), block_records=1000)
+        
+        assert os.path.getsize(path) < 100 * RECORD.size + 200
+
+    def test_create_exporter_by_extension(self, tmp_path):
+        trace = create_exporter(str(tmp_path / "out.mwt"))
+        exporter = create_exporter(str(tmp_path / "out.csv"))
+        
+        assert isinstance(trace, TraceWriter)
+        assert isinstance(exporter, CSVExporter)
+        trace.close()
+
+    def test_csv_options_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            create_exporter(str(tmp_path / "out.mwt"), max_bytes=1024)
+
+
+class TestTraceReader:
+    def test_time_range_query(self, tmp_path):
+        path = tmp_path / "trace.mwt"
+        write_trace(path)
+        
+        with TraceReader(str(path)) as reader:
+            records = list(reader.records(start=1003.0, end=1005.0))
+        
+        assert {record[0] for record in records} == {1003.0, 1004.0, 1005.0}
+        assert len(records) == 9
+
+    def test_pid_series(self, tmp_path):
+        path = tmp_path / "trace.mwt"
+        write_trace(path)
+        
+        with TraceReader(str(path)) as reader:
+            series = reader.series(2)
+        
+        assert series == [(1000.0 + tick, 2000 + tick) for tick in range(10)]
+
+    def test_pid_series_skips_unrelated_blocks(self, tmp_path):
+        path = tmp_path / "trace.mwt"
+        with TraceWriter(str(path), block_records=2) as writer:
+            for tick in range(10):
+                pid = 1 if tick < 5 else 2
+                writer.write([ProcessStats(pid=pid, name="a", rss=tick, vms=0, percent=0.0)], 1000.0 + tick)
+        
+        with TraceReader(str(path)) as reader:
+            blocks = list(reader._candidate_blocks(None, None, 1))
+            assert len(blocks) < len(reader.blocks)
+            assert [rss for _, rss in reader.series(1)] == [0, 1, 2, 3, 4]
+
+    def test_unclosed_file_readable(self, tmp_path):
+        path = tmp_path / "trace.mwt"
+        writer = TraceWriter(str(path), block_records=3)
+        for tick in range(4):
+            writer.write([ProcessStats(pid=1, name="a", rss=tick, vms=0, percent=0.0)], 1000.0 + tick)
+        writer.flush()
+        
+        with TraceReader(str(path)) as reader:
+            assert [record[3] for record in reader.records()] == [0, 1, 2, 3]
+        writer.close()
+
+    def test_negative_pids(self, tmp_path):
+        path = tmp_path / "trace.mwt"
+        with TraceWriter(str(path), block_records=1) as writer:
+            writer.write([ProcessStats(pid=-7, name="/web", rss=10, vms=10, percent=1.0)], timestamp=1000.0)
+            writer.write([ProcessStats(pid=7, name="web", rss=20, vms=20, percent=2.0)], timestamp=1001.0)
+        
+        with TraceReader(str(path)) as reader:
+            assert [record[1] for record in reader.records()] == [-7, 7]
+            assert reader.series(-7) == [(1000.0, 10)]
+
+    def test_version_1_readable(self, tmp_path, monkeypatch):
+        record, index_pid = FORMATS[1]
+        monkeypatch.setattr(trace, "VERSION", 1)
+        monkeypatch.setattr(trace, "RECORD", record)
+        monkeypatch.setattr(trace, "INDEX_PID", index_pid)
+        path = tmp_path / "old.mwt"
+        write_trace(path, ticks=2)
+        monkeypatch.undo()
+        
+        with TraceReader(str(path)) as reader:
+            assert reader.version == 1
+            assert reader.series(2) == [(1000.0, 2000), (1001.0, 2001)]
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / "bogus.mwt"
+        path.write_bytes(b"not a trace file at all, definitely not" * 2)
+        
+        with pytest.raises(TraceFormatError):
+            TraceReader(str(path))
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.mwt"
+        path.write_bytes(b"")
+        
+        with pytest.raises(TraceFormatError):
+            TraceReader(str(path))
+
+
+class TestConversion:
+    def test_csv_round_trip(self, tmp_path):
+        source = tmp_path / "in.csv"
+        with CSVExporter(str(source)) as exporter:
+            for tick in range(3):
+                exporter.write(
+                    [ProcessStats(pid=1234, name="test", rss=1000 + tick, vms=2000, percent=5.5)],
+                    timestamp=1700000000 + tick
+                )
+        
+        trace = tmp_path / "out.mwt"
+        back = tmp_path / "back.csv"
+        csv_to_trace(str(source), str(trace))
+        trace_to_csv(str(trace), str(back))
+        
+        assert source.read_text() == back.read_text()
+
+    def test_convert_command(self, tmp_path):
+        trace = tmp_path / "in.mwt"
+        write_trace(trace, ticks=2)
+        output = tmp_path / "out.csv"
+        
+        main(["convert", str(trace), str(output)])
+        
+        with open(output) as f:
+            rows = list(csv.reader(f))
+        assert len(rows) == 7
+
+
+class TestPerSampleTimestamps:
+    def test_stat_timestamps_used_without_tick_time(self, tmp_path):
+        path = tmp_path / "trace.mwt"
+        early = ProcessStats(pid=1, name="a", rss=1, vms=1, percent=0.0)
+        early.timestamp = 1000.0
+        late = ProcessStats(pid=2, name="b", rss=1, vms=1, percent=0.0)
+        late.timestamp = 1004.5
+        with TraceWriter(str(path)) as writer:
+            writer.write([early, late])
+        
+        with TraceReader(str(path)) as reader:
+            assert [record[0] for record in reader.records()] == [1000.0, 1004.5]